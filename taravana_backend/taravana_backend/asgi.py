@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "taravana_backend.settings")
+# settings.py DB холболтын горимыг (pool / CONN_MAX_AGE) үүгээр сонгоно
+os.environ.setdefault("DJANGO_SERVER", "asgi")
 
 application = get_asgi_application()
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     'djoser',
     'rest_framework_simplejwt',
@@ -72,7 +73,8 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Token-ий claim-д итгэж request бүрт user-ийн DB query хийхгүй
+        'travel_app.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication', 
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -82,19 +84,62 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
-    )
-    
+    ),
+    # (created_at, id) cursor pagination; `cursor`/`page_size` ирсэн үед л идэвхжинэ
+    'DEFAULT_PAGINATION_CLASS': 'travel_app.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 20,
+    # orjson суусан бол түүгээр, үгүй бол stock JSONRenderer-ээр render хийнэ
+    'DEFAULT_RENDERER_CLASSES': (
+        'travel_app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # Token bucket: доорх url name-тэй route-уудыг л хязгаарлана (travel_app.throttling)
+    'DEFAULT_THROTTLE_CLASSES': (
+        'travel_app.throttling.RouteTokenBucketThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'blog_like': '60/min',
+        'toggle-save': '60/min',
+        'comment': '20/min',
+        # Djoser / simplejwt auth
+        'jwt-create': '10/min',
+        'jwt-refresh': '30/min',
+        'token_obtain_pair': '10/min',
+        'token_refresh': '30/min',
+        'user-list': '5/min',  # бүртгүүлэх
+        'user-activation': '5/min',
+        'user-resend-activation': '3/min',
+        'user-reset-password': '3/min',
+        'user-reset-password-confirm': '5/min',
+        'user-set-password': '5/min',
+    },
 }
 
+# Blog/Trip/Comment жагсаалтыг .values() мөрөөс шууд угсрах (travel_app.fastpath)
+API_FAST_SERIALIZATION = os.environ.get('API_FAST_SERIALIZATION', '1') == '1'
+
+# Access token-ийн claim (role, is_staff, идэвхтэй эсэх)-ийг request бүр DB-ээс
+# шалгадаггүй тул идэвхгүй болгосон хэрэглэгч token-ийнхоо хугацаа дуустал
+# нэвтэрсэн хэвээр байна (admin үйлдлүүд л DB-ээс дахин шалгагдана).
+# Mobile client одоогоор refresh хийдэггүй тул default 7 хоног; refresh
+# нэвтрүүлсний дараа JWT_ACCESS_TOKEN_MINUTES-ийг богиносгоно.
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(days=7),       # Access token → 7 хоног
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 7 * 24 * 60))),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=30),     # Refresh token → 30 хоног
     "ROTATE_REFRESH_TOKENS": True,                    # Refresh хийхэд шинэ token үүсгэнэ
     "BLACKLIST_AFTER_ROTATION": True,                 # Хуучин refresh token-ыг blacklist-дэнэ
+    # email, role, is_staff-ийг token-д нэмнэ (travel_app.authentication)
+    "TOKEN_OBTAIN_SERIALIZER": "travel_app.authentication.ClaimsTokenObtainPairSerializer",
+    # Refresh/rotation үед claim-уудыг DB-ээс дахин уншина
+    "TOKEN_REFRESH_SERIALIZER": "travel_app.authentication.ClaimsTokenRefreshSerializer",
 }
 
+# Claim-гүй token-ий user мөрийг process дотор кэшлэх хугацаа (секунд)
+JWT_USER_CACHE_TTL = int(os.environ.get('JWT_USER_CACHE_TTL', 30))
+
 
 MIDDLEWARE = [
+    "travel_app.metrics.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -133,14 +178,138 @@ AUTH_USER_MODEL = 'travel_app.CustomUser'
 DATABASES = {
     "default": {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'travana_db',
-        'USER': 'postgres',
-        'PASSWORD': '12345678',
-        'HOST': 'localhost',
-        'PORT': '5432',
+        'NAME': os.environ.get('DB_NAME', 'travana_db'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', '12345678'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
     }
 }
 
+# Connection reuse
+# DJANGO_SERVER-ийг asgi.py "asgi" болгоно (WSGI_APPLICATION / runserver бол "wsgi").
+#
+# WSGI (gunicorn sync/gthread): request бүр worker-ийн тогтмол thread-д
+#   ажиллах тул persistent connection (thread тутамд нэг) хангалттай:
+#   CONN_MAX_AGE секунд хадгалж, CONN_HEALTH_CHECKS-ээр тасарсныг шалгана.
+# ASGI (uvicorn): sync ORM код request бүрт шинэ thread-д ажилладаг тул
+#   persistent connection хуримтлагдаж Postgres-ийн max_connections-ийг
+#   дүүргэнэ (Django-ийн docs: ASGI дээр persistent connection унтраа).
+#   Default нь psycopg3-ийн pool (`psycopg[pool]`), суугаагүй бол
+#   CONN_MAX_AGE=0 (request бүр шинэ холболт).
+#
+# Pool worker process бүрт тусдаа: max_size-ийг process-ийн зэрэг ажиллах
+# thread-ийн тоо (WEB_THREADS = gunicorn --threads; ASGI-д event loop-ийн
+# executor, async_views.gather_queries) -гоор, нийт WEB_CONCURRENCY x max_size
+# нь Postgres-ийн max_connections-оос бага байхаар тохируулна.
+ASGI_SERVER = os.environ.get('DJANGO_SERVER', 'wsgi') == 'asgi'
+WEB_THREADS = int(os.environ.get('WEB_THREADS', 10 if ASGI_SERVER else 1))
+
+
+def _pool_available():
+    from importlib.util import find_spec
+    return find_spec('psycopg_pool') is not None
+
+
+DB_POOL = os.environ.get('DB_POOL', '1' if ASGI_SERVER and _pool_available() else '') == '1'
+if DB_POOL:
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # pool-той хамт persistent connection ашиглах боломжгүй
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', min(2, WEB_THREADS))),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', WEB_THREADS)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+elif ASGI_SERVER:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Cache
+# REDIS_URL өгөгдвөл Redis, үгүй бол process доторх local memory cache ашиглана.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "travana",
+        }
+    }
+
+# API response cache-ийн хадгалах хугацаа (секунд)
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', 60 * 15))
+
+
+# Request metrics (travel_app.metrics): /metrics/ дээр Prometheus text
+REQUEST_METRICS = os.environ.get('REQUEST_METRICS', '1') == '1'
+METRICS_ALLOWED_IPS = os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+# Үүнээс удаан request-ийг SQL-тай нь log-д бичнэ (ms)
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 500))
+# Тестэд QUERY_BUDGET_STRICT=1: view-ийн query тоо хязгаараас хэтэрвэл exception
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', '0') == '1'
+QUERY_BUDGET_DEFAULT = None  # None = хязгааргүй
+QUERY_BUDGETS = {
+    'me': 2,
+    'blog-list': 8,
+    'blog-trending': 8,
+    'list_comments': 3,
+    'saved_blogs': 8,
+    'trip-list': 3,
+    'country-list': 2,
+    'place-list': 2,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "travel_app.metrics": {"handlers": ["console"], "level": "WARNING"},
+    },
+}
+
+
+# Delta sync (/api/sync/)
+# Серверүүдийн цагийн зөрүүг нөхөх token-ийн давхцал (секунд). Commit-ийн
+# хоцрогдлыг sync.open_write_age нөхнө.
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', 5))
+# Tombstone хадгалах хугацаа; үүнээс хуучин token-тай client бүрэн snapshot авна
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+# Batch endpoint (/api/batch/)
+BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 4))  # зэрэг ажиллах GET
+
+
+# Push events (/api/events/, server-sent events)
+# Олон worker-тэй бол 'travel_app.events.RedisBroker'
+EVENT_BROKER = os.environ.get('EVENT_BROKER', 'travel_app.events.InProcessBroker')
+EVENT_BROKER_URL = os.environ.get('EVENT_BROKER_URL', os.environ.get('REDIS_URL', ''))
+EVENT_STREAM_HEARTBEAT = int(os.environ.get('EVENT_STREAM_HEARTBEAT', 15))  # секунд
+EVENT_STREAM_MAX_BLOGS = 50
+
+
+# Read replica routing (travel_app.db_router, settings_production-д идэвхжинэ)
+# Эдгээр url name-тэй GET request-ууд replica-аас уншина
+REPLICA_READ_VIEWS = {
+    'country-list', 'country-detail',
+    'place-list', 'place-detail', 'place-popular',
+    'blog-list', 'blog-trending',
+    'list_comments',
+    'async_blogs', 'async_list_comments',
+}
+# Хэрэглэгч бичилт хийсний дараа түүний уншилтыг default DB-д барих хугацаа (секунд)
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -180,6 +349,22 @@ STATIC_URL = "static/"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Үүнээс том upload-ийг (Django-ийн default handler-ууд) санах ойд бүтнээр нь биш,
+# chunk-аар temp файл руу бичнэ
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get('FILE_UPLOAD_MAX_MEMORY_SIZE', 512 * 1024))
+
+# Зургийн rendition pipeline (travel_app.images)
+IMAGE_PIPELINE_WORKERS = int(os.environ.get('IMAGE_PIPELINE_WORKERS', 2))
+# True бол upload-ийн дараа шууд (sync) боловсруулна, жишээ нь тест/management command-д
+IMAGE_PIPELINE_EAGER = os.environ.get('IMAGE_PIPELINE_EAGER', '') == '1'
+
+# Материалжсан home timeline (travel_app.timeline)
+# Хэрэглэгч бүрт үлдээх entry-ийн дээд тоо (`manage.py trim_timelines`)
+TIMELINE_MAX_ENTRIES = int(os.environ.get('TIMELINE_MAX_ENTRIES', 1000))
+TIMELINE_FANOUT_WORKERS = int(os.environ.get('TIMELINE_FANOUT_WORKERS', 1))
+# True бол fan-out-ийг commit-ийн дараа тухайн thread-д шууд хийнэ (тест)
+TIMELINE_FANOUT_EAGER = os.environ.get('TIMELINE_FANOUT_EAGER', '') == '1'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,55 @@
+"""
+Production settings: `DJANGO_SETTINGS_MODULE=taravana_backend.settings_production`
+
+Бүх нууц, host-ийн тохиргоог орчны хувьсагчаас уншина.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, MIDDLEWARE, REST_FRAMEWORK
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+DEBUG = False  # DEBUG нь бүх query-г connection.queries-д хадгалдаг
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+
+CORS_ALLOW_ALL_ORIGINS = False
+CORS_ALLOWED_ORIGINS = [o for o in os.environ.get('CORS_ALLOWED_ORIGINS', '').split(',') if o]
+
+# --------------------------
+# Shared cache
+# --------------------------
+# ETag version counter (travel_app.caching), throttle bucket, replica pin бүгд
+# default cache-д: process бүрийн LocMemCache-тэй бол нэг worker-ийн bump бусдад
+# харагдахгүй, тэд хуучин өгөгдөлд 304 буцаана.
+if not os.environ.get('REDIS_URL'):
+    raise ImproperlyConfigured("REDIS_URL is required: cache versions must be shared by all workers")
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ('travel_app.renderers.ORJSONRenderer',),
+}
+
+# --------------------------
+# Read replica
+# --------------------------
+# DB_REPLICA_HOST өгөгдвөл REPLICA_READ_VIEWS-ийн GET request-ууд replica-аас уншина.
+# Бичилтийн дараах pin (db_router) дээрх shared cache-д хадгалагдана.
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.environ.get('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['travel_app.db_router.ReplicaRouter']
+    MIDDLEWARE = MIDDLEWARE + ['travel_app.db_router.ReplicaRoutingMiddleware']
+
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+SESSION_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = True
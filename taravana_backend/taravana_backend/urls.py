@@ -18,6 +18,9 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from travel_app.views import *
+from travel_app import async_views
+from travel_app.metrics import metrics_view
+from travel_app.batch import batch
 from django.conf.urls.static import static
 from rest_framework import routers
 
@@ -36,6 +39,7 @@ router.register(r'blogs',BlogViewSet, basename='blog')
 
 urlpatterns = [
     path("admin/", admin.site.urls),    
+    path('metrics/', metrics_view, name='metrics'),
     path('auth/', include('djoser.urls')),
     # 2. Djoser-ийн JWT Login/Logout
     path('auth/', include('djoser.urls.jwt')),
@@ -45,13 +49,23 @@ urlpatterns = [
     path('api/', include(router.urls)),
     path('api/me/', get_me, name='me'),
     path('api/add_comment/<int:blog_id>', add_comment, name='comment'),
+    path('api/blogs/<int:blog_id>/comments/', list_comments, name='list_comments'),
     path('api/profile/update/', update_profile, name='update_profile'),
     path('api/blogs/<int:blog_id>/like/', toggle_like, name='blog_like'),
     path('api/comments/<int:comment_id>/delete/', delete_comment),
     path('api/blogs/<int:blog_id>/save/', toggle_save, name='toggle-save'),
     path('api/saved_blogs/', saved_blogs, name='saved_blogs'),
+    path('api/sync/', delta_sync, name='sync'),
+    path('api/batch/', batch, name='batch'),
     path('api/blogs/<int:blog_id>/delete/', delete_blog, name='delete_blog'),
 
+    # ASGI (async) read-only хувилбарууд
+    path('api/async/me/', async_views.get_me, name='async_me'),
+    path('api/async/blogs/', async_views.blog_feed, name='async_blogs'),
+    path('api/async/saved_blogs/', async_views.saved_blogs, name='async_saved_blogs'),
+    path('api/async/blogs/<int:blog_id>/comments/', async_views.list_comments, name='async_list_comments'),
+    path('api/events/', async_views.event_stream, name='events'),
+
 
 
 
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TravelAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "travel_app"
+
+    def ready(self):
+        # Signal receiver-уудыг бүртгэнэ
+        from . import caching, events, images, metrics, search, sync, timeline, trending  # noqa: F401
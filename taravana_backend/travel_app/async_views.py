@@ -0,0 +1,207 @@
+import asyncio
+import json
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import OuterRef, Q, Subquery
+from django.http import HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+from .authentication import ClaimsJWTAuthentication
+from .events import blog_topic, get_broker, user_topic
+from .fastpath import BLOG_LIST_PLAN, COMMENT_PLAN, USER_PLAN, Many, ordering_fields, values_rows
+from .models import Blog, Comment, CustomUser, Save
+from .pagination import CreatedAtCursorPagination
+from .renderers import ORJSONRenderer
+from .serializers import BlogListSerializer
+from .timeline import live_feed
+from .views import me_include_stats
+
+# --------------------------
+# ASGI-д зориулсан read-only endpoint-ууд
+# --------------------------
+# DRF-ийн view-ууд sync тул энд Django-ийн async view ашиглана. Бие биеэсээ
+# хамааралгүй query-г тус тусын thread + DB холболтоор зэрэг ажиллуулна
+# (Django-ийн async ORM бүх query-г нэг thread-д дараалуулдаг). Thread-үүд
+# event loop-ийн executor-ийнх тул дахин ашиглагдана; холболтыг
+# CONN_MAX_AGE / DB_POOL-ийн дагуу хадгална.
+
+_jwt = ClaimsJWTAuthentication()
+_renderer = ORJSONRenderer()
+
+
+def _json(data, status=200):
+    return HttpResponse(_renderer.render(data), status=status, content_type='application/json')
+
+
+def _own_connection(fn):
+    def run():
+        # Хугацаа нь дууссан/эвдэрсэн холболтыг л хаана (pool-д буцаана)
+        close_old_connections()
+        try:
+            return fn()
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+async def gather_queries(*fns):
+    return await asyncio.gather(*(_own_connection(fn)() for fn in fns))
+
+
+async def _authenticate(request):
+    try:
+        result = await sync_to_async(_jwt.authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def async_api_view(view):
+    """GET + JWT шалгалт. View нь (data) эсвэл HttpResponse буцаана."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _json({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+        user = await _authenticate(request)
+        if user is None:
+            return _json({"detail": "Authentication credentials were not provided."}, status=401)
+        request.user = user
+        result = await view(request, *args, **kwargs)
+        return result if isinstance(result, HttpResponseBase) else _json(result)
+    return wrapper
+
+
+async def _build_many(plan, rows, request):
+    """Plan-ийн Many багануудыг (зураг, comment) зэрэг ачаална."""
+    many = [column for column in plan.columns if isinstance(column, Many)]
+    related = {}
+    if many and rows:
+        ids = [row['id'] for row in rows]
+        results = await gather_queries(*(partial(column.fetch, ids, request) for column in many))
+        related = {column.key: result for column, result in zip(many, results)}
+    return [plan.build(row, request, related=related) for row in rows]
+
+
+async def _paginated(request, queryset, plan):
+    paginator = CreatedAtCursorPagination()
+    drf_request = Request(request)
+    rows = values_rows(queryset, plan, ordering_fields(paginator, drf_request, queryset))
+
+    page = await sync_to_async(paginator.paginate_queryset)(rows, drf_request)
+    if page is None:
+        return await _build_many(plan, [row async for row in rows], request)
+    data = await _build_many(plan, page, request)
+    return paginator.get_paginated_response(data).data
+
+
+# --------------------------
+# Views
+# --------------------------
+@async_api_view
+async def get_me(request):
+    # views.get_me-тэй адил: profile, blog/trip тоо нэг query-д
+    extended = me_include_stats(request)
+    stats = ['blog_count', 'trip_count']
+    if extended:
+        stats += ['likes_received', 'saved_count']
+    row = await (
+        CustomUser.objects.with_stats(extended=extended)
+        .filter(pk=request.user.pk)
+        .values(*USER_PLAN.lookups(), *stats)
+        .aget()
+    )
+    data = USER_PLAN.build(row, request)
+    for name in stats:
+        data[name] = row[name]
+    return data
+
+
+@async_api_view
+async def blog_feed(request):
+    user = request.user
+    queryset = Blog.objects.with_feed_data(
+        user, comment_previews=BlogListSerializer.COMMENT_PREVIEW_COUNT
+    ).order_by('-created_at', '-id')
+
+    user_id = request.GET.get('user_id')
+    if user_id:
+        queryset = queryset.filter(user_id=user_id)
+    else:
+        # Хуудас бүр (created_at, id) cursor-оор live query-гээс
+        queryset = live_feed(queryset, user)
+    return await _paginated(request, queryset, BLOG_LIST_PLAN)
+
+
+@async_api_view
+async def saved_blogs(request):
+    user = request.user
+    saved_at = Save.objects.filter(user=user, blog=OuterRef('pk')).values('created_at')[:1]
+    queryset = (
+        Blog.objects.with_feed_data(user, comment_previews=BlogListSerializer.COMMENT_PREVIEW_COUNT)
+        .filter(saves__user=user)
+        .annotate(saved_at=Subquery(saved_at))
+        .order_by('saved_at')
+    )
+    rows = [row async for row in values_rows(queryset, BLOG_LIST_PLAN)]
+    return await _build_many(BLOG_LIST_PLAN, rows, request)
+
+
+@async_api_view
+async def list_comments(request, blog_id):
+    if not await Blog.objects.filter(id=blog_id).aexists():
+        return _json({"error": "Blog not found"}, status=404)
+
+    comments = Comment.objects.filter(blog_id=blog_id).order_by('-created_at', '-id')
+    return await _paginated(request, comments, COMMENT_PLAN)
+
+
+# --------------------------
+# Server-sent events
+# --------------------------
+async def _sse(topics):
+    yield 'retry: 3000\n\n'
+    events = get_broker().subscribe(topics)
+    pending = None
+    try:
+        while True:
+            # Heartbeat-ийн timeout-оор generator-ийг cancel хийхгүйн тулд task-ийг хадгална
+            if pending is None:
+                pending = asyncio.ensure_future(anext(events))
+            done, _ = await asyncio.wait({pending}, timeout=settings.EVENT_STREAM_HEARTBEAT)
+            if not done:
+                yield ': ping\n\n'
+                continue
+            event, pending = pending.result(), None
+            yield f'event: {event["type"]}\ndata: {json.dumps(event)}\n\n'
+    finally:
+        if pending is not None:
+            pending.cancel()
+        await events.aclose()
+
+
+@async_api_view
+async def event_stream(request):
+    """
+    `text/event-stream`: ?blogs=1,2 (үзэж буй blog-ууд) дээрх comment/like
+    event-үүд ба өөрийн blog-уудын бүх comment/like/save event.
+    """
+    if not isinstance(request, ASGIRequest):
+        # WSGI worker төгсгөлгүй stream-ийг бүхлээр нь цуглуулах гэж гацна
+        return _json({"detail": "Event stream requires an ASGI server."}, status=501)
+
+    ids = [int(pk) for pk in request.GET.get('blogs', '').split(',') if pk.strip().isdigit()]
+    ids = ids[:settings.EVENT_STREAM_MAX_BLOGS]
+    visible = Blog.objects.filter(pk__in=ids).filter(Q(is_public=True) | Q(user=request.user))
+    topics = [user_topic(request.user.pk)]
+    topics += [blog_topic(pk) async for pk in visible.values_list('pk', flat=True)]
+
+    response = StreamingHttpResponse(_sse(topics), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx buffer хийхгүй
+    return response
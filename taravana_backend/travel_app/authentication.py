@@ -0,0 +1,151 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+# Permission шалгахад хэрэгтэй, token-д гарын үсэгтэй хадгалагдах талбарууд
+CLAIM_FIELDS = ('email', 'role', 'is_staff')
+
+
+# --------------------------
+# Token үүсгэх
+# --------------------------
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Refresh (мөн түүнээс гарах access) token-д CLAIM_FIELDS-ийг нэмнэ."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    simplejwt refresh/rotation нь refresh token-ий claim-уудыг шинэ token руу
+    хуулдаг тул role/is_staff өөрчлөгдсөн ч хуучин утга 30 хоног үлдэнэ.
+    Энд хэрэглэгчийг DB-ээс дахин ачаалж CLAIM_FIELDS-ийг шинэчилнэ.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        for field in CLAIM_FIELDS:
+            refresh[field] = getattr(user, field)
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:  # token_blacklist app суугаагүй
+                    pass
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+
+        return data
+
+
+def confirm_claims(user, **claims):
+    """
+    Эрх олгох claim (role='admin', is_staff=True)-ийг DB-ээс баталгаажуулна.
+    Зөвхөн бусдын объект дээрх admin үйлдэлд дуудагдах тул нэмэлт query
+    ховор; эрх хасагдсан admin-ий access token-ийг ингэж хаана.
+    """
+    return User.objects.filter(pk=user.pk, is_active=True, **claims).exists()
+
+
+# --------------------------
+# In-process TTL cache
+# --------------------------
+class TTLCache:
+    def __init__(self, ttl, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+user_cache = TTLCache(ttl=settings.JWT_USER_CACHE_TTL)
+
+
+# --------------------------
+# Authentication
+# --------------------------
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Token-д CLAIM_FIELDS байвал DB-д хандалгүйгээр CustomUser instance-ийг
+    claim-аас үүсгэнэ. Бусад талбар нь deferred тул зөвхөн хандах үед л
+    DB-ээс ачаалагдана. Claim-гүй (хуучин) token-д user мөрийг богино TTL-тэй
+    process доторх cache-ээс эсвэл DB-ээс авна.
+
+    Анхаар: claim-д итгэдэг тул идэвхгүй болгосон (эсвэл эрх нь өөрчлөгдсөн)
+    хэрэглэгчийн access token хугацаа нь (ACCESS_TOKEN_LIFETIME) дуустал
+    хүчинтэй хэвээр байна. Admin эрхийг confirm_claims() дахин шалгадаг;
+    refresh үед claim-ууд ClaimsTokenRefreshSerializer-ээр шинэчлэгдэнэ.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if all(field in validated_token for field in CLAIM_FIELDS):
+            return self.user_from_claims(user_id, validated_token)
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)  # is_active-ийг шалгана
+            user_cache.set(user_id, user)
+        # Request бүр өөрийн хуулбартай ажиллана
+        return copy.copy(user)
+
+    def user_from_claims(self, user_id, token):
+        known = {field: token[field] for field in CLAIM_FIELDS}
+        known[User._meta.pk.attname] = user_id
+        known['is_active'] = True  # token зөвхөн идэвхтэй хэрэглэгчид олгогддог
+
+        # from_db нь утгуудыг concrete field-ийн дарааллаар хүлээнэ
+        field_names = [f.attname for f in User._meta.concrete_fields if f.attname in known]
+        return User.from_db('default', field_names, [known[name] for name in field_names])
@@ -0,0 +1,178 @@
+import asyncio
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, SAFE_METHODS
+from rest_framework.response import Response
+
+BATCH_METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}
+
+# Sub-request-д parent-аас дамжих META: зөвхөн auth ба host. If-None-Match,
+# Content-Type/Length г.м. нь item бүрт өөрийнх нь байх ёстой.
+INHERITED_META = (
+    'HTTP_AUTHORIZATION', 'HTTP_HOST', 'HTTP_X_FORWARDED_HOST', 'HTTP_X_FORWARDED_PROTO',
+    'SERVER_NAME', 'SERVER_PORT', 'REMOTE_ADDR', 'wsgi.url_scheme',
+)
+
+
+class BatchError(Exception):
+    pass
+
+
+# --------------------------
+# Sub-request
+# --------------------------
+def _sub_request(parent, item):
+    """
+    `{"method", "path", "body"}`-оос Django HttpRequest үүсгэнэ. Parent-ийн
+    auth/host header-уудыг (INHERITED_META) авч, DRF-ийн forced auth-аар parent-ийн хэрэглэгчийг дамжуулна
+    (token-ийг дахин шалгахгүй).
+    """
+    if not isinstance(item, dict):
+        raise BatchError("Each request must be an object")
+    method = str(item.get('method', 'GET')).upper()
+    if method not in BATCH_METHODS:
+        raise BatchError(f"Method {method} is not allowed")
+
+    url = urlsplit(str(item.get('path', '')))
+    if not url.path.startswith('/api/') or url.path.startswith('/api/batch/'):
+        raise BatchError("Only /api/ routes can be batched")
+    try:
+        match = resolve(url.path)
+    except Resolver404:
+        raise BatchError(f"No route for {url.path}")
+
+    body = b''
+    if item.get('body') is not None:
+        body = json.dumps(item['body']).encode()
+
+    request = HttpRequest()
+    request.method = method
+    request.path = request.path_info = url.path
+    request.META = {
+        **{key: parent.META[key] for key in INHERITED_META if key in parent.META},
+        'REQUEST_METHOD': method,
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+    }
+    request.GET = QueryDict(url.query)
+    request.COOKIES = parent.COOKIES
+    request._stream = BytesIO(body)
+    request._read_started = False
+    request.resolver_match = match
+    request._force_auth_user = parent.user
+    request._force_auth_token = parent.auth
+    return request, match
+
+
+def _run(request, match):
+    view = match.func
+    if asyncio.iscoroutinefunction(view):  # travel_app.async_views
+        view = async_to_sync(view)
+    response = view(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+
+    if hasattr(response, 'data'):
+        body = response.data
+    elif response.get('Content-Type', '').startswith('application/json') and response.content:
+        body = json.loads(response.content)
+    else:
+        body = response.content.decode() or None
+    return {'status': response.status_code, 'body': body}
+
+
+def _run_in_snapshot(snapshot, request, match):
+    # Worker thread-ийн холболт parent-ийн export хийсэн snapshot-ыг импортолно:
+    # бүх GET нэг агшны өгөгдөл харна (SET TRANSACTION нь эхний query байх ёстой)
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                cursor.execute("SET TRANSACTION SNAPSHOT %s", [snapshot])
+            return _run(request, match)
+    finally:
+        # Pool/persistent холболтыг хаяхгүй, зөвхөн хуучирсныг хаана
+        close_old_connections()
+
+
+_executor = None
+
+
+def _get_executor():
+    # Thread-үүд (ба тэдний persistent/pool холболт) batch хооронд дахин ашиглагдана
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BATCH_MAX_WORKERS,
+            thread_name_prefix='batch',
+        )
+    return _executor
+
+
+def _run_reads(subs):
+    # Batch нь POST тул replica руу чиглэхгүй: snapshot default дээрээс
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_export_snapshot()")
+            snapshot = cursor.fetchone()[0]
+
+        # Export хийсэн transaction нээлттэй байх хооронд snapshot хүчинтэй.
+        # contextvars (metrics, replica routing)-ийг thread руу дамжуулна
+        futures = [
+            _get_executor().submit(contextvars.copy_context().run, _run_in_snapshot, snapshot, sub, match)
+            for sub, match in subs
+        ]
+        return [future.result() for future in futures]
+
+
+# --------------------------
+# /api/batch/
+# --------------------------
+@api_view(['POST'])
+@permission_classes([AllowAny])  # sub-request бүр өөрийн permission-оо шалгана
+def batch(request):
+    """
+    `{"requests": [{"method": "GET", "path": "/api/blogs/5/"}, ...]}`-ийг
+    urls.py-ийн route-уудаар гүйцэтгэж, дарааллаар нь
+    `{"responses": [{"status", "body"}, ...]}` буцаана.
+
+    Бүгд GET бол зэрэг (BATCH_MAX_WORKERS thread) ажиллах ч Postgres-ийн
+    exported snapshot-оор нэг агшны өгөгдлийг уншина. Бичилт орсон бол
+    дарааллаар нэг transaction-д ажиллаж, аль нэг бичилт (GET биш) 4xx/5xx
+    буцаавал бүх batch rollback хийгдэнэ (`"rolled_back": true`).
+    """
+    items = request.data.get('requests') if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not items:
+        return Response({"error": "'requests' must be a non-empty list"}, status=400)
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        return Response({"error": f"At most {settings.BATCH_MAX_REQUESTS} requests per batch"}, status=400)
+
+    try:
+        subs = [_sub_request(request, item) for item in items]
+    except BatchError as e:
+        return Response({"error": str(e)}, status=400)
+
+    if all(sub.method == 'GET' for sub, _ in subs):
+        return Response({"responses": _run_reads(subs)})
+
+    rolled_back = False
+    with transaction.atomic():
+        responses = [_run(sub, match) for sub, match in subs]
+        # Уншилтын 404 г.м. бичилтүүдийг буцаахгүй
+        if any(r['status'] >= 400 and sub.method not in SAFE_METHODS
+               for r, (sub, _) in zip(responses, subs)):
+            transaction.set_rollback(True)
+            rolled_back = True
+    return Response({"responses": responses, "rolled_back": rolled_back})
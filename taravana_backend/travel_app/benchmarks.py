@@ -0,0 +1,581 @@
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.client import HTTPConnection
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+# `manage.py benchmark <name>`-ээр ажиллуулна. Benchmark бүр өгөгдлөө нэг
+# transaction-д үүсгэж, дууссаны дараа rollback хийнэ (DB-д юу ч үлдэхгүй).
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+# --------------------------
+# Helpers
+# --------------------------
+@contextmanager
+def rolled_back():
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def measure(func, iterations, warmup=10):
+    """`func`-ийг `iterations` удаа дуудаж (секунд) хугацаа ба нэг дуудалтын query тоог буцаана."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    with CaptureQueriesContext(connection) as ctx:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    return samples, len(ctx.captured_queries) / iterations
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+@contextmanager
+def serving(command, port, env=None):
+    """`command` (gunicorn/uvicorn) серверийг асааж, `port` нээгдтэл хүлээнэ."""
+    process = subprocess.Popen(
+        command, env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"{command[0]} did not start on port {port}")
+                time.sleep(0.2)
+        yield
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def http_load(port, path, headers, total, concurrency, method='GET'):
+    """
+    `concurrency` keep-alive холболтоор нийт `total` хүсэлт илгээнэ. Хүсэлт
+    бүрийн хугацаа ба нийт req/s-ийг буцаана. `headers` жагсаалт бол хүсэлт
+    бүр дараагийнхыг нь ашиглана (хэрэглэгч тутмын throttle-д хүрэхгүй).
+    """
+    headers = headers if isinstance(headers, list) else [headers]
+
+    def worker(requests):
+        conn = HTTPConnection('127.0.0.1', port, timeout=30)
+        samples = []
+        for i in requests:
+            start = time.perf_counter()
+            conn.request(method, path, headers=headers[i % len(headers)])
+            response = conn.getresponse()
+            response.read()
+            samples.append(time.perf_counter() - start)
+            if response.status != 200:
+                raise RuntimeError(f"{method} {path} -> {response.status}")
+        conn.close()
+        return samples
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        batches = pool.map(worker, (range(i, total, concurrency) for i in range(concurrency)))
+        samples = [s for batch in batches for s in batch]
+    return samples, total / (time.perf_counter() - start)
+
+
+def summary(label, samples, queries=None):
+    line = (
+        f'{label:<48} n={len(samples):<6} mean={statistics.mean(samples) * 1000:8.3f} ms  '
+        f'p50={percentile(samples, 50) * 1000:8.3f} ms  p99={percentile(samples, 99) * 1000:8.3f} ms'
+    )
+    if queries is not None:
+        line += f'  queries={queries:g}'
+    return line
+
+
+# --------------------------
+# Auth overhead
+# --------------------------
+@benchmark('auth')
+def auth_overhead(options):
+    """
+    Stock JWTAuthentication (request бүр user SELECT) ба claim-тай token-ийг
+    ClaimsJWTAuthentication-аар (DB-гүй), claim-гүй хуучин token-ийг TTL
+    cache-ээр баталгаажуулах зардлыг харьцуулна.
+    """
+    from rest_framework.test import APIRequestFactory
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from .authentication import ClaimsJWTAuthentication, ClaimsTokenObtainPairSerializer, user_cache
+    from .models import CustomUser
+
+    iterations = options['iterations']
+    factory = APIRequestFactory()
+    with rolled_back():
+        user = CustomUser.objects.create_user(email='bench-auth@example.com', password='bench')
+        claims_token = str(ClaimsTokenObtainPairSerializer.get_token(user).access_token)
+        plain_token = str(AccessToken.for_user(user))
+        user_cache.clear()
+
+        cases = [
+            ('stock JWTAuthentication', JWTAuthentication(), plain_token),
+            ('claims token (no query)', ClaimsJWTAuthentication(), claims_token),
+            ('claim-less token (TTL cache)', ClaimsJWTAuthentication(), plain_token),
+        ]
+        for label, auth, token in cases:
+            request = factory.get('/api/blogs/', HTTP_AUTHORIZATION=f'Bearer {token}')
+            samples, queries = measure(lambda: auth.authenticate(request), iterations)
+            yield summary(label, samples, queries)
+
+
+# --------------------------
+# Full-text search at scale
+# --------------------------
+SEED_BLOGS_SQL = """
+INSERT INTO travel_app_blog (
+    user_id, content, is_public, created_at, updated_at,
+    likes_count, saves_count, comments_count, trending_score, search_vector
+)
+SELECT %(user_id)s, content, TRUE, NOW() - g * INTERVAL '1 second', NOW(), 0, 0, 0, 0,
+       setweight(to_tsvector('simple', content), 'A')
+FROM (
+    SELECT g, concat_ws(' ', 'travel', 'post', g::text,
+        CASE WHEN g %% 10 = 0 THEN 'mountain' END,
+        CASE WHEN g %% 1000 = 0 THEN 'khuvsgul' END,
+        CASE WHEN g %% 20 = 0 THEN 'mountain lake' END
+    ) AS content
+    FROM generate_series(1, %(rows)s) AS g
+) AS seed
+"""
+
+
+@benchmark('search')
+def search_at_scale(options):
+    """
+    `--rows` (default 1M) нийтийн blog дээр ?search= эхний ба дараагийн
+    (cursor) хуудасны хугацаа: ховор (0.1%) ба түгээмэл (10%) үг. Full-text
+    (FullTextSearchFilter) ба өмнөх icontains SearchFilter-ийг BlogViewSet-ийн
+    search_fields дээр ижил үгээр харьцуулна.
+    """
+    from types import SimpleNamespace
+    from urllib.parse import parse_qs, urlsplit
+
+    from rest_framework.filters import SearchFilter
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from .models import Blog, CustomUser
+    from .pagination import CreatedAtCursorPagination
+    from .search import FullTextSearchFilter
+    from .views import BlogViewSet
+
+    rows = options['rows'] or 1_000_000
+    iterations = min(options['iterations'], 50)
+    factory = APIRequestFactory()
+    # Мөрөнд cursor-ийн эрэмбийн талбар байх ёстой
+    backends = (
+        ('full-text', FullTextSearchFilter, ('id', 'search_rank')),
+        ('icontains', SearchFilter, ('id', 'created_at')),
+    )
+
+    def page(backend, fields, params):
+        view = SimpleNamespace(filter_backends=[backend], search_fields=BlogViewSet.search_fields)
+        request = Request(factory.get('/api/blogs/', params, HTTP_HOST='localhost'))
+        queryset = backend().filter_queryset(request, Blog.objects.filter(is_public=True), view)
+        paginator = CreatedAtCursorPagination()
+        results = paginator.paginate_queryset(queryset.values(*fields), request, view)
+        return results, paginator
+
+    with rolled_back():
+        user = CustomUser.objects.create_user(email='bench-search@example.com', password='bench')
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(SEED_BLOGS_SQL, {'user_id': user.pk, 'rows': rows})
+            cursor.execute('ANALYZE travel_app_blog')
+        yield f'seeded {rows} blogs in {time.perf_counter() - start:.1f} s'
+
+        for term, share in (('khuvsgul', '0.1%'), ('mountain', '10%'), ('mountain lake', '5%')):
+            params = {'search': term, 'page_size': 20}
+            for label, backend, fields in backends:
+                samples, queries = measure(lambda: page(backend, fields, params), iterations, warmup=2)
+                yield summary(f'{label} "{term}" ({share}) page 1', samples, queries)
+
+                _, paginator = page(backend, fields, params)
+                next_link = paginator.get_next_link()
+                if next_link is None:
+                    continue
+                cursor_params = {**params, 'cursor': parse_qs(urlsplit(next_link).query)['cursor'][0]}
+                samples, queries = measure(lambda: page(backend, fields, cursor_params), iterations, warmup=2)
+                yield summary(f'{label} "{term}" ({share}) page 2 (cursor)', samples, queries)
+
+
+# --------------------------
+# WSGI vs ASGI
+# --------------------------
+WSGI_PORT = 8101
+ASGI_PORT = 8102
+
+
+def gunicorn_command(workers, threads):
+    return [
+        sys.executable, '-m', 'gunicorn', 'taravana_backend.wsgi', '--bind', f'127.0.0.1:{WSGI_PORT}',
+        '--workers', str(workers), '--threads', str(threads),
+    ]
+
+
+def uvicorn_command(workers):
+    return [
+        sys.executable, '-m', 'uvicorn', 'taravana_backend.asgi:application',
+        '--port', str(ASGI_PORT), '--workers', str(workers), '--no-access-log',
+    ]
+
+
+@benchmark('http')
+def wsgi_vs_asgi(options):
+    """
+    gunicorn (WSGI, sync worker + thread) дээрх DRF /api/me/ ба uvicorn
+    (ASGI) дээрх /api/async/me/-ийг `--concurrency` зэрэг холболтоор
+    ачаална. Сервер тусдаа процесс тул өгөгдлийг commit хийж, дараа нь устгана.
+    """
+    from .authentication import ClaimsTokenObtainPairSerializer
+    from .models import Blog, CustomUser
+
+    total = options['iterations']
+    concurrency = options['concurrency']
+    workers = options['workers']
+    user = CustomUser.objects.create_user(email='bench-http@example.com', password='bench')
+    try:
+        Blog.objects.bulk_create(Blog(user=user, content=f'bench {i}') for i in range(20))
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        headers = {'Authorization': f'Bearer {token}'}
+        yield f'{total} requests, concurrency={concurrency}, workers={workers}'
+
+        uvicorn = uvicorn_command(workers)
+        servers = [
+            ('WSGI gunicorn', WSGI_PORT, gunicorn_command(workers, concurrency), '/api/me/', {}),
+            ('ASGI uvicorn', ASGI_PORT, uvicorn, '/api/async/me/', {'DB_POOL': '0'}),
+            ('ASGI uvicorn DB_POOL', ASGI_PORT, uvicorn, '/api/async/me/', {'DB_POOL': '1'}),
+        ]
+        for label, port, command, path, env in servers:
+            with serving(command, port, env):
+                http_load(port, path, headers, concurrency * 5, concurrency)  # warmup
+                for query in ('', '?include=stats'):
+                    samples, rps = http_load(port, path + query, headers, total, concurrency)
+                    yield summary(f'{label} {path}{query}', samples) + f'  {rps:5.0f} req/s'
+    finally:
+        user.delete()
+
+
+# --------------------------
+# Connection reuse p99
+# --------------------------
+@benchmark('pool')
+def connection_reuse(options):
+    """
+    Богино request-үүдийн (/api/me/, toggle_like) p50/p99: request бүр шинэ
+    холболт (CONN_MAX_AGE=0), persistent connection (WSGI default) ба
+    psycopg3 pool (ASGI default).
+    """
+    from .authentication import ClaimsTokenObtainPairSerializer
+    from .models import Blog, CustomUser
+
+    total = options['iterations']
+    concurrency = options['concurrency']
+    workers = options['workers']
+    user = CustomUser.objects.create_user(email='bench-pool@example.com', password='bench')
+    # toggle_like нь хэрэглэгч тутам 60/min throttle-тай: хүсэлт бүр өөр хэрэглэгч
+    likers = CustomUser.objects.bulk_create(
+        CustomUser(email=f'bench-pool-{i}@example.com', password='!') for i in range(total)
+    )
+    try:
+        blog = Blog.objects.create(user=user, content='bench', is_public=True)
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        headers = {'Authorization': f'Bearer {token}'}
+        like_headers = [
+            {'Authorization': f'Bearer {ClaimsTokenObtainPairSerializer.get_token(liker).access_token}'}
+            for liker in likers
+        ]
+        yield f'{total} requests, concurrency={concurrency}, workers={workers}'
+
+        gunicorn = gunicorn_command(workers, concurrency)
+        uvicorn = uvicorn_command(workers)
+        threads = {'WEB_THREADS': str(concurrency)}
+        servers = [
+            ('WSGI CONN_MAX_AGE=0', WSGI_PORT, gunicorn, '/api/me/', {'DB_CONN_MAX_AGE': '0'}),
+            ('WSGI CONN_MAX_AGE=60 (default)', WSGI_PORT, gunicorn, '/api/me/', {}),
+            ('WSGI DB_POOL', WSGI_PORT, gunicorn, '/api/me/', {'DB_POOL': '1', **threads}),
+            ('ASGI CONN_MAX_AGE=0', ASGI_PORT, uvicorn, '/api/async/me/', {'DB_POOL': '0'}),
+            ('ASGI DB_POOL (default)', ASGI_PORT, uvicorn, '/api/async/me/', {}),
+        ]
+        for label, port, command, path, env in servers:
+            with serving(command, port, env):
+                http_load(port, path, headers, concurrency * 5, concurrency)  # warmup
+                cases = [('GET', path, headers), ('POST', f'/api/blogs/{blog.pk}/like/', like_headers)]
+                for method, url, auth in cases:
+                    samples, rps = http_load(port, url, auth, total, concurrency, method)
+                    yield summary(f'{label} {method} {url}', samples) + f'  {rps:5.0f} req/s'
+    finally:
+        user.delete()
+        CustomUser.objects.filter(pk__in=[liker.pk for liker in likers]).delete()
+
+
+# --------------------------
+# Token bucket throttle
+# --------------------------
+@benchmark('throttle')
+def throttle_latency(options):
+    """
+    take_token()-ийн хугацаа: LocMemCache (lock) ба REDIS_URL өгсөн бол Redis
+    (Lua script). Зэрэг ирсэн `--concurrency` thread нэг bucket-ийг
+    хоослоход зөвшөөрөгдсөн request-ийн тоо capacity-аас хэтрэхгүй.
+    """
+    from django.test import override_settings
+
+    from .throttling import take_token
+
+    iterations = options['iterations']
+    concurrency = options['concurrency']
+    backends = [('LocMemCache', {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'})]
+    if os.environ.get('REDIS_URL'):
+        backends.append(('RedisCache', {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }))
+    yield f'{iterations} calls, concurrency={concurrency}'
+
+    for label, cache_settings in backends:
+        with override_settings(CACHES={'default': cache_settings}):
+            counter = iter(range(10 ** 9))
+            # Key бүр шинэ тул bucket хэзээ ч хоосрохгүй: зөвхөн store-ийн хугацаа
+            samples, _ = measure(lambda: take_token(f'bench:throttle:{next(counter)}', 60, 60), iterations)
+            yield summary(f'{label} take_token', samples)
+
+            capacity = iterations // 10
+            key = f'bench:throttle:burst:{time.time()}'
+
+            def hit(_):
+                start = time.perf_counter()
+                allowed, _ = take_token(key, capacity, 3600)
+                return allowed, time.perf_counter() - start
+
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(hit, range(iterations)))
+            allowed = sum(1 for ok, _ in results if ok)
+            yield (
+                summary(f'{label} take_token x{concurrency} threads', [s for _, s in results])
+                + f'  allowed={allowed}/{capacity}'
+            )
+
+
+# --------------------------
+# Multi-image blog upload
+# --------------------------
+@benchmark('upload')
+def multi_image_upload(options):
+    """
+    10 зурагтай blog: зураг бүрийг BlogImage.objects.create-ээр дараалан
+    хадгалах (хуучин зам) ба bulk_create_blog_images (thread pool + нэг
+    bulk_create), мөн POST /api/blogs/ бүтнээрээ. Файлуудыг temp MEDIA_ROOT-д бичнэ.
+    """
+    import io
+    import shutil
+    import tempfile
+
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.test import override_settings
+    from PIL import Image
+    from rest_framework.test import APIClient
+
+    from .images import bulk_create_blog_images
+    from .models import Blog, BlogImage, CustomUser
+
+    iterations = min(options['iterations'], 50)
+    buffer = io.BytesIO()
+    Image.effect_noise((1600, 1200), 64).convert('RGB').save(buffer, format='JPEG', quality=90)
+    payload = buffer.getvalue()
+
+    def uploads():
+        return [SimpleUploadedFile(f'photo{i}.jpg', payload, 'image/jpeg') for i in range(10)]
+
+    media_root = tempfile.mkdtemp()
+    try:
+        with override_settings(MEDIA_ROOT=media_root), rolled_back():
+            user = CustomUser.objects.create_user(email='bench-upload@example.com', password='bench')
+            blog = Blog.objects.create(user=user, content='bench', is_public=True)
+            client = APIClient()
+            client.force_authenticate(user)
+            yield f'10 images x {len(payload) // 1024} KiB, {iterations} iterations'
+
+            def sequential():
+                with transaction.atomic():
+                    for upload in uploads():
+                        BlogImage.objects.create(blog=blog, image=upload)
+
+            def bulk():
+                with transaction.atomic():
+                    bulk_create_blog_images(blog, uploads())
+
+            def post():
+                response = client.post(
+                    '/api/blogs/', {'content': 'bench', 'images': uploads()}, format='multipart', HTTP_HOST='localhost',
+                )
+                assert response.status_code == 201, response.status_code
+
+            for label, func in (('sequential create()', sequential), ('bulk_create_blog_images', bulk),
+                                ('POST /api/blogs/ (10 images)', post)):
+                samples, queries = measure(func, iterations, warmup=2)
+                yield summary(label, samples, queries)
+    finally:
+        shutil.rmtree(media_root)
+
+
+# --------------------------
+# Fast-path serialization
+# --------------------------
+@benchmark('fastpath')
+def fast_serialization(options):
+    """
+    `--rows` (default 1000) мөрийг stock serializer (model instance + field
+    introspection) ба .values() + plan-аар JSON болгох хугацаа (render орсон).
+    """
+    from datetime import date
+
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from .fastpath import BLOG_LIST_PLAN, COMMENT_PLAN, TRIP_PLAN, values_rows
+    from .models import Blog, BlogImage, Comment, Country, CustomUser, Place, Trip
+    from .serializers import BlogListSerializer, CommentSerializer, TripSerializer
+
+    rows = options['rows'] or 1000
+    iterations = min(options['iterations'], 20)
+    renderer = JSONRenderer()
+    meta = {
+        'source': 'blog/a.jpg', 'width': 800, 'height': 600, 'blurhash': 'LKO2?U%2Tw=w',
+        'renditions': {str(w): {'webp': f'renditions/blog/a_{w}.webp'} for w in (320, 640, 1280)},
+    }
+
+    with rolled_back():
+        user = CustomUser.objects.create_user(email='bench-fastpath@example.com', password='bench')
+        request = Request(APIRequestFactory().get('/api/blogs/', HTTP_HOST='localhost'))
+        request.user = user
+        place = Place.objects.create(
+            country=Country.objects.create(name='Mongolia', description=''), name='Khuvsgul', description='',
+        )
+        blogs = Blog.objects.bulk_create(
+            Blog(user=user, place=place, content=f'blog {i}', is_public=True) for i in range(rows)
+        )
+        BlogImage.objects.bulk_create(BlogImage(blog=blog, image='blog/a.jpg', image_meta=meta) for blog in blogs)
+        Comment.objects.bulk_create(
+            Comment(user=user, blog=blog, content='nice') for blog in blogs for _ in range(3)
+        )
+        Trip.objects.bulk_create(
+            Trip(user=user, place=place, title=f'trip {i}', start_date=date(2026, 7, 1), end_date=date(2026, 7, 10),
+                 image='trips/a.jpg', image_meta=meta)
+            for i in range(rows)
+        )
+        yield f'{rows} rows per list, {iterations} iterations'
+
+        cases = [
+            ('blogs', BLOG_LIST_PLAN, BlogListSerializer, Blog.objects.with_feed_data(
+                user, comment_previews=BlogListSerializer.COMMENT_PREVIEW_COUNT,
+            ).order_by('-created_at', '-id')),
+            ('trips', TRIP_PLAN, TripSerializer, Trip.objects.order_by('-created_at', '-id')),
+            ('comments', COMMENT_PLAN, CommentSerializer,
+             Comment.objects.select_related('user__profile').order_by('-created_at', '-id')[:rows]),
+        ]
+        for label, plan, serializer_class, queryset in cases:
+            def stock():
+                renderer.render(serializer_class(queryset.all(), many=True, context={'request': request}).data)
+
+            def fast():
+                renderer.render(plan.build_many(values_rows(queryset.all(), plan), request))
+
+            samples, queries = measure(stock, iterations, warmup=2)
+            yield summary(f'{label}: {serializer_class.__name__}', samples, queries)
+            samples, queries = measure(fast, iterations, warmup=2)
+            yield summary(f'{label}: plan', samples, queries)
+
+
+# --------------------------
+# Trip status sweep
+# --------------------------
+# end_date өнөөдрөөс ±365 хоног; сүүлийн 30 хоногт дууссан нь шилжүүлээгүй
+# 'planned' (sweep-ийн ажил), түүнээс өмнөх нь өмнөх sweep-үүдээр 'completed'.
+SEED_TRIPS_SQL = """
+INSERT INTO travel_app_trip (
+    user_id, place_id, title, start_date, end_date, status, image_meta, created_at, updated_at
+)
+SELECT (%(user_ids)s::bigint[])[1 + g %% %(users)s], %(place_id)s, 'trip ' || g,
+       end_date - 7, end_date,
+       CASE WHEN end_date < CURRENT_DATE - 30 THEN 'completed' ELSE 'planned' END,
+       '{}'::jsonb, NOW(), NOW()
+FROM (
+    SELECT g, CURRENT_DATE + (g %% 730 - 365) AS end_date
+    FROM generate_series(1, %(rows)s) AS g
+) AS seed
+"""
+
+
+@benchmark('trips')
+def trip_status_sweep(options):
+    """
+    `--rows` (default 10M) trip дээр complete_expired_trips(): batch бүр
+    (status, end_date) index-ээр id авч, нэг UPDATE хийнэ. Дараа нь
+    хийх ажилгүй давтан ажиллуулах хугацаа.
+    """
+    from .models import Country, CustomUser, Place, Trip
+    from .trip_status import complete_expired_trips
+
+    rows = options['rows'] or 10_000_000
+    with rolled_back():
+        users = CustomUser.objects.bulk_create(
+            CustomUser(email=f'bench-trips-{i}@example.com', password='!') for i in range(1000)
+        )
+        place = Place.objects.create(
+            country=Country.objects.create(name='Mongolia', description=''), name='Khuvsgul', description='',
+        )
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(SEED_TRIPS_SQL, {
+                'user_ids': [user.pk for user in users], 'users': len(users), 'place_id': place.pk, 'rows': rows,
+            })
+            cursor.execute('ANALYZE travel_app_trip')
+        expired = Trip.objects.filter(status='planned', end_date__lt=timezone.now().date()).count()
+        yield f'seeded {rows} trips in {time.perf_counter() - start:.1f} s, {expired} expired and planned'
+
+        for batch_size in (5000, 50000):
+            with rolled_back():
+                start = time.perf_counter()
+                completed = complete_expired_trips(batch_size=batch_size)
+                elapsed = time.perf_counter() - start
+                yield (
+                    f'sweep batch_size={batch_size}: {completed} trips in {elapsed:.1f} s '
+                    f'({completed / elapsed:,.0f} rows/s, {-(-completed // batch_size)} batches)'
+                )
+                start = time.perf_counter()
+                complete_expired_trips(batch_size=batch_size)
+                yield f'  re-run (nothing to do): {(time.perf_counter() - start) * 1000:.1f} ms'
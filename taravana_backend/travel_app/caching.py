@@ -0,0 +1,362 @@
+import hashlib
+import json
+import time
+from collections import namedtuple
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .db_router import use_replica
+from .models import (
+    Blog, BlogImage, Comment, Country, CustomUser, Like, Place, Profile, Save, Trip, blog_is_deleting,
+)
+
+
+# --------------------------
+# Scope version counter
+# --------------------------
+def blog_scope(blog_id):
+    # Нэг blog-ийн detail, comment-ууд, like/save төлөв
+    return f'blog:{blog_id}'
+
+
+def saved_scope(user_id):
+    # Хэрэглэгчийн хадгалсан blog-уудын жагсаалт (save/unsave)
+    return f'saved:{user_id}'
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def trip_scope(user_id):
+    return f'trips:{user_id}'
+
+
+def profile_scope(user_id):
+    # Blog, comment-д embed хийгдсэн хэрэглэгч/profile (UserSerializer, AuthorSummarySerializer)
+    return f'profile:{user_id}'
+
+
+# Scope бүр (жишээ нь 'country') version-той. Өгөгдөл өөрчлөгдөхөд version
+# нэмэгдэж, хуучин version-тэй cache key-үүд автоматаар хэрэглэгдэхгүй болно.
+def _version_key(scope):
+    return f'api:version:{scope}'
+
+
+def _modified_key(scope):
+    return f'api:modified:{scope}'
+
+
+def get_version(scope):
+    """Scope-ийн (version, last_modified unix timestamp)-ийг буцаана."""
+    vkey, mkey = _version_key(scope), _modified_key(scope)
+    values = cache.get_many([vkey, mkey])
+    if vkey not in values or mkey not in values:
+        now = int(time.time())
+        # Cache-ээс устсан бол хуучин version-тэй давхцахгүйн тулд цагаар эхлүүлнэ
+        cache.add(vkey, int(time.time() * 1000), None)
+        cache.add(mkey, now, None)
+        values = cache.get_many([vkey, mkey])
+    return values.get(vkey, 0), values.get(mkey, 0)
+
+
+def get_versions(scopes):
+    """get_version()-тэй адил, олон scope-ийг нэг get_many-ээр (шинэ scope-д л нэмэлт дуудалт)."""
+    keys = [(_version_key(scope), _modified_key(scope)) for scope in scopes]
+    values = cache.get_many([key for pair in keys for key in pair])
+    return [
+        (values[vkey], values[mkey]) if vkey in values and mkey in values else get_version(scope)
+        for scope, (vkey, mkey) in zip(scopes, keys)
+    ]
+
+
+def bump_version(scope):
+    vkey = _version_key(scope)
+    if not cache.add(vkey, int(time.time() * 1000), None):
+        try:
+            cache.incr(vkey)
+        except ValueError:
+            cache.set(vkey, int(time.time() * 1000), None)
+    cache.set(_modified_key(scope), int(time.time()), None)
+
+
+# --------------------------
+# max(updated_at) + count validator
+# --------------------------
+# Blog-ийн тоолуур (models.bump_blog_counter, toggles), засвар болон embed
+# хийгдсэн өгөгдлийн өөрчлөлт (touch_blogs) бүр Blog.updated_at-ийг
+# шинэчилдэг тул жагсаалтын хувьд scope-ийн оронд ашиглаж болно.
+Freshness = namedtuple('Freshness', 'latest count ids')
+
+
+def freshness(queryset):
+    """Queryset-ийн max(updated_at) ба тоо: нэг aggregate query."""
+    values = queryset.order_by().aggregate(latest=Max('updated_at'), count=Count('pk'))
+    return Freshness(values['latest'], values['count'], '')
+
+
+def rows_freshness(rows):
+    """Хуудасны `{'id', 'updated_at'}` мөрүүдээс; id-ууд нь хуудсанд орсон/гарсан мөрийг илэрхийлнэ."""
+    rows = list(rows)
+    latest = max((row['updated_at'] for row in rows), default=None)
+    ids = hashlib.md5(','.join(str(row['id']) for row in rows).encode()).hexdigest()
+    return Freshness(latest, len(rows), ids)
+
+
+# Blog-уудад embed хийгдсэн хэрэглэгчдийн (зохиогч, сэтгэгдэл бичигч) profile
+# version: profile өөрчлөгдөхөд blog бүрийг touch хийлгүйгээр ETag өөрчлөгдөнө.
+EmbeddedProfiles = namedtuple('EmbeddedProfiles', 'user_ids')
+
+
+def embedded_profiles(blog_ids):
+    """`blog_ids` (id жагсаалт эсвэл values('pk') queryset)-ийн зохиогч, comment бичигчид: нэг query."""
+    authors = Blog.objects.filter(pk__in=blog_ids).values_list('user_id', flat=True)
+    commenters = Comment.objects.filter(blog_id__in=blog_ids).values_list('user_id', flat=True)
+    return EmbeddedProfiles(sorted(set(authors.union(commenters))))
+
+
+def touch_blogs(blogs):
+    """
+    Blog-д embed хийгдсэн өгөгдөл (газар, зураг)
+    өөрчлөгдөхөд тухайн blog-уудын updated_at (feed validator, delta sync) ба
+    per-blog scope-ийг шинэчилнэ.
+    """
+    ids = list(blogs.values_list('pk', flat=True).distinct())
+    if ids:
+        Blog.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+        for pk in ids:
+            bump_version(blog_scope(pk))
+
+
+# --------------------------
+# Conditional GET helpers
+# --------------------------
+def make_etag(data):
+    payload = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.md5(payload).hexdigest()
+
+
+def is_not_modified(request, etag, last_modified=None):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or quote_etag(etag) in etags or etag in etags
+
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since and last_modified is not None:
+        since = parse_http_date_safe(if_modified_since)
+        return since is not None and int(last_modified) <= since
+    return False
+
+
+def conditional_response(request, data, etag, last_modified=None):
+    if is_not_modified(request, etag, last_modified):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = quote_etag(etag)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+# --------------------------
+# Response cache mixin
+# --------------------------
+class CachedResponseMixin:
+    """
+    list/retrieve хариуг `cache_scope`-ийн version болон бүтэн URL (query
+    параметрүүдтэй нь)-аар түлхүүрлэн cache-д хадгална. ETag/Last-Modified
+    header нэмж, client дахин шалгахад 304 буцаана.
+    """
+    cache_scope = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    def get_cache_key(self, request, version):
+        params = sorted(request.query_params.lists())
+        raw = f'{request.get_host()}{request.path}?{params}'
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        return f'api:response:{self.cache_scope}:{version}:{digest}'
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        version, last_modified = get_version(self.cache_scope)
+        key = self.get_cache_key(request, version)
+
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            entry = {'data': response.data, 'etag': make_etag(response.data)}
+            # Replica хоцрогдсон байж болох тул тэр хариуг богино хугацаагаар л хадгална
+            timeout = settings.REPLICA_STICKY_SECONDS if use_replica.get() else settings.API_CACHE_TIMEOUT
+            cache.set(key, entry, timeout)
+
+        return conditional_response(request, entry['data'], entry['etag'], last_modified)
+
+
+# --------------------------
+# Conditional GET (version validator)
+# --------------------------
+# Payload-ийг serialize хийлгүйгээр scope-уудын version (эсвэл Freshness, EmbeddedProfiles)-оос
+# ETag гаргана. Хариу хэрэглэгч бүрт өөр тул user id-г ETag-д оруулж,
+# Vary: Authorization нэмнэ.
+def _validator(scope):
+    if isinstance(scope, Freshness):
+        latest = int(scope.latest.timestamp()) if scope.latest else 0
+        return f'{scope.count}@{scope.latest}#{scope.ids}', latest
+    if isinstance(scope, EmbeddedProfiles):
+        versions = get_versions([profile_scope(pk) for pk in scope.user_ids])
+        token = ','.join(f'{pk}:{version}' for pk, (version, _) in zip(scope.user_ids, versions))
+        return hashlib.md5(token.encode()).hexdigest(), max((modified for _, modified in versions), default=0)
+    version, modified = get_version(scope)
+    return str(version), modified
+
+
+def scoped_validators(request, scopes):
+    validators = [_validator(scope) for scope in scopes]
+    raw = f'{request.user.pk}:{request.get_full_path()}:' + ','.join(token for token, _ in validators)
+    etag = hashlib.md5(raw.encode()).hexdigest()
+    last_modified = max(modified for _, modified in validators)
+    return etag, last_modified
+
+
+def conditional_view_response(request, scopes, handler, *args, **kwargs):
+    etag, last_modified = scoped_validators(request, scopes)
+    if is_not_modified(request, etag, last_modified):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = handler(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+    response['ETag'] = quote_etag(etag)
+    response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Authorization',))
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ModelViewSet-ийн list/retrieve-д 304 дэмжлэг нэмнэ. View нь
+    `get_etag_scopes()`-оор хамаарах scope (эсвэл Freshness)-уудаа буцаана.
+    """
+
+    def get_etag_scopes(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        return conditional_view_response(request, self.get_etag_scopes(), super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_view_response(request, self.get_etag_scopes(), super().retrieve, *args, **kwargs)
+
+
+def conditional_get(get_scopes):
+    """Function view-д зориулсан хувилбар: @conditional_get(lambda request: [...])"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            scopes = get_scopes(request, *args, **kwargs)
+            return conditional_view_response(request, scopes, view, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --------------------------
+# Invalidation
+# --------------------------
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+def invalidate_country_cache(sender, **kwargs):
+    bump_version('country')
+
+
+@receiver(post_save, sender=Place)
+@receiver(post_delete, sender=Place)
+def invalidate_place_cache(sender, instance, **kwargs):
+    bump_version('place')
+    if kwargs['signal'] is post_save:
+        touch_blogs(Blog.objects.filter(place=instance))  # blog-ууд place-ийг embed хийдэг
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+def invalidate_blog_cache(sender, instance, **kwargs):
+    bump_version(blog_scope(instance.pk))
+    bump_version(user_scope(instance.user_id))  # /api/me/ blog_count
+
+
+@receiver(post_save, sender=BlogImage)
+@receiver(post_delete, sender=BlogImage)
+def invalidate_blog_image_cache(sender, instance, **kwargs):
+    touch_blogs(Blog.objects.filter(pk=instance.blog_id))
+
+
+# Тоолуурын UPDATE (models.bump_blog_counter) blog-ийн updated_at-ийг шинэчилнэ
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_blog_relation_cache(sender, instance, origin=None, **kwargs):
+    # Blog хамт устаж байвал түүний post_delete blog_scope-ийг шинэчилнэ
+    if not blog_is_deleting(instance, origin):
+        bump_version(blog_scope(instance.blog_id))
+
+
+@receiver(post_save, sender=Save)
+@receiver(post_delete, sender=Save)
+def invalidate_save_cache(sender, instance, origin=None, **kwargs):
+    if not blog_is_deleting(instance, origin):
+        bump_version(blog_scope(instance.blog_id))
+    bump_version(saved_scope(instance.user_id))  # хадгалсан хэрэглэгчийн жагсаалт
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_delete, sender=Trip)
+def invalidate_trip_cache(sender, instance, **kwargs):
+    if instance.user_id:
+        bump_version(trip_scope(instance.user_id))
+        bump_version(user_scope(instance.user_id))  # /api/me/ trip_count
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=Profile)
+def invalidate_user_cache(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    user_id = instance.pk if sender is CustomUser else instance.user_id
+    bump_version(user_scope(user_id))
+    # Blog, comment-д embed хийгдсэн profile: blog-уудын ETag embedded_profiles()-ээр
+    bump_version(profile_scope(user_id))
+
+
+# queryset.update() post_save илгээдэггүй: шууд UPDATE хийсэн газраас
+# (images.process_image) invalidate_saved(instance)-ээр дуудна.
+SAVE_INVALIDATORS = {
+    Country: invalidate_country_cache,
+    Place: invalidate_place_cache,
+    BlogImage: invalidate_blog_image_cache,
+    Trip: invalidate_trip_cache,
+    Profile: invalidate_user_cache,
+}
+
+
+def invalidate_saved(instance):
+    sender = type(instance)
+    SAVE_INVALIDATORS[sender](sender, instance=instance, signal=post_save)
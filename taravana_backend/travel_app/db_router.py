@@ -0,0 +1,158 @@
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .authentication import ClaimsJWTAuthentication
+
+REPLICA_ALIAS = 'replica'
+
+# Тухайн request-ийн уншилтыг replica руу илгээх эсэх
+use_replica = ContextVar('use_replica', default=False)
+
+
+# --------------------------
+# Router
+# --------------------------
+class ReplicaRouter:
+    """
+    ReplicaRoutingMiddleware зөвшөөрсөн request-ийн уншилтыг 'replica' alias
+    руу, бусад бүх уншилт/бичилтийг 'default' руу илгээнэ.
+    """
+
+    def db_for_read(self, model, **hints):
+        if use_replica.get() and REPLICA_ALIAS in settings.DATABASES:
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # replica нь default-ийн хуулбар
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+# --------------------------
+# Middleware
+# --------------------------
+_jwt = ClaimsJWTAuthentication()
+
+
+def _pin_key(user_id):
+    return f'db:pinned:{user_id}'
+
+
+def _token_user_id(request):
+    # Pin хийхэд зөвхөн id хэрэгтэй: гарын үсэг шалгасан token-оос, DB-гүй
+    header = _jwt.get_header(request)
+    raw_token = _jwt.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        return _jwt.get_validated_token(raw_token)[jwt_settings.USER_ID_CLAIM]
+    except Exception:
+        return None
+
+
+def _request_user_id(request):
+    # JWT бол DB-д хандахгүй; session хэрэглэгчийг бас дэмжинэ
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return _token_user_id(request)
+
+
+async def _arequest_user_id(request):
+    # AuthenticationMiddleware-ийн request.auser() session-ийг async-аар уншина
+    if hasattr(request, 'auser'):
+        user = await request.auser()
+        if user.is_authenticated:
+            return user.pk
+    return _token_user_id(request)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    REPLICA_READ_VIEWS-д байгаа url name-тэй GET/HEAD request-ийг replica-аас
+    уншуулна. Хэрэглэгч бичилт хийсний дараа REPLICA_STICKY_SECONDS хугацаанд
+    (read-your-writes) түүний бүх уншилт default руу явна.
+
+    Sync ба async аль алинд ажиллана (ASGI дээр thread солихгүй).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django process_view-ийг middleware-ийн горимд тааруулж дуудна
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.reset(request)
+
+        if self.pins(request, response):
+            user_id = _request_user_id(request)
+            if user_id is not None:
+                cache.set(_pin_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.reset(request)
+
+        if self.pins(request, response):
+            user_id = await _arequest_user_id(request)
+            if user_id is not None:
+                await cache.aset(_pin_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.reads_replica(request):
+            return None
+        user_id = _request_user_id(request)
+        if user_id is not None and cache.get(_pin_key(user_id)):
+            return None
+        request._replica_token = use_replica.set(True)
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if not self.reads_replica(request):
+            return None
+        user_id = await _arequest_user_id(request)
+        if user_id is not None and await cache.aget(_pin_key(user_id)):
+            return None
+        request._replica_token = use_replica.set(True)
+        return None
+
+    @staticmethod
+    def reads_replica(request):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        match = request.resolver_match
+        return match is not None and match.url_name in settings.REPLICA_READ_VIEWS
+
+    @staticmethod
+    def pins(request, response):
+        return request.method not in SAFE_METHODS and response.status_code < 400
+
+    @staticmethod
+    def reset(request):
+        token = getattr(request, '_replica_token', None)
+        if token is not None:
+            use_replica.reset(token)
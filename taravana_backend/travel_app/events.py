@@ -0,0 +1,165 @@
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Blog, Comment, Like, Save, blog_is_deleting
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # RedisBroker-т л хэрэгтэй
+    aioredis = None
+
+
+def blog_topic(blog_id):
+    return f'blog:{blog_id}'
+
+
+def user_topic(user_id):
+    return f'user:{user_id}'
+
+
+# --------------------------
+# Brokers
+# --------------------------
+class InProcessBroker:
+    """
+    Нэг process доторх pub/sub. publish() нь аль ч thread-ээс (signal,
+    on_commit) дуудагдаж болно; subscriber бүрийн event loop руу
+    call_soon_threadsafe-ээр дамжуулна. Олон worker-тэй бол RedisBroker.
+    """
+    QUEUE_SIZE = 100
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}  # topic -> {(loop, queue)}
+
+    def publish(self, topic, event):
+        with self.lock:
+            targets = list(self.subscribers.get(topic, ()))
+        for loop, queue in targets:
+            loop.call_soon_threadsafe(self._put, queue, event)
+
+    @staticmethod
+    def _put(queue, event):
+        if not queue.full():  # удаан client-ийн event-ийг хаяна
+            queue.put_nowait(event)
+
+    async def subscribe(self, topics):
+        """Event-үүдийг (dict) yield хийнэ; generator хаагдахад бүртгэлээс гарна."""
+        loop = asyncio.get_running_loop()
+        entry = (loop, asyncio.Queue(self.QUEUE_SIZE))
+        with self.lock:
+            for topic in topics:
+                self.subscribers.setdefault(topic, set()).add(entry)
+        try:
+            while True:
+                yield await entry[1].get()
+        finally:
+            with self.lock:
+                for topic in topics:
+                    subscribers = self.subscribers.get(topic)
+                    if subscribers is not None:
+                        subscribers.discard(entry)
+                        if not subscribers:
+                            del self.subscribers[topic]
+
+
+class RedisBroker:
+    """Олон worker/host-ийн хооронд EVENT_BROKER_URL (Redis pub/sub)-аар түгээнэ."""
+
+    def __init__(self):
+        if aioredis is None:
+            raise RuntimeError("RedisBroker requires the 'redis' package")
+        import redis
+        self.url = settings.EVENT_BROKER_URL
+        self.client = redis.Redis.from_url(self.url)
+
+    def publish(self, topic, event):
+        self.client.publish(topic, json.dumps(event))
+
+    async def subscribe(self, topics):
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(*topics)
+        try:
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    yield json.loads(message['data'])
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+            await client.aclose()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.EVENT_BROKER)()
+    return _broker
+
+
+# --------------------------
+# Publishing
+# --------------------------
+def publish_blog_event(event_type, blog_id, owner_id=None, **data):
+    """
+    Commit хийгдсэний дараа blog-ийг үзэж байгаа болон эзэнд нь event илгээнэ.
+    Save нь хувийн тул зөвхөн blog-ийн эзэнд очно.
+    """
+    def send():
+        owner = owner_id
+        if owner is None:
+            owner = Blog.objects.filter(pk=blog_id).values_list('user_id', flat=True).first()
+        event = {'type': event_type, 'blog': blog_id, **data}
+        broker = get_broker()
+        if not event_type.startswith('save.'):
+            broker.publish(blog_topic(blog_id), event)
+        if owner is not None:
+            broker.publish(user_topic(owner), event)
+
+    transaction.on_commit(send)
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment_saved(sender, instance, created, **kwargs):
+    publish_blog_event(
+        'comment.created' if created else 'comment.updated', instance.blog_id,
+        id=instance.pk, user=instance.user_id, content=instance.content,
+        created_at=instance.created_at.isoformat(),
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def publish_comment_deleted(sender, instance, origin=None, **kwargs):
+    if blog_is_deleting(instance, origin):
+        return
+    publish_blog_event('comment.deleted', instance.blog_id, id=instance.pk, user=instance.user_id)
+
+
+# Like/Save-ийн toggle (PostgreSQL raw SQL) signal илгээхгүй тул
+# travel_app.toggles өөрөө publish_blog_event дуудна.
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Save)
+def publish_relation_created(sender, instance, created, **kwargs):
+    if created:
+        publish_blog_event(f'{sender._meta.model_name}.created', instance.blog_id, user=instance.user_id)
+
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Save)
+def publish_relation_deleted(sender, instance, origin=None, **kwargs):
+    if blog_is_deleting(instance, origin):
+        return
+    publish_blog_event(f'{sender._meta.model_name}.deleted', instance.blog_id, user=instance.user_id)
@@ -0,0 +1,250 @@
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .metrics import timed_serialization
+from .models import BlogImage, Comment
+from .serializers import BlogListSerializer, image_renditions, media_url
+
+# --------------------------
+# Read-only fast path
+# --------------------------
+# Stock serializer-ууд мөр бүрт model instance үүсгэж, field бүрийг
+# introspect хийдэг. Энд serializer бүрийн гаралтыг урьдчилан тодорхойлсон
+# "plan" болгож, .values() мөрөөс dict-ийг шууд угсарна. Гаралт нь
+# харгалзах serializer-тэй яг ижил байх ёстой.
+
+_datetime = serializers.DateTimeField().to_representation
+_date = serializers.DateField().to_representation
+
+
+def _file(name, request):
+    return media_url(name, request) if name else None
+
+
+def _renditions(meta, request):
+    return image_renditions(meta, request)
+
+
+class Col:
+    def __init__(self, key, lookup=None, convert=None):
+        self.key = key
+        self.lookup = lookup or key
+        self.convert = convert
+
+
+class Nested:
+    """FK/OneToOne-оор холбогдсон нэг объект (values()-д join-оор орно)."""
+
+    def __init__(self, key, relation, plan, nullable=False):
+        self.key = key
+        self.relation = relation
+        self.plan = plan
+        self.nullable = nullable
+
+
+class Many:
+    """Reverse FK жагсаалт: эцэг мөрүүдийн id-аар нэг нэмэлт query."""
+
+    def __init__(self, key, fk, plan, queryset, limit=None):
+        self.key = key
+        self.fk = fk
+        self.plan = plan
+        self.queryset = queryset
+        self.limit = limit
+
+    def fetch(self, parent_ids, request):
+        qs = self.queryset().filter(**{f'{self.fk}__in': parent_ids})
+        if self.limit:
+            qs = qs.annotate(
+                _row_number=Window(
+                    RowNumber(),
+                    partition_by=[F(self.fk)],
+                    order_by=[F('created_at').desc(), F('id').desc()],
+                )
+            ).filter(_row_number__lte=self.limit)
+
+        grouped = {}
+        for row in qs.values(self.fk, *self.plan.lookups()):
+            grouped.setdefault(row[self.fk], []).append(self.plan.build(row, request))
+        return grouped
+
+
+class Plan:
+    def __init__(self, *columns):
+        self.columns = columns
+
+    def lookups(self, prefix=''):
+        for column in self.columns:
+            if isinstance(column, Col):
+                yield prefix + column.lookup
+            elif isinstance(column, Nested):
+                yield from column.plan.lookups(f'{prefix}{column.relation}__')
+
+    def build(self, row, request, prefix='', related=None):
+        data = {}
+        for column in self.columns:
+            if isinstance(column, Col):
+                value = row[prefix + column.lookup]
+                data[column.key] = column.convert(value, request) if column.convert and value is not None else value
+            elif isinstance(column, Nested):
+                nested_prefix = f'{prefix}{column.relation}__'
+                if column.nullable and row[nested_prefix + 'id'] is None:
+                    data[column.key] = None
+                else:
+                    data[column.key] = column.plan.build(row, request, nested_prefix)
+            else:
+                data[column.key] = related[column.key].get(row['id'], [])
+        return data
+
+    def build_many(self, rows, request):
+        rows = list(rows)
+        with timed_serialization():
+            many = [c for c in self.columns if isinstance(c, Many)]
+            related = {}
+            if many and rows:
+                ids = [row['id'] for row in rows]
+                related = {c.key: c.fetch(ids, request) for c in many}
+            return [self.build(row, request, related=related) for row in rows]
+
+
+def _convert(fn):
+    # None биш утгад л дуудагдана
+    return lambda value, request: fn(value)
+
+
+# --------------------------
+# Plans (serializers.py-тай ижил дараалал, түлхүүр)
+# --------------------------
+PROFILE_PLAN = Plan(                    # ProfileSerializer
+    Col('username'),
+    Col('bio'),
+    Col('profile_img', convert=_file),
+    Col('profile_img_url', 'profile_img', convert=_file),
+    Col('image_meta', convert=_renditions),
+    Col('phone'),
+    Col('address'),
+)
+
+USER_PLAN = Plan(                       # UserSerializer
+    Col('id'),
+    Col('email'),
+    Col('first_name'),
+    Col('last_name'),
+    Col('role'),
+    Nested('profile', 'profile', PROFILE_PLAN),
+)
+
+COMMENT_PLAN = Plan(                    # CommentSerializer
+    Col('id'),
+    Nested('user', 'user', USER_PLAN),
+    Col('content'),
+    Col('created_at', convert=_convert(_datetime)),
+)
+
+TRIP_PLAN = Plan(                       # TripSerializer
+    Col('id'),
+    Col('image_meta', convert=_renditions),
+    Col('start_date', convert=_convert(_date)),
+    Col('title'),
+    Col('end_date', convert=_convert(_date)),
+    Col('budget'),
+    Col('image', convert=_file),
+    Col('status'),
+    Col('notes'),
+    Col('created_at', convert=_convert(_datetime)),
+    Col('updated_at', convert=_convert(_datetime)),
+    Col('user'),
+    Col('place'),
+)
+
+AUTHOR_SUMMARY_PLAN = Plan(             # AuthorSummarySerializer
+    Col('id'),
+    Nested('profile', 'profile', Plan(
+        Col('username'),
+        Col('profile_img', convert=_file),
+    )),
+)
+
+COMMENT_PREVIEW_PLAN = Plan(            # CommentPreviewSerializer
+    Col('id'),
+    Nested('user', 'user', AUTHOR_SUMMARY_PLAN),
+    Col('content'),
+    Col('created_at', convert=_convert(_datetime)),
+)
+
+BLOG_LIST_PLAN = Plan(                  # BlogListSerializer
+    Col('id'),
+    Nested('user', 'user', AUTHOR_SUMMARY_PLAN),
+    Nested('place', 'place', Plan(Col('id'), Col('name'), Col('country')), nullable=True),
+    Col('content'),
+    Many(
+        'images', 'blog_id',
+        Plan(Col('image', convert=_file), Col('image_meta', convert=_renditions)),
+        lambda: BlogImage.objects.order_by('id'),
+    ),
+    Col('created_at', convert=_convert(_datetime)),
+    Col('is_public'),
+    Col('likes_count'),
+    Col('saves_count'),
+    Col('is_liked', 'liked_by_user'),
+    Col('is_saved', 'saved_by_user'),
+    Col('comment_count', 'comments_count'),
+    Many(
+        'comments', 'blog_id',
+        COMMENT_PREVIEW_PLAN,
+        lambda: Comment.objects.order_by('-created_at', '-id'),
+        limit=BlogListSerializer.COMMENT_PREVIEW_COUNT,
+    ),
+)
+
+
+def fast_path_enabled(request):
+    # ?fields= / ?expand= нь stock serializer-ээр л ажиллана
+    params = request.query_params
+    return settings.API_FAST_SERIALIZATION and 'fields' not in params and 'expand' not in params
+
+
+def values_rows(queryset, plan, extra=()):
+    """
+    values()-д prefetch_related хэрэггүй (Many өөрөө ачаална). `extra`-д
+    CursorPagination-ий эрэмбийн талбаруудыг (trending_score г.м.) өгнө:
+    хуудасны байрлалыг мөрөөс уншдаг.
+    """
+    lookups = list(plan.lookups())
+    lookups += [name for name in extra if name not in lookups]
+    return queryset.prefetch_related(None).values(*lookups)
+
+
+def ordering_fields(paginator, request, queryset, view=None):
+    if paginator is None or not hasattr(paginator, 'get_ordering'):
+        return ()
+    return [name.lstrip('-') for name in paginator.get_ordering(request, queryset, view)]
+
+
+class FastListMixin:
+    """
+    `fast_plan`-тай viewset-ийн list()-ийг .values() + plan-аар гүйцэтгэнэ.
+    CursorPagination dict мөрийг дэмждэг тул хуудаслалт хэвээр ажиллана.
+    """
+    fast_plan = None
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(request, self.filter_queryset(self.get_queryset()))
+
+    def list_response(self, request, queryset):
+        if self.fast_plan is None or not fast_path_enabled(request):
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+            return Response(self.get_serializer(queryset, many=True).data)
+
+        extra = ordering_fields(self.paginator, request, queryset, self)
+        rows = values_rows(queryset, self.fast_plan, extra)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.fast_plan.build_many(page, request))
+        return Response(self.fast_plan.build_many(rows, request))
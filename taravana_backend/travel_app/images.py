@@ -0,0 +1,315 @@
+import io
+import logging
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from PIL import Image, ImageOps
+
+from .caching import invalidate_saved
+from .models import BlogImage, Country, Place, Profile, Trip
+
+logger = logging.getLogger(__name__)
+
+RENDITION_WIDTHS = (320, 640, 1280)
+
+# Model бүрийн зургийн талбар. Боловсруулсан мэдээлэл `image_meta`-д хадгалагдана.
+IMAGE_FIELDS = {
+    BlogImage: 'image',
+    Profile: 'profile_img',
+    Trip: 'image',
+    Place: 'image',
+    Country: 'image',
+}
+
+
+# --------------------------
+# Blurhash
+# --------------------------
+BASE83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+
+def _base83(value, length):
+    return ''.join(BASE83[(value // 83 ** (length - i)) % 83] for i in range(1, length + 1))
+
+
+def _srgb_to_linear(value):
+    v = value / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value):
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash(image, x_components=4, y_components=3):
+    """https://blurha.sh алгоритм. 32px хүртэл жижигрүүлсэн хувилбар дээр тооцно."""
+    small = image.convert('RGB')
+    small.thumbnail((32, 32))
+    width, height = small.size
+    pixels = [tuple(_srgb_to_linear(c) for c in px) for px in small.getdata()]
+
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            norm = 1 if i == 0 and j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                cos_y = math.cos(math.pi * j * y / height)
+                for x in range(width):
+                    basis = norm * math.cos(math.pi * i * x / width) * cos_y
+                    pr, pg, pb = pixels[y * width + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = 1 / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(v) for factor in ac for v in factor)
+        quantised = max(0, min(82, int(math.floor(actual_max * 166 - 0.5))))
+        max_value = (quantised + 1) / 166
+    else:
+        quantised, max_value = 0, 1
+    result += _base83(quantised, 1)
+
+    result += _base83((_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4)
+
+    def quant(v):
+        signed = math.copysign(abs(v / max_value) ** 0.5, v)
+        return max(0, min(18, int(math.floor(signed * 9 + 9.5))))
+
+    for r, g, b in ac:
+        result += _base83(quant(r) * 19 * 19 + quant(g) * 19 + quant(b), 2)
+    return result
+
+
+# --------------------------
+# Rendition үүсгэх
+# --------------------------
+def _encode(image, fmt, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **options)
+    return buffer.getvalue()
+
+
+def _rendition_formats():
+    Image.init()
+    formats = [('webp', 'WEBP', {'quality': 80, 'method': 4})]
+    if 'AVIF' in Image.SAVE:  # Pillow libavif-тэй build хийгдсэн үед л
+        formats.append(('avif', 'AVIF', {'quality': 60}))
+    return formats
+
+
+def process_image(model_label, pk):
+    """
+    Зургийг EXIF-гүй болгож, өргөн бүрээр WebP/AVIF rendition, хэмжээ,
+    blurhash-ийг `image_meta`-д бичнэ. Боловсруулах хооронд хэрэглэгч шинэ
+    зураг upload хийсэн бол үр дүнг хаяна (шинэ зургийг өөрийнх нь ажил боловсруулна).
+    """
+    model = apps.get_model(model_label)
+    field_name = IMAGE_FIELDS[model]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return
+
+    storage = field_file.storage
+    original_name = field_file.name
+    with field_file.open('rb') as fh:
+        original = Image.open(fh)
+        original_format = original.format or 'JPEG'
+        if original_format == 'MPO':  # олон утасны JPEG
+            original_format = 'JPEG'
+        has_exif = bool(original.getexif())
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    # Эх файлыг EXIF (GPS гэх мэт)-гүйгээр дахин хадгална
+    written = []
+    if has_exif:
+        rgb = image.convert('RGB') if original_format == 'JPEG' else image
+        field_file.save(os.path.basename(original_name), ContentFile(_encode(rgb, original_format, quality=90)), save=False)
+        written.append(field_file.name)
+
+    stem, _ = os.path.splitext(field_file.name)
+    stem = os.path.join('renditions', stem)
+    source = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    renditions = {}
+    widths = [w for w in RENDITION_WIDTHS if w < image.width] or [image.width]
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = source.resize((width, height), Image.Resampling.LANCZOS)
+        renditions[str(width)] = {}
+        for ext, fmt, options in _rendition_formats():
+            name = storage.save(f'{stem}_{width}.{ext}', ContentFile(_encode(resized, fmt, **options)))
+            renditions[str(width)][ext] = name
+            written.append(name)
+
+    instance.image_meta = {
+        'source': field_file.name,
+        'width': image.width,
+        'height': image.height,
+        'blurhash': blurhash(image),
+        'renditions': renditions,
+    }
+    # Талбар хэвээрээ байвал л бичнэ (instance.save() хуучин нэрийг буцааж бичих байсан).
+    # update() post_save илгээхгүй тул дахин queue-д орохгүй; cache-ийг шууд шинэчилнэ.
+    updated = model.objects.filter(pk=pk, **{field_name: original_name}).update(
+        **{field_name: field_file.name, 'image_meta': instance.image_meta},
+    )
+    if not updated:
+        logger.info("%s #%s image changed while processing; discarding renditions", model_label, pk)
+        for name in written:
+            storage.delete(name)
+        return
+    if has_exif:
+        storage.delete(original_name)
+    invalidate_saved(instance)
+
+
+# --------------------------
+# Background queue
+# --------------------------
+# Process pool-д Django-ийн DB холболтыг fork хийж хуваалцах боломжгүй тул
+# thread pool ашиглана; Pillow decode/resize/encode хийхдээ GIL-ийг чөлөөлдөг.
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_PIPELINE_WORKERS,
+            thread_name_prefix='image-pipeline',
+        )
+    return _executor
+
+
+def _run(model_label, pk):
+    close_old_connections()
+    try:
+        process_image(model_label, pk)
+    except Exception:
+        logger.exception("Image processing failed for %s #%s", model_label, pk)
+    finally:
+        close_old_connections()
+
+
+def enqueue_image(instance):
+    model_label = instance._meta.label
+    pk = instance.pk
+    if settings.IMAGE_PIPELINE_EAGER:
+        transaction.on_commit(lambda: process_image(model_label, pk))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run, model_label, pk))
+
+
+# --------------------------
+# Олон зураг нэг дор
+# --------------------------
+# Django-д on_rollback hook байхгүй: atomic_upload() блок доторх бичсэн
+# файлуудыг thread-ийн stack дээр бүртгэж, блок commit хийгдэлгүй дуусвал устгана.
+_uploads = threading.local()
+
+
+def _delete_files(storage, names):
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception("Could not delete orphaned upload %s", name)
+
+
+@contextmanager
+def atomic_upload(using=None):
+    """
+    transaction.atomic()-тай адил; дотор нь bulk_create_blog_images()-ийн
+    бичсэн файлуудыг блок rollback хийгдвэл (exception эсвэл set_rollback)
+    устгана. Гадна талын өөр atomic_upload() байвал түүнд шилжүүлнэ.
+    """
+    stack = _uploads.__dict__.setdefault('stack', [])
+    written = []
+    stack.append(written)
+    committed = False
+    try:
+        with transaction.atomic(using=using):
+            yield
+            rolled_back = transaction.get_rollback(using=using)
+        committed = not rolled_back  # commit өөрөө алдаа өгвөл энд хүрэхгүй
+    finally:
+        stack.pop()
+        if not committed:
+            for storage, names in written:
+                _delete_files(storage, names)
+        elif stack:
+            stack[-1].extend(written)
+
+
+def _delete_on_rollback(storage, names):
+    stack = getattr(_uploads, 'stack', None)
+    if stack:
+        stack[-1].append((storage, names))
+
+
+def bulk_create_blog_images(blog, files):
+    """
+    Upload хийсэн файлуудыг thread pool-оор зэрэг storage-д бичиж, бүх
+    BlogImage мөрийг нэг bulk_create-ээр оруулна. Дуудагч atomic_upload()
+    дотор ажиллуулна; алдаа гарвал эсвэл transaction rollback хийгдвэл
+    бичсэн файлуудыг устгана.
+    """
+    if not files:
+        return []
+
+    field = BlogImage._meta.get_field('image')
+
+    def store(upload):
+        return field.storage.save(field.generate_filename(None, upload.name), upload)
+
+    # Алдаа гарсан ч бусад бүх future дуусахыг хүлээж, бичсэн файлуудыг нь цуглуулна
+    with ThreadPoolExecutor(max_workers=min(4, len(files))) as pool:
+        futures = [pool.submit(store, upload) for upload in files]
+    names = [future.result() for future in futures if future.exception() is None]
+    errors = [future.exception() for future in futures if future.exception() is not None]
+    try:
+        if errors:
+            raise errors[0]
+        images = BlogImage.objects.bulk_create([BlogImage(blog=blog, image=name) for name in names])
+    except Exception:
+        _delete_files(field.storage, names)
+        raise
+    _delete_on_rollback(field.storage, names)
+
+    # bulk_create post_save илгээдэггүй
+    for image in images:
+        enqueue_image(image)
+    return images
+
+
+@receiver(post_save, sender=BlogImage)
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Trip)
+@receiver(post_save, sender=Place)
+@receiver(post_save, sender=Country)
+def queue_image_processing(sender, instance, **kwargs):
+    field_file = getattr(instance, IMAGE_FIELDS[sender])
+    if field_file and instance.image_meta.get('source') != field_file.name:
+        enqueue_image(instance)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from travel_app.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = (
+        "travel_app.benchmarks-ийн хэмжилтийг ажиллуулна. Өгөгдлөө transaction-д "
+        "үүсгээд rollback хийдэг тул хөгжүүлэлтийн DB дээр ажиллуулж болно."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help=f"Benchmark нэр: {', '.join(sorted(BENCHMARKS))}.")
+        parser.add_argument('--iterations', type=int, default=1000, help="Хэмжилт бүрийн давталт.")
+        parser.add_argument('--rows', type=int, default=None, help="Seed хийх мөрийн тоо (benchmark-аас хамаарна).")
+        parser.add_argument('--concurrency', type=int, default=16, help="HTTP benchmark-ийн зэрэг холболт.")
+        parser.add_argument('--workers', type=int, default=1, help="HTTP benchmark-ийн серверийн процесс.")
+
+    def handle(self, *args, **options):
+        names = options['names'] or sorted(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+        for name in names:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for line in BENCHMARKS[name](options):
+                self.stdout.write(f'  {line}')
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from travel_app.timeline import BACKFILL_LIMIT, build_timeline
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Хэрэглэгчдийн home timeline-ийг материалжуулна (backfill)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help="Зөвхөн энэ user id (олон удаа өгч болно).")
+        parser.add_argument('--limit', type=int, default=BACKFILL_LIMIT,
+                            help="Хэрэглэгч бүрт оруулах сүүлийн нийтийн blog-ийн тоо.")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        if options['user_ids']:
+            users = users.filter(pk__in=options['user_ids'])
+
+        total = 0
+        for user in users.iterator():
+            build_timeline(user, limit=options['limit'])
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f"Built {total} timeline(s)"))
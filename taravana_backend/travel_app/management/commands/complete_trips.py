@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from travel_app.trip_status import complete_expired_trips
+
+
+class Command(BaseCommand):
+    help = (
+        "end_date нь өнгөрсөн 'planned' trip-үүдийг batch-аар 'completed' болгоно. "
+        "Өдөр бүр (шөнө дундын дараа) cron-оор ажиллуулна."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help="Нэг UPDATE-ийн мөрийн тоо.")
+
+    def handle(self, *args, **options):
+        completed = complete_expired_trips(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Completed {completed} trip(s)"))
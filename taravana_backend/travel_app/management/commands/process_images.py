@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from travel_app.images import IMAGE_FIELDS, process_image
+
+
+class Command(BaseCommand):
+    help = "Rendition үүсээгүй (эсвэл файл нь солигдсон) бүх зургийг боловсруулна."
+
+    def handle(self, *args, **options):
+        total = 0
+        for model, field_name in IMAGE_FIELDS.items():
+            rows = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for pk, name, meta in rows.values_list('pk', field_name, 'image_meta').iterator():
+                if meta.get('source') == name:
+                    continue
+                process_image(model._meta.label, pk)
+                total += 1
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} image(s)"))
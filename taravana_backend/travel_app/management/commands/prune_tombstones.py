@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from travel_app.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Delta sync-ийн хуучин tombstone-уудыг устгана. Үүнээс хуучин token-тай "
+        "client бүрэн snapshot авна. Өдөр бүр cron-оор ажиллуулна."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Default: SYNC_TOMBSTONE_RETENTION_DAYS.")
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstone(s)"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from travel_app.search import rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Blog, Place, Trip-ийн search_vector-ийг бүгдийг нь дахин тооцно."
+
+    def handle(self, *args, **options):
+        rebuild_search_vectors()
+        self.stdout.write(self.style.SUCCESS("Search vectors rebuilt"))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from travel_app.models import Blog, Comment, Like, Save
+
+
+def count_of(model):
+    rows = (
+        model.objects.filter(blog=OuterRef('pk'))
+        .order_by()
+        .values('blog')
+        .annotate(c=Count('pk'))
+        .values('c')
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+class Command(BaseCommand):
+    help = "Blog.likes_count / saves_count / comments_count-ийг бодит мөрийн тоотой тулгаж засна."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Зөрүүтэй blog-уудыг зөвхөн тоолно, засахгүй.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = Blog.objects.annotate(
+            real_likes=count_of(Like),
+            real_saves=count_of(Save),
+            real_comments=count_of(Comment),
+        ).exclude(
+            likes_count=F('real_likes'),
+            saves_count=F('real_saves'),
+            comments_count=F('real_comments'),
+        ).values_list('pk', flat=True)
+
+        ids = list(drifted)
+        if options['dry_run']:
+            self.stdout.write(f"{len(ids)} blog counter drifted")
+            return
+
+        fixed = Blog.objects.filter(pk__in=ids).update(
+            likes_count=count_of(Like),
+            saves_count=count_of(Save),
+            comments_count=count_of(Comment),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {fixed} blog(s)"))
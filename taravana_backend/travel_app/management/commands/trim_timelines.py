@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from travel_app.timeline import trim_timelines
+
+
+class Command(BaseCommand):
+    help = (
+        "Home timeline бүрд хамгийн шинэ TIMELINE_MAX_ENTRIES entry-г үлдээж, "
+        "бусдыг устгана. Өдөр бүр cron-оор ажиллуулна."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-entries', type=int, default=None,
+                            help="Хэрэглэгч бүрт үлдээх entry (default: TIMELINE_MAX_ENTRIES).")
+
+    def handle(self, *args, **options):
+        deleted = trim_timelines(max_entries=options['max_entries'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} timeline entr{'y' if deleted == 1 else 'ies'}"))
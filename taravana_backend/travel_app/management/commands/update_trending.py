@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from travel_app.trending import update_trending
+
+
+class Command(BaseCommand):
+    help = (
+        "Blog.trending_score, Place.popularity_score-ийг шинэ идэвхтэй объектуудад "
+        "дахин тооцно. Cron-оор байнга ажиллуулж, like/save устгалтыг тусгахын тулд "
+        "үе үе --full ажиллуулна."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Бүх blog, place-ийг дахин тооцно.")
+
+    def handle(self, *args, **options):
+        blogs, places = update_trending(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f"Scored {blogs} blog(s), {places} place(s)"))
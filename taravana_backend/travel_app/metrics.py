@@ -0,0 +1,275 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+logger = logging.getLogger('travel_app.metrics')
+
+# Latency histogram-ийн хил (секунд)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class QueryBudgetExceeded(Exception):
+    """QUERY_BUDGET_STRICT үед endpoint query-ийн хязгаараа хэтрүүлбэл."""
+
+
+# --------------------------
+# Request бүрийн хэмжилт
+# --------------------------
+class RequestStats:
+    def __init__(self):
+        self.lock = threading.Lock()  # async view-ийн query-ууд өөр thread-д ажиллана
+        self.queries = []  # (sql, seconds)
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.serialize_time = 0.0
+
+    def add_query(self, sql, duration):
+        with self.lock:
+            self.queries.append((sql, duration))
+            self.db_time += duration
+
+
+current_stats = ContextVar('request_stats', default=None)
+# timed_serialization() доторх nested дуудлагыг дахин тоолохгүй
+_serializing = ContextVar('serializing', default=False)
+
+
+def record_query(execute, sql, params, many, context):
+    # connection.execute_wrappers-д суулгана; request-ийн гадна юу ч хийхгүй
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(sql, time.perf_counter() - start)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # Thread бүрийн холболтод (sync_to_async thread-ийнх ч гэсэн) нэг удаа
+    if settings.REQUEST_METRICS and record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def timed_render():
+    """Renderer (JSON encode) хугацааг тухайн request-д нэмнэ."""
+    stats = current_stats.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.render_time += time.perf_counter() - start
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Serializer-ийн to_representation / fast-path Plan.build_many хугацааг
+    тухайн request-д нэмнэ. Дотор нь ажилласан query-ийн хугацаа (lazy
+    relation, Many.fetch) db_time-д орсон тул эндээс хасна.
+    """
+    stats = current_stats.get()
+    if stats is None or _serializing.get():
+        yield
+        return
+    token = _serializing.set(True)
+    db_time = stats.db_time
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _serializing.reset(token)
+        elapsed = time.perf_counter() - start - (stats.db_time - db_time)
+        stats.serialize_time += max(elapsed, 0.0)
+
+
+# --------------------------
+# View бүрийн нийлбэр (process доторх)
+# --------------------------
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def observe(self, view, method, latency, stats):
+        with self.lock:
+            entry = self.views.setdefault((view, method), {
+                'count': 0,
+                'queries': 0,
+                'db_time': 0.0,
+                'render_time': 0.0,
+                'serialize_time': 0.0,
+                'latency': 0.0,
+                'buckets': [0] * len(LATENCY_BUCKETS),
+            })
+            entry['count'] += 1
+            entry['queries'] += len(stats.queries)
+            entry['db_time'] += stats.db_time
+            entry['render_time'] += stats.render_time
+            entry['serialize_time'] += stats.serialize_time
+            entry['latency'] += latency
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    entry['buckets'][i] += 1
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)."""
+        with self.lock:
+            views = {key: dict(value, buckets=list(value['buckets'])) for key, value in self.views.items()}
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+
+        def labels(view, method, **extra):
+            pairs = {'view': view, 'method': method, **extra}
+            return ','.join(f'{k}="{_escape(v)}"' for k, v in pairs.items())
+
+        metric('travana_requests_total', 'counter', 'Requests handled per view.', [
+            f'travana_requests_total{{{labels(v, m)}}} {e["count"]}' for (v, m), e in views.items()
+        ])
+        metric('travana_db_queries_total', 'counter', 'SQL queries executed per view.', [
+            f'travana_db_queries_total{{{labels(v, m)}}} {e["queries"]}' for (v, m), e in views.items()
+        ])
+        metric('travana_db_duration_seconds_total', 'counter', 'Time spent in SQL per view.', [
+            f'travana_db_duration_seconds_total{{{labels(v, m)}}} {e["db_time"]:.6f}'
+            for (v, m), e in views.items()
+        ])
+        metric('travana_serialize_duration_seconds_total', 'counter', 'Time spent serializing (excluding SQL) per view.', [
+            f'travana_serialize_duration_seconds_total{{{labels(v, m)}}} {e["serialize_time"]:.6f}'
+            for (v, m), e in views.items()
+        ])
+        metric('travana_render_duration_seconds_total', 'counter', 'Time spent JSON-encoding responses per view.', [
+            f'travana_render_duration_seconds_total{{{labels(v, m)}}} {e["render_time"]:.6f}'
+            for (v, m), e in views.items()
+        ])
+
+        samples = []
+        for (v, m), e in views.items():
+            for bound, count in zip(LATENCY_BUCKETS, e['buckets']):
+                samples.append(f'travana_request_duration_seconds_bucket{{{labels(v, m, le=bound)}}} {count}')
+            samples.append(f'travana_request_duration_seconds_bucket{{{labels(v, m, le="+Inf")}}} {e["count"]}')
+            samples.append(f'travana_request_duration_seconds_sum{{{labels(v, m)}}} {e["latency"]:.6f}')
+            samples.append(f'travana_request_duration_seconds_count{{{labels(v, m)}}} {e["count"]}')
+        metric('travana_request_duration_seconds', 'histogram', 'Total request latency per view.', samples)
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
+
+
+# --------------------------
+# Middleware
+# --------------------------
+def query_budget(view_name):
+    budgets = settings.QUERY_BUDGETS
+    return budgets.get(view_name, settings.QUERY_BUDGET_DEFAULT)
+
+
+class RequestMetricsMiddleware:
+    """
+    Resolve хийгдсэн view (url name) бүрээр query тоо, DB хугацаа,
+    serialization, render хугацаа, нийт latency-г цуглуулна. SLOW_REQUEST_MS-ээс
+    удаан request-ийг SQL-тай нь log-д бичнэ. Endpoint QUERY_BUDGETS-ийн
+    хязгаараас олон query хийвэл warning log бичнэ, QUERY_BUDGET_STRICT=True
+    (тест) үед QueryBudgetExceeded.
+
+    Тоолуур process бүрт тусдаа: worker бүрийн /metrics/-ийг scrape хийнэ.
+    Sync ба async аль алинд ажиллах тул ASGI дээр async view-ийн өмнө thread
+    солихгүй.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS:
+            return self.get_response(request)
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.observe(request, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS:
+            return await self.get_response(request)
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.observe(request, time.perf_counter() - start, stats)
+        return response
+
+    def observe(self, request, latency, stats):
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        if view == 'metrics':
+            return
+        registry.observe(view, request.method, latency, stats)
+
+        if latency * 1000 >= settings.SLOW_REQUEST_MS:
+            logger.warning(
+                'Slow request %s %s (%s): %.1f ms, %d queries, db %.1f ms, serialize %.1f ms, render %.1f ms\n%s',
+                request.method, request.path, view, latency * 1000, len(stats.queries),
+                stats.db_time * 1000, stats.serialize_time * 1000, stats.render_time * 1000,
+                '\n'.join(f'  [{d * 1000:.1f} ms] {sql}' for sql, d in stats.queries),
+            )
+
+        budget = query_budget(view)
+        if budget is None or len(stats.queries) <= budget:
+            return
+        message = (
+            f'{request.method} {view} executed {len(stats.queries)} queries (budget {budget}):\n'
+            + '\n'.join(sql for sql, _ in stats.queries)
+        )
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning('Query budget exceeded: %s', message)
+
+
+# --------------------------
+# Prometheus endpoint
+# --------------------------
+def metrics_view(request):
+    # Зөвхөн METRICS_ALLOWED_IPS (default: localhost)-аас
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise PermissionDenied
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
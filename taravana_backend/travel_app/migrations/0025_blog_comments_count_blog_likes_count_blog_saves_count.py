@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Blog = apps.get_model("travel_app", "Blog")
+    Like = apps.get_model("travel_app", "Like")
+    Save = apps.get_model("travel_app", "Save")
+    Comment = apps.get_model("travel_app", "Comment")
+
+    def count_of(model):
+        rows = (
+            model.objects.filter(blog=OuterRef("pk"))
+            .order_by()
+            .values("blog")
+            .annotate(c=Count("pk"))
+            .values("c")
+        )
+        return Coalesce(Subquery(rows), 0)
+
+    Blog.objects.update(
+        likes_count=count_of(Like),
+        saves_count=count_of(Save),
+        comments_count=count_of(Comment),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("travel_app", "0024_alter_save_blog_alter_save_user_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blog",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="blog",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="blog",
+            name="saves_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:30
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_search_vectors(apps, schema_editor):
+    Blog = apps.get_model("travel_app", "Blog")
+    Place = apps.get_model("travel_app", "Place")
+    Profile = apps.get_model("travel_app", "Profile")
+    Trip = apps.get_model("travel_app", "Trip")
+
+    def vector(expression, weight):
+        return SearchVector(expression, weight=weight, config="simple")
+
+    place_name = Subquery(Place.objects.filter(pk=OuterRef("place_id")).values("name")[:1])
+    username = Subquery(Profile.objects.filter(user_id=OuterRef("user_id")).values("username")[:1])
+
+    Blog.objects.update(
+        search_vector=vector("content", "A") + vector(place_name, "B") + vector(username, "C")
+    )
+    Place.objects.update(
+        search_vector=vector("name", "A") + vector("tags", "B") + vector("description", "C")
+    )
+    Trip.objects.update(
+        search_vector=vector("title", "A") + vector(place_name, "B") + vector("notes", "C")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("travel_app", "0025_blog_comments_count_blog_likes_count_blog_saves_count"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="blog",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="place",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="blog",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="blog_search_vector_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="place",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="place_search_vector_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="place",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="place_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="trip_search_vector_gin"
+            ),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("travel_app", "0027_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blogimage",
+            name="image_meta",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="country",
+            name="image_meta",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="place",
+            name="image_meta",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="image_meta",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="image_meta",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("travel_app", "0029_timeline_timelineentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blog",
+            name="scored_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="blog",
+            name="trending_score",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="place",
+            name="popularity_score",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="place",
+            name="scored_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="blog",
+            index=models.Index(
+                condition=models.Q(("is_public", True)),
+                fields=["-trending_score", "-id"],
+                name="blog_public_trending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="place",
+            index=models.Index(
+                fields=["-popularity_score", "-id"], name="place_popularity_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("travel_app", "0030_trending_scores"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(fields=["status", "end_date"], name="trip_status_end_date_idx"),
+        ),
+    ]
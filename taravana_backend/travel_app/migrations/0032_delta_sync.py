@@ -0,0 +1,72 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Одоо байгаа мөрийн updated_at = created_at
+    for name in ('Blog', 'Trip'):
+        model = apps.get_model('travel_app', name)
+        model.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("travel_app", "0031_trip_status_end_date_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blog",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("model", models.CharField(max_length=20)),
+                ("object_id", models.BigIntegerField()),
+                ("user_id", models.BigIntegerField(blank=True, null=True)),
+                ("blog_id", models.BigIntegerField(blank=True, null=True)),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["user_id", "deleted_at"], name="tombstone_user_deleted_idx"),
+                    models.Index(fields=["blog_id", "deleted_at"], name="tombstone_blog_deleted_idx"),
+                    models.Index(fields=["deleted_at"], name="tombstone_deleted_idx"),
+                ],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="blog",
+            index=models.Index(fields=["user", "updated_at"], name="blog_user_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(fields=["user", "updated_at"], name="trip_user_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["blog", "updated_at"], name="comment_blog_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(fields=["user", "created_at"], name="like_user_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="save",
+            index=models.Index(fields=["user", "created_at"], name="save_user_created_idx"),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:37
+
+from django.db import migrations, models
+
+
+def backfill_horizon(apps, schema_editor):
+    # Одоо байгаа timeline-ууд BACKFILL_LIMIT-ээр тасардаг байсан тул
+    # хамгийн хуучин entry-ээс өмнөхийг live query уншина
+    Timeline = apps.get_model('travel_app', 'Timeline')
+    TimelineEntry = apps.get_model('travel_app', 'TimelineEntry')
+    oldest = (
+        TimelineEntry.objects.filter(user_id=models.OuterRef('user_id'))
+        .order_by('created_at')
+        .values('created_at')[:1]
+    )
+    Timeline.objects.update(horizon=models.Subquery(oldest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('travel_app', '0032_delta_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeline',
+            name='horizon',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_horizon, migrations.RunPython.noop),
+    ]
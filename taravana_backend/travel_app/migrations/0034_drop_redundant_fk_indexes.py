@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# (table, column, Django-ийн үүсгэсэн FK index) — composite index-үүд бүрхдэг
+FK_INDEXES = [
+    ('travel_app_blog', 'user_id', 'travel_app_blog_user_id_e07772fa'),
+    ('travel_app_comment', 'blog_id', 'travel_app_comment_blog_id_93ae7ce8'),
+    ('travel_app_trip', 'user_id', 'travel_app_trip_user_id_baf56a68'),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('travel_app', '0033_timeline_horizon'),
+    ]
+
+    # AlterField нь FK constraint-ийг устгаж дахин нэмдэг (бүх мөрийг дахин
+    # шалгана); зөвхөн index-ийг устгана.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    f'DROP INDEX IF EXISTS "{index}";',
+                    f'CREATE INDEX IF NOT EXISTS "{index}" ON "{table}" ("{column}");',
+                )
+                for table, column, index in FK_INDEXES
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='blog',
+                    name='user',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='blogs', to=settings.AUTH_USER_MODEL),
+                ),
+                migrations.AlterField(
+                    model_name='comment',
+                    name='blog',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='travel_app.blog'),
+                ),
+                migrations.AlterField(
+                    model_name='trip',
+                    name='user',
+                    field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='trips', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+    ]
@@ -3,12 +3,26 @@ from django.contrib.auth.models import User, AbstractUser
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.db.models import Case, Count, Exists, F, OuterRef, Prefetch, Q, Subquery, Sum, Value, When
+from django.db.models.lookups import LessThan
+from django.db.models.functions import Coalesce, Greatest
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import BaseUserManager, AbstractUser
 from django.db import models
 
 
 
+def count_subquery(model, fk):
+    """`model`-ийн `fk`-ээр OuterRef('pk')-д хамаарах мөрийн тоо (0 default)."""
+    rows = (
+        model.objects.filter(**{fk: OuterRef('pk')}).order_by()
+        .values(fk).annotate(c=Count('pk')).values('c')
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -26,6 +40,26 @@ class CustomUserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    def with_stats(self, extended=False):
+        """
+        /api/me/-д: profile-ийг join хийж, blog/trip тоог subquery-гээр нэг
+        query-д авна. `extended` бол авсан like, хадгалсан blog-ийн тоог нэмнэ.
+        """
+        qs = self.get_queryset().select_related('profile').annotate(
+            blog_count=count_subquery(Blog, 'user'),
+            trip_count=count_subquery(Trip, 'user'),
+        )
+        if extended:
+            likes_received = (
+                Blog.objects.filter(user=OuterRef('pk')).order_by()
+                .values('user').annotate(total=Sum('likes_count')).values('total')
+            )
+            qs = qs.annotate(
+                likes_received=Coalesce(Subquery(likes_received), 0),
+                saved_count=count_subquery(Save, 'user'),
+            )
+        return qs
+
 
 class CustomUser(AbstractUser):
     ROLE_CHOICES = (
@@ -57,6 +91,8 @@ class Country(models.Model):
     name = models.CharField(max_length=150)
     description = models.TextField()
     image = models.ImageField(upload_to='countries/',blank=True, null=True)
+    # Зургийн pipeline-ийн үр дүн (хэмжээ, blurhash, rendition-ууд), travel_app.images
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -71,6 +107,8 @@ class Profile(models.Model):
     username = models.CharField(max_length=100, blank=True, null=True, unique=True)
     bio = models.TextField()
     profile_img = models.ImageField(upload_to='profile/', blank=True, null=True)
+    # Зургийн pipeline-ийн үр дүн (хэмжээ, blurhash, rendition-ууд), travel_app.images
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     phone = models.IntegerField(blank=True, null=True)
     address = models.CharField(max_length=255, blank=True, null=True)
     last_name = models.CharField(max_length=100, blank=True, null=True)
@@ -85,9 +123,23 @@ class Place(models.Model):
     name = models.CharField(max_length=150)
     description = models.TextField()
     image = models.ImageField(upload_to='place/', blank=True, null=True)
+    # Зургийн pipeline-ийн үр дүн (хэмжээ, blurhash, rendition-ууд), travel_app.images
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     tags = models.CharField(max_length=255, blank=True, null=True)
     priority = models.CharField(max_length=20, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # travel_app.trending (`manage.py update_trending`)
+    popularity_score = models.FloatField(default=0, editable=False)
+    scored_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='place_search_vector_gin'),
+            GinIndex(fields=['name'], name='place_name_trgm', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['-popularity_score', '-id'], name='place_popularity_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -95,12 +147,83 @@ class Place(models.Model):
 # --------------------------
 # Blog
 # --------------------------
+class BlogQuerySet(models.QuerySet):
+    def with_feed_data(self, user, comment_previews=None):
+        """
+        Feed-д хэрэгтэй is_liked/is_saved болон холбоосуудыг нэг дор ачаална.
+        `comment_previews=N` өгвөл бүх comment биш, blog бүрийн сүүлийн N-ийг
+        `comment_previews` attribute-д ачаална.
+        """
+        comments = Comment.objects.select_related('user', 'user__profile').order_by('-created_at', '-id')
+        if comment_previews:
+            comments_prefetch = Prefetch('comments', queryset=comments[:comment_previews], to_attr='comment_previews')
+        else:
+            comments_prefetch = Prefetch('comments', queryset=comments)
+
+        qs = self.select_related(
+            'place', 'user', 'user__profile'
+        ).prefetch_related('blog_image', comments_prefetch)
+
+        if user is not None and user.is_authenticated:
+            return qs.annotate(
+                liked_by_user=Exists(Like.objects.filter(blog=OuterRef('pk'), user=user)),
+                saved_by_user=Exists(Save.objects.filter(blog=OuterRef('pk'), user=user)),
+            )
+        return qs.annotate(
+            liked_by_user=Value(False, output_field=models.BooleanField()),
+            saved_by_user=Value(False, output_field=models.BooleanField()),
+        )
+
+
 class Blog(models.Model):
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='blogs')
+    # (user, ...) composite index-үүд FK-г бүрхдэг тул тусдаа index үүсгэхгүй
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='blogs', db_index=False)
     place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='blogs', blank=True, null=True)
     content = models.TextField()
     is_public = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Delta sync (/api/sync/): тоолуур өөрчлөгдөхөд ч шинэчлэгдэнэ
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Denormalized тоолуурууд: Like/Save/Comment-ийн signal-аар F() ашиглан шинэчлэгдэнэ.
+    # Зөрүү гарвал `manage.py reconcile_blog_counters` ажиллуулна.
+    likes_count = models.PositiveIntegerField(default=0)
+    saves_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # travel_app.trending (`manage.py update_trending`)
+    trending_score = models.FloatField(default=0, editable=False)
+    scored_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = BlogQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='blog_search_vector_gin'),
+            # Нийтийн feed: is_public=True ... ORDER BY created_at DESC, id DESC
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=Q(is_public=True),
+                name='blog_public_created_idx',
+            ),
+            # ?user_id= профайлын blog-ууд
+            models.Index(fields=['user', '-created_at', '-id'], name='blog_user_created_idx'),
+            models.Index(fields=['user', 'updated_at'], name='blog_user_updated_idx'),
+            # /api/blogs/trending/
+            models.Index(
+                fields=['-trending_score', '-id'],
+                condition=Q(is_public=True),
+                name='blog_public_trending_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # is_public өөрчлөгдсөнийг timeline signal мэдэхийн тулд
+        instance._loaded_is_public = instance.__dict__.get('is_public')
+        return instance
 
     def __str__(self):
         return self.content
@@ -108,6 +231,8 @@ class Blog(models.Model):
 class BlogImage(models.Model):
     blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='blog_image')
     image = models.ImageField(upload_to='blog/', blank=True, null=True)
+    # Зургийн pipeline-ийн үр дүн (хэмжээ, blurhash, rendition-ууд), travel_app.images
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
 
 
 # --------------------------
@@ -119,46 +244,119 @@ class Like(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     class Meta:
         unique_together = ('blog', 'user')
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='like_user_created_idx'),
+        ]
 
 
 # --------------------------
 # Trip
 # --------------------------
+def trip_status(end_date, today=None):
+    """end_date өнгөрсөн бол 'completed', үгүй бол 'planned'."""
+    today = today or timezone.now().date()
+    return 'completed' if end_date < today else 'planned'
+
+
+class TripQuerySet(models.QuerySet):
+    """
+    save()-г алгасдаг bulk_create/bulk_update/update ч гэсэн end_date-аас
+    status-ийг тооцно. Хугацаа нь өнгөрсөн trip-үүдийг
+    `manage.py complete_trips` (travel_app.trip_status) шилжүүлнэ.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        today = timezone.now().date()
+        for obj in objs:
+            obj.status = trip_status(obj.end_date, today)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        fields = list(fields)
+        if 'end_date' in fields:
+            objs = list(objs)
+            today = timezone.now().date()
+            for obj in objs:
+                obj.status = trip_status(obj.end_date, today)
+            if 'status' not in fields:
+                fields.append('status')
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if 'end_date' in kwargs and 'status' not in kwargs:
+            end_date = kwargs['end_date']
+            today = timezone.now().date()
+            if hasattr(end_date, 'resolve_expression'):
+                # F()/expression: UPDATE дотор CASE-ээр тооцно
+                kwargs['status'] = Case(
+                    When(LessThan(end_date, Value(today)), then=Value('completed')),
+                    default=Value('planned'),
+                )
+            else:
+                kwargs['status'] = trip_status(end_date, today)
+        return super().update(**kwargs)
+
+
 class Trip(models.Model):
     STATUS_CHOICES = (
         ('planned', 'planned'),
         ('completed', 'completed'),
     )
 
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='trips',blank=True, null=True)
+    # (user, ...) composite index-үүд FK-г бүрхдэг тул тусдаа index үүсгэхгүй
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='trips',blank=True, null=True, db_index=False)
     place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='trips')
     start_date = models.DateField()
     title = models.CharField(max_length=100, blank=False, null=False)
     end_date = models.DateField()
     budget = models.IntegerField(blank=True, null=True)
     image = models.ImageField(upload_to='trips/', blank=True, null=True)
+    # Зургийн pipeline-ийн үр дүн (хэмжээ, blurhash, rendition-ууд), travel_app.images
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='planned')
     def save(self, *args, **kwargs):
-        today  = timezone.now().date()
-        if self.end_date < today:
-            self.status = 'completed'
-        else:
-            self.status = 'planned'
+        self.status = trip_status(self.end_date)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'end_date' in update_fields and 'status' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'status']
 
         super().save(*args, **kwargs)
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TripQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='trip_search_vector_gin'),
+            models.Index(fields=['user', '-created_at', '-id'], name='trip_user_created_idx'),
+            # ?status= шүүлттэй жагсаалт
+            models.Index(fields=['user', 'status', '-created_at', '-id'], name='trip_user_status_created_idx'),
+            # `manage.py complete_trips`: status='planned' AND end_date < today
+            models.Index(fields=['status', 'end_date'], name='trip_status_end_date_idx'),
+            models.Index(fields=['user', 'updated_at'], name='trip_user_updated_idx'),
+        ]
 
 # --------------------------
 # Comment
 # --------------------------
 class Comment(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='comments')
-    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='comments')
+    # (blog, ...) composite index-үүд FK-г бүрхдэг тул тусдаа index үүсгэхгүй
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='comments', db_index=False)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['blog', '-created_at', '-id'], name='comment_blog_created_idx'),
+            models.Index(fields=['blog', 'updated_at'], name='comment_blog_updated_idx'),
+        ]
+
     def __str__(self):
         return f'Comment by {self.user.email} on {self.blog.title}'
 
@@ -167,4 +365,105 @@ class Save(models.Model):
     blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='saves')
     created_at = models.DateTimeField(auto_now_add=True)
     class Meta:
-        unique_together = ('user', 'blog')
\ No newline at end of file
+        unique_together = ('user', 'blog')
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='save_user_created_idx'),
+        ]
+
+
+# --------------------------
+# Home timeline (fan-out-on-write)
+# --------------------------
+class Timeline(models.Model):
+    """Хэрэглэгчийн timeline материалжсан эсэх. Байхгүй бол feed live query-гээр уншина."""
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='timeline')
+    built_at = models.DateTimeField(auto_now_add=True)
+    # Timeline зөвхөн үүнээс шинэ (>=) blog-уудыг агуулна; хуучныг live query уншина.
+    # None бол бүх нийтийн blog багтсан.
+    horizon = models.DateTimeField(null=True, blank=True)
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='timeline_entries')
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='timeline_entries')
+    created_at = models.DateTimeField()  # blog.created_at-ийн хуулбар
+
+    class Meta:
+        unique_together = ('user', 'blog')
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-blog'], name='timeline_user_created_idx'),
+        ]
+
+
+# --------------------------
+# Delta sync tombstones
+# --------------------------
+class Tombstone(models.Model):
+    """
+    Устгагдсан Trip/Blog/Comment/Like/Save-ийн ул мөр (travel_app.sync).
+    `manage.py prune_tombstones` SYNC_TOMBSTONE_RETENTION_DAYS-ээс хуучныг устгана.
+    """
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    # Хэний sync-д хамаарахыг шүүхэд; эх мөр устсан тул FK биш
+    user_id = models.BigIntegerField(null=True, blank=True)
+    blog_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', 'deleted_at'], name='tombstone_user_deleted_idx'),
+            models.Index(fields=['blog_id', 'deleted_at'], name='tombstone_blog_deleted_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+
+# --------------------------
+# Blog counters
+# --------------------------
+COUNTER_FIELDS = {
+    Like: 'likes_count',
+    Save: 'saves_count',
+    Comment: 'comments_count',
+}
+
+
+def bump_blog_counter(blog_id, field, delta):
+    # Нэг UPDATE ... SET x = GREATEST(x + delta, 0), race condition-гүй.
+    # updated_at-д auto_now-тэй адил app-ийн цаг: NOW() нь transaction
+    # эхэлсэн цагийг буцаадаг тул атомик блок дотор хуучин утга бичигдэнэ
+    Blog.objects.filter(pk=blog_id).update(**{field: Greatest(F(field) + delta, 0)}, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Save)
+@receiver(post_save, sender=Comment)
+def increment_blog_counter(sender, instance, created, **kwargs):
+    if created:
+        bump_blog_counter(instance.blog_id, COUNTER_FIELDS[sender], 1)
+
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Save)
+@receiver(post_delete, sender=Comment)
+def decrement_blog_counter(sender, instance, origin=None, **kwargs):
+    if not blog_is_deleting(instance, origin):
+        bump_blog_counter(instance.blog_id, COUNTER_FIELDS[sender], -1)
+
+
+# --------------------------
+# Cascade delete
+# --------------------------
+# Blog (эсвэл эзэн хэрэглэгч нь) устахад Like/Save/Comment cascade-аар
+# устана. Collector бүх pre_delete-ийг устгалтаас өмнө илгээдэг тул устаж
+# буй blog-уудыг `origin` (delete() дуудсан объект/queryset) дээр тэмдэглэж,
+# хүүхдийн post_delete receiver-ууд blog-ийн тоолуур, cache, event-ийг алгасна.
+@receiver(pre_delete, sender=Blog)
+def mark_blog_deleting(sender, instance, origin=None, **kwargs):
+    if origin is not None:
+        origin.__dict__.setdefault('_deleting_blog_ids', set()).add(instance.pk)
+
+
+def blog_is_deleting(instance, origin):
+    """post_delete-д: `instance`-ийн blog өөрөө энэ delete()-ээр устаж байгаа эсэх."""
+    return instance.blog_id in getattr(origin, '_deleting_blog_ids', ())
@@ -0,0 +1,133 @@
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+# --------------------------
+# Cursor (keyset) pagination
+# --------------------------
+def reverse_ordering(ordering):
+    return tuple(name[1:] if name.startswith('-') else f'-{name}' for name in ordering)
+
+
+def after_position(ordering, values):
+    """
+    `ordering`-оор эрэмбэлэхэд `values` байрлалаас (ordering-ийн эхний
+    len(values) талбар) хойших мөрүүд. ('-created_at', '-id') бол
+    created_at <= x AND (created_at < x OR (created_at = x AND id < y)):
+    эхний нөхцөл index-ийн хил болж, үлдсэн нь зөвхөн ижил цагтай мөрийг шүүнэ.
+    """
+    fields = [(name.lstrip('-'), 'lt' if name.startswith('-') else 'gt') for name in ordering]
+    condition, equal = Q(), {}
+    for (field, op), value in zip(fields, values):
+        condition |= Q(**equal, **{f'{field}__{op}': value})
+        equal[field] = value
+    field, op = fields[0]
+    return Q(**{f'{field}__{op}e': values[0]}) & condition
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    (created_at, id)-аар эрэмбэлсэн keyset pagination. OFFSET ашигладаггүй тул
+    гүн хуудас ч эхний хуудастай адил хурдан.
+
+    DRF-ийн CursorPagination байрлалыг зөвхөн эхний талбараар хадгалж, ижил
+    утгатай мөрүүдийг offset-оор алгасдаг тул ижил created_at-тай олон мөр
+    дээр previous cursor-оор буцахад мөр алдагдана. Энд байрлал нь ordering-ийн
+    бүх талбар (сүүлийнх нь id) тул мөр бүрийнх давтагдахгүй.
+
+    Хуучин client-ууд бүтэн жагсаалт хүлээж байгаа тул `cursor` эсвэл
+    `page_size` параметр ирсэн үед л хуудаслана.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    always_paginate = False
+
+    def is_paginating(self, request):
+        params = request.query_params
+        return (
+            self.always_paginate
+            or self.cursor_query_param in params
+            or self.page_size_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_paginating(request):
+            return None
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, position = self.cursor or (0, False, None)
+
+        ordering = reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            values = self.position_values(position)
+            if len(values) > len(ordering):
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(after_position(ordering, values))
+
+        # Хуучин (DRF) cursor-ын offset-ийг хүндэтгэнэ; шинэ cursor-т 0
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        following = None
+        if len(results) > len(self.page):
+            following = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None or offset > 0
+            self.has_previous = following is not None
+            self.next_position, self.previous_position = position, following
+        else:
+            self.has_next = following is not None
+            self.has_previous = position is not None or offset > 0
+            self.next_position, self.previous_position = following, position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    @staticmethod
+    def encode_position(values):
+        return json.dumps([str(value) for value in values], separators=(',', ':'))
+
+    @staticmethod
+    def position_values(position):
+        # Өмнөх cursor-уудад зөвхөн эхний талбарын утга (JSON биш) байна
+        try:
+            values = json.loads(position)
+        except ValueError:
+            return [position]
+        if not isinstance(values, list):
+            return [position]
+        if not values:
+            raise NotFound(CursorPagination.invalid_cursor_message)
+        return [str(value) for value in values]
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [name.lstrip('-') for name in ordering]
+        if isinstance(instance, dict):
+            return self.encode_position(instance[field] for field in fields)
+        return self.encode_position(getattr(instance, field) for field in fields)
+
+
+class TrendingCursorPagination(CreatedAtCursorPagination):
+    """/api/blogs/trending/ — шинэ endpoint тул үргэлж хуудаслана."""
+    ordering = ('-trending_score', '-id')
+    always_paginate = True
+
+
+class PopularPlaceCursorPagination(CreatedAtCursorPagination):
+    """/api/places/popular/"""
+    ordering = ('-popularity_score', '-id')
+    always_paginate = True
@@ -2,6 +2,8 @@
 
 from rest_framework import permissions
 
+from .authentication import confirm_claims
+
 class IsOwnerOrAdmin(permissions.BasePermission):
     
     def has_object_permission(self, request, view, obj):
@@ -10,9 +12,9 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
             
-        # 2. Admin эрх: request.user.role == 'admin'
-        if request.user.role == 'admin':
-            return True # Admin бол бүх Trip дээр үйлдэл хийх эрхтэй (CRUD)
+        # 2. Эзэмшигчийн эрх: obj.user == request.user
+        if obj.user == request.user:
+            return True
 
-        # 3. Эзэмшигчийн эрх: obj.user == request.user
-        return obj.user == request.user
\ No newline at end of file
+        # 3. Admin эрх: request.user.role == 'admin' (token-ий claim-ийг DB-ээс баталгаажуулна)
+        return request.user.role == 'admin' and confirm_claims(request.user, role='admin')
\ No newline at end of file
@@ -0,0 +1,29 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .metrics import timed_render
+
+try:
+    import orjson
+except ImportError:  # orjson суулгаагүй бол stock JSONRenderer ажиллана
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    orjson-оор JSON үүсгэнэ. orjson-ы мэдэхгүй төрлүүд (Decimal, lazy
+    string гэх мэт)-ийг DRF-ийн JSONEncoder.default руу шилжүүлнэ.
+    Indent хүссэн (browsable API г.м.) үед stock renderer ашиглана.
+    """
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed_render():
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=self._encoder.default, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,125 @@
+from functools import wraps
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection
+from django.db.models import F, FloatField, OuterRef, Q, Subquery
+from django.db.models.functions import Cast
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from rest_framework import filters
+
+from .models import Blog, Place, Profile, Trip
+
+# Монгол хэлний stemmer байхгүй тул 'simple' config ашиглана
+SEARCH_CONFIG = 'simple'
+
+
+# --------------------------
+# Search vector-ууд
+# --------------------------
+# Холбоотой хүснэгтийн нэрсийг Subquery-гээр авдаг тул QuerySet.update()-д
+# шууд өгч олон мөрийг нэг UPDATE-ээр шинэчилж болно.
+def _vector(expression, weight):
+    return SearchVector(expression, weight=weight, config=SEARCH_CONFIG)
+
+
+def blog_search_vector():
+    place_name = Subquery(Place.objects.filter(pk=OuterRef('place_id')).values('name')[:1])
+    username = Subquery(Profile.objects.filter(user_id=OuterRef('user_id')).values('username')[:1])
+    return _vector('content', 'A') + _vector(place_name, 'B') + _vector(username, 'C')
+
+
+def place_search_vector():
+    return _vector('name', 'A') + _vector('tags', 'B') + _vector('description', 'C')
+
+
+def trip_search_vector():
+    place_name = Subquery(Place.objects.filter(pk=OuterRef('place_id')).values('name')[:1])
+    return _vector('title', 'A') + _vector(place_name, 'B') + _vector('notes', 'C')
+
+
+def rebuild_search_vectors():
+    Blog.objects.update(search_vector=blog_search_vector())
+    Place.objects.update(search_vector=place_search_vector())
+    Trip.objects.update(search_vector=trip_search_vector())
+
+
+# --------------------------
+# Save хийх үед шинэчлэх
+# --------------------------
+def _postgres_only(handler):
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        if connection.vendor == 'postgresql':
+            handler(*args, **kwargs)
+    return wrapper
+
+
+@receiver(post_save, sender=Blog)
+@_postgres_only
+def update_blog_search_vector(sender, instance, **kwargs):
+    Blog.objects.filter(pk=instance.pk).update(search_vector=blog_search_vector())
+
+
+@receiver(post_save, sender=Trip)
+@_postgres_only
+def update_trip_search_vector(sender, instance, **kwargs):
+    Trip.objects.filter(pk=instance.pk).update(search_vector=trip_search_vector())
+
+
+@receiver(post_save, sender=Place)
+@_postgres_only
+def update_place_search_vector(sender, instance, created, **kwargs):
+    Place.objects.filter(pk=instance.pk).update(search_vector=place_search_vector())
+    if not created:
+        # Газрын нэр blog/trip-ийн vector-т орсон байгаа
+        Blog.objects.filter(place_id=instance.pk).update(search_vector=blog_search_vector())
+        Trip.objects.filter(place_id=instance.pk).update(search_vector=trip_search_vector())
+
+
+@receiver(post_save, sender=Profile)
+@_postgres_only
+def update_author_search_vector(sender, instance, created, **kwargs):
+    if not created:
+        Blog.objects.filter(user_id=instance.user_id).update(search_vector=blog_search_vector())
+
+
+# --------------------------
+# DRF filter backend
+# --------------------------
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    `?search=` параметрийг `search_vector` GIN index дээр ажиллуулж,
+    SearchRank-аар эрэмбэлнэ. View дээр `trigram_fields` зааж өгвөл тэдгээр
+    талбарт trigram (алдаатай бичсэн нэр) тааруулалт нэмэгдэнэ.
+
+    PostgreSQL биш backend дээр энгийн SearchFilter (`search_fields`) ажиллана.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or connection.vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        text = ' '.join(terms)
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        condition = Q(search_vector=query)
+        rank = SearchRank(F('search_vector'), query)
+
+        for field in getattr(view, 'trigram_fields', []):
+            condition |= Q(**{f'{field}__trigram_similar': text})
+            rank = rank + TrigramSimilarity(field, text)
+
+        # ts_rank нь real (float4): cursor-т текстээр хадгалсан утга буцаж
+        # тэнцүү гарахын тулд float8 болгоно
+        rank = Cast(rank, FloatField())
+        ordering = queryset.query.order_by
+        return queryset.annotate(search_rank=rank).filter(condition).order_by('-search_rank', *ordering)
+
+    def get_ordering(self, request, queryset, view):
+        # CursorPagination энэ эрэмбийг (filter backend-ийн get_ordering) авч
+        # хуудаслана; үгүй бол created_at-аар дахин эрэмбэлж rank алдагдана.
+        # None бол pagination-ийн өөрийн ordering.
+        if self.get_search_terms(request) and connection.vendor == 'postgresql':
+            return ('-search_rank', '-id')
+        return None
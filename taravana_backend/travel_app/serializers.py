@@ -1,11 +1,111 @@
 from rest_framework import serializers
 from .models import *
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from djoser.serializers import UserCreateSerializer as DjoserUserCreateSerializer
 from djoser.serializers import UserSerializer as DjoserUserSerializer
 
+from .metrics import timed_serialization
+
 User = get_user_model()
 
+
+# -----------------------------
+# Image renditions
+# -----------------------------
+def media_url(name, request=None):
+    path = default_storage.url(name)
+    return request.build_absolute_uri(path) if request else path
+
+
+def image_renditions(meta, request=None):
+    """
+    `image_meta` (travel_app.images)-г client-д зориулж URL-тай болгоно:
+    {"width", "height", "blurhash", "renditions": {"320": {"webp": url, ...}}}
+    Боловсруулагдаж дуусаагүй бол None.
+    """
+    if not meta or not meta.get('renditions'):
+        return None
+    return {
+        'width': meta['width'],
+        'height': meta['height'],
+        'blurhash': meta['blurhash'],
+        'renditions': {
+            width: {ext: media_url(name, request) for ext, name in files.items()}
+            for width, files in meta['renditions'].items()
+        },
+    }
+
+
+class ImageRenditionsField(serializers.Field):
+    """Read-only: `image_meta`-г image_renditions()-оор дүрсэлнэ."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def bind(self, field_name, parent):
+        # `image_meta` нэртэй бол DRF source-ийг өөрөө онооно (давхар заавал assert)
+        if self.source is None and field_name != 'image_meta':
+            self.source = 'image_meta'
+        super().bind(field_name, parent)
+
+    def to_representation(self, meta):
+        return image_renditions(meta, self.context.get('request'))
+
+# -----------------------------
+# Sparse fieldsets (?fields= / ?expand=)
+# -----------------------------
+class SparseFieldsMixin:
+    """
+    Root serializer-т `?fields=id,content` өгвөл зөвхөн тэдгээр талбарыг,
+    `?expand=user,comments` өгвөл `expandable_fields`-д заасан бүтэн
+    хувилбарыг буцаана. Nested serializer-т нөлөөлөхгүй.
+    """
+    expandable_fields = {}
+
+    def _is_root(self):
+        parent = getattr(self, 'parent', None)
+        if isinstance(parent, serializers.ListSerializer):
+            parent = getattr(parent, 'parent', None)
+        return parent is None
+
+    def _query_list(self, name):
+        request = self.context.get('request')
+        value = request.query_params.get(name) if request else None
+        return [v.strip() for v in value.split(',') if v.strip()] if value else []
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_root():
+            return fields
+
+        for name in self._query_list('expand'):
+            if name in self.expandable_fields:
+                serializer_class, kwargs = self.expandable_fields[name]
+                fields[name] = serializer_class(read_only=True, **kwargs)
+
+        only = self._query_list('fields')
+        if only:
+            for name in set(fields) - set(only):
+                fields.pop(name)
+        return fields
+
+
+# -----------------------------
+# Serialization timing (travel_app.metrics)
+# -----------------------------
+class TimedRepresentationMixin:
+    """
+    View-ийн буцаадаг serializer-ийн to_representation хугацааг request-ийн
+    serialize_time-д нэмнэ. Nested serializer гаднахынхаа хугацаанд орно.
+    """
+
+    def to_representation(self, instance):
+        with timed_serialization():
+            return super().to_representation(instance)
+
+
 # -----------------------------
 # User Create Serializer
 # -----------------------------
@@ -34,12 +134,13 @@ class UserCreateSerializer(DjoserUserCreateSerializer):
 # -----------------------------
 # Profile Serializer
 # -----------------------------
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     profile_img_url = serializers.SerializerMethodField()
+    image_meta = ImageRenditionsField()
 
     class Meta:
         model = Profile
-        fields = ('username', 'bio', 'profile_img', 'profile_img_url', 'phone', 'address')
+        fields = ('username', 'bio', 'profile_img', 'profile_img_url', 'image_meta', 'phone', 'address')
 
     def get_profile_img_url(self, obj):
         request = self.context.get('request')
@@ -52,7 +153,7 @@ class ProfileSerializer(serializers.ModelSerializer):
 # -----------------------------
 # User Serializer
 # -----------------------------
-class UserSerializer(DjoserUserSerializer):
+class UserSerializer(TimedRepresentationMixin, DjoserUserSerializer):
     profile = ProfileSerializer(read_only=True)
 
     class Meta(DjoserUserSerializer.Meta):
@@ -62,33 +163,41 @@ class UserSerializer(DjoserUserSerializer):
 # -----------------------------
 # Country / Place / Trip
 # -----------------------------
-class CountrySerializer(serializers.ModelSerializer):
+class CountrySerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    image_meta = ImageRenditionsField()
+
     class Meta:
         model = Country
         fields = '__all__'
 
-class PlaceSerializer(serializers.ModelSerializer):
+class PlaceSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    image_meta = ImageRenditionsField()
+
     class Meta:
         model = Place
-        fields = '__all__'
+        exclude = ('search_vector', 'popularity_score', 'scored_at')
+
+class TripSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    image_meta = ImageRenditionsField()
 
-class TripSerializer(serializers.ModelSerializer):
     class Meta:
         model = Trip
-        fields = '__all__'
+        exclude = ('search_vector',)
 
 # -----------------------------
 # BlogImage Serializer
 # -----------------------------
 class BlogImageSerializer(serializers.ModelSerializer):
+    image_meta = ImageRenditionsField()
+
     class Meta:
         model = BlogImage
-        fields = ['image']
+        fields = ['image', 'image_meta']
 
 # -----------------------------
 # Comment Serializer
 # -----------------------------
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
 
     class Meta:
@@ -98,7 +207,7 @@ class CommentSerializer(serializers.ModelSerializer):
 # -----------------------------
 # Blog Serializer
 # -----------------------------
-class BlogSerializer(serializers.ModelSerializer):
+class BlogSerializer(TimedRepresentationMixin, SparseFieldsMixin, serializers.ModelSerializer):
     # Write-д ашиглах зориулалттай field
     place_id = serializers.IntegerField(write_only=True, required=False)
 
@@ -108,9 +217,12 @@ class BlogSerializer(serializers.ModelSerializer):
     images = BlogImageSerializer(source='blog_image', many=True, read_only=True)
     comments = CommentSerializer(many=True, read_only=True)
 
+    # Denormalized тоолуурууд (Blog дээрх багана)
+    comment_count = serializers.IntegerField(source='comments_count', read_only=True)
+    likes_count = serializers.IntegerField(read_only=True)
+    saves_count = serializers.IntegerField(read_only=True)
+
     # Computed fields
-    comment_count = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     is_saved = serializers.SerializerMethodField()
 
@@ -118,7 +230,7 @@ class BlogSerializer(serializers.ModelSerializer):
         model = Blog
         fields = [
             'id', 'user', 'place', 'place_id', 'content', 'images', 'created_at', 
-            'is_public', 'likes_count', 'is_liked', 'is_saved', 
+            'is_public', 'likes_count', 'saves_count', 'is_liked', 'is_saved', 
             'comment_count', 'comments'
         ]
 
@@ -138,25 +250,92 @@ class BlogSerializer(serializers.ModelSerializer):
             instance.place = Place.objects.get(id=place_id)
         instance.content = validated_data.get('content', instance.content)
         instance.is_public = validated_data.get('is_public', instance.is_public)
-        instance.save()
+        # Тоолуур баганыг хуучин утгаар нь дарж бичихгүйн тулд update_fields;
+        # auto_now талбар update_fields-д заагдаагүй бол шинэчлэгдэхгүй (delta sync)
+        instance.save(update_fields=['place', 'content', 'is_public', 'updated_at'])
         return instance
 
     # Computed fields
-    def get_likes_count(self, obj):
-        return obj.likes.count()  # related_name='likes' байх ёстой
-
+    # Blog.objects.with_feed_data() annotate хийсэн бол утгыг нь шууд уншина,
+    # үгүй бол (жишээ нь create/update-ийн дараа) query-гээр тооцно.
     def get_is_liked(self, obj):
+        if hasattr(obj, 'liked_by_user'):
+            return obj.liked_by_user
         user = self.context['request'].user
         return obj.likes.filter(user=user).exists() if user.is_authenticated else False
 
     def get_is_saved(self, obj):
+        if hasattr(obj, 'saved_by_user'):
+            return obj.saved_by_user
         user = self.context['request'].user
         return obj.saves.filter(user=user).exists() if user.is_authenticated else False
 
-    def get_comment_count(self, obj):
-        return obj.comments.count()
 
 
+# -----------------------------
+# Feed-д зориулсан хөнгөн serializer-ууд
+# -----------------------------
+class AuthorProfileSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Profile
+        fields = ('username', 'profile_img')
+
+
+class AuthorSummarySerializer(serializers.ModelSerializer):
+    profile = AuthorProfileSummarySerializer(read_only=True)
+
+    class Meta:
+        model = User
+        fields = ('id', 'profile')
+
+
+class PlaceSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Place
+        fields = ('id', 'name', 'country')
+
+
+class CommentPreviewSerializer(serializers.ModelSerializer):
+    user = AuthorSummarySerializer(read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ['id', 'user', 'content', 'created_at']
+
+
+class BlogListSerializer(TimedRepresentationMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Feed-ийн жагсаалт: зохиогч, газрын товч мэдээлэл, сүүлийн
+    COMMENT_PREVIEW_COUNT сэтгэгдэл. Blog.objects.with_feed_data(user,
+    comment_previews=...)-ээр ачаалсан queryset шаардана.
+    """
+    COMMENT_PREVIEW_COUNT = 3
+
+    user = AuthorSummarySerializer(read_only=True)
+    place = PlaceSummarySerializer(read_only=True)
+    images = BlogImageSerializer(source='blog_image', many=True, read_only=True)
+    comments = CommentPreviewSerializer(source='comment_previews', many=True, read_only=True)
+
+    comment_count = serializers.IntegerField(source='comments_count', read_only=True)
+    likes_count = serializers.IntegerField(read_only=True)
+    saves_count = serializers.IntegerField(read_only=True)
+    is_liked = serializers.BooleanField(source='liked_by_user', read_only=True)
+    is_saved = serializers.BooleanField(source='saved_by_user', read_only=True)
+
+    expandable_fields = {
+        'user': (UserSerializer, {}),
+        'place': (PlaceSerializer, {}),
+        'comments': (CommentSerializer, {'many': True}),
+    }
+
+    class Meta:
+        model = Blog
+        fields = [
+            'id', 'user', 'place', 'content', 'images', 'created_at',
+            'is_public', 'likes_count', 'saves_count', 'is_liked', 'is_saved',
+            'comment_count', 'comments'
+        ]
+
 
 # -----------------------------
 # Save Serializer
@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Blog, Comment, Like, Save, Tombstone, Trip, blog_is_deleting
+
+
+# --------------------------
+# Change token
+# --------------------------
+# Token нь app-ийн цаг (микросекунд): updated_at/created_at/deleted_at бүгд
+# timezone.now()-оор бичигдэнэ (raw SQL ч %(now)s-оор). Мөр commit хийгдэх
+# дарааллаар биш бичсэн цагаараа тамгатай тул token-ийг бичилт хийсэн боловч
+# commit хийгээгүй хамгийн хуучин transaction-ий эхлэл хүртэл ухраана
+# (open_write_age). SYNC_OVERLAP_SECONDS нь зөвхөн серверүүдийн цагийн зөрүү,
+# цаг авах ба query илгээх хоорондох хугацааг нөхнө; client мөрүүдийг id-аар
+# upsert хийнэ.
+OPEN_WRITE_AGE_SQL = """
+SELECT EXTRACT(EPOCH FROM clock_timestamp() - MIN(xact_start))
+FROM pg_stat_activity
+WHERE datname = current_database() AND backend_xid IS NOT NULL AND pid <> pg_backend_pid()
+"""
+
+
+def open_write_age():
+    """
+    Бичилт хийсэн, commit хийгээгүй хамгийн хуучин transaction хэдэн секунд
+    нээлттэй байгаа. DB-ээс зөвхөн хугацааг авна (DB-ийн цагийг app-ийн
+    цагтай харьцуулахгүй). Бусад role-ийн backend_xid харагдахгүй тул app
+    бүх холболтоо нэг role-оор нээнэ гэж үзнэ.
+    """
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(OPEN_WRITE_AGE_SQL)
+        age = cursor.fetchone()[0]
+    return max(float(age or 0), 0.0)
+
+
+def encode_token(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def decode_token(token):
+    """Буруу token бол ValueError."""
+    micros = int(token)
+    if micros < 0:
+        raise ValueError(token)
+    return datetime.fromtimestamp(micros / 1_000_000, tz=dt_timezone.utc)
+
+
+# --------------------------
+# Changes since token
+# --------------------------
+def sync_changes(user, token=None):
+    """
+    Хэрэглэгчийн trip, өөрийн болон хадгалсан blog, тэдгээрийн comment,
+    өөрийн like/save-ийн `token`-оос хойших өөрчлөлт, устгалт.
+    Token байхгүй эсвэл tombstone-ийн хадгалах хугацаанаас хуучин бол
+    бүрэн snapshot (reset=True) буцаана.
+    """
+    now = timezone.now()
+    # Одоо нээлттэй бичилтүүд commit хийгдэхэд дараагийн sync-д орно
+    next_token = now - timedelta(seconds=open_write_age())
+    since = decode_token(token) if token else None
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    reset = since is None or since < now - retention
+
+    # OR + EXISTS нь blog хүснэгтийг бүтнээр нь уншдаг тул id-уудыг UNION-оор
+    # (blog_user_*, save_user_* index) цуглуулна
+    own_blogs = Blog.objects.filter(user=user).values('pk')
+    saved_blogs = Save.objects.filter(user=user).values('blog_id')
+    scope = own_blogs.union(saved_blogs)
+    blogs = Blog.objects.filter(pk__in=scope)
+    comments = Comment.objects.filter(blog__in=scope)
+    trips = Trip.objects.filter(user=user)
+    likes = Like.objects.filter(user=user)
+    saves = Save.objects.filter(user=user)
+    tombstones = Tombstone.objects.none()
+
+    if not reset:
+        since -= timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+        # Шинээр хадгалсан blog-ийг (өөрөө өөрчлөгдөөгүй ч) comment-тэй нь илгээнэ
+        newly_saved = Save.objects.filter(user=user, created_at__gt=since)
+        blogs = Blog.objects.filter(pk__in=own_blogs.filter(updated_at__gt=since).union(
+            saved_blogs.filter(blog__updated_at__gt=since),
+            newly_saved.values('blog_id'),
+        ))
+        comments = comments.filter(
+            Q(updated_at__gt=since) | Q(Exists(newly_saved.filter(blog=OuterRef('blog_id'))))
+        )
+        trips = trips.filter(updated_at__gt=since)
+        likes = likes.filter(created_at__gt=since)
+        saves = saves.filter(created_at__gt=since)
+        # Хадгалсан blog устахад Save нь cascade-аар устаж save tombstone
+        # үлдээнэ; тэр blog-уудын 'blog' tombstone-ийг (эзэнд нь бичигдсэн) нэмнэ
+        unsaved = Tombstone.objects.filter(model='save', user_id=user.pk, deleted_at__gt=since)
+        tombstones = Tombstone.objects.filter(deleted_at__gt=since).filter(
+            Q(user_id=user.pk)
+            | Q(model='comment', blog_id__in=scope)
+            | Q(model='blog', blog_id__in=unsaved.values('blog_id'))
+        )
+
+    return {
+        'token': encode_token(next_token),
+        'reset': reset,
+        'trips': trips.order_by('updated_at', 'id'),
+        'blogs': blogs.order_by('updated_at', 'id'),
+        'comments': comments.select_related('user', 'user__profile').order_by('updated_at', 'id'),
+        'likes': likes.order_by('created_at', 'id'),
+        'saves': saves.order_by('created_at', 'id'),
+        'tombstones': tombstones.order_by('deleted_at', 'id'),
+    }
+
+
+# --------------------------
+# Tombstones
+# --------------------------
+# Like/Save-ийн toggle raw SQL-ийн устгалт travel_app.toggles дотор бичигдэнэ.
+@receiver(post_delete, sender=Trip)
+@receiver(post_delete, sender=Blog)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Save)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    # Устсан blog sync-ийн scope-оос гарах тул түүний comment-ийн tombstone-ийг
+    # хэн ч уншихгүй. Like/Save-ийнх хэрэглэгчдээ (user_id) очно.
+    if sender is Comment and blog_is_deleting(instance, origin):
+        return
+    Tombstone.objects.create(
+        model=sender._meta.model_name,
+        object_id=instance.pk,
+        user_id=instance.user_id,
+        blog_id=instance.pk if sender is Blog else getattr(instance, 'blog_id', None),
+    )
+
+
+def prune_tombstones(days=None):
+    days = settings.SYNC_TOMBSTONE_RETENTION_DAYS if days is None else days
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
@@ -1,3 +1,1244 @@
-from django.test import TestCase
+import base64
+import importlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from unittest import mock
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest import skipUnless
+from urllib.parse import parse_qs, urlencode, urlsplit
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import (
+    AsyncClient, AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from PIL import Image as PILImage
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .authentication import ClaimsTokenObtainPairSerializer
+from .caching import blog_scope, get_version, saved_scope
+from .events import InProcessBroker, user_topic
+from .fastpath import BLOG_LIST_PLAN, COMMENT_PLAN, TRIP_PLAN, values_rows
+from .images import atomic_upload, bulk_create_blog_images, process_image
+from .metrics import QueryBudgetExceeded, registry
+from .models import (
+    Blog, BlogImage, Comment, Country, CustomUser, Like, Place, Save, Timeline, TimelineEntry, Tombstone, Trip,
+    trip_status,
+)
+from .pagination import CreatedAtCursorPagination
+from .search import FullTextSearchFilter, blog_search_vector
+from .serializers import BlogListSerializer, BlogSerializer, CommentSerializer, TripSerializer
+from .sync import encode_token, sync_changes
+from .throttling import take_token
+from .toggles import toggle_blog_relation
+from .trip_status import complete_expired_trips
+from .timeline import FEED_ORDERING, build_timeline, feed_horizon, home_feed, live_feed, trim_timelines
+
+
+def make_user(email):
+    return CustomUser.objects.create_user(email=email, password='pass12345')
+
+
+class APITestMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('reader@example.com')
+        self.author = make_user('author@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def make_blogs(self, count, **kwargs):
+        kwargs.setdefault('user', self.author)
+        kwargs.setdefault('is_public', True)
+        return [Blog.objects.create(content=f'blog {i}', **kwargs) for i in range(count)]
+
+    def collect_pages(self, url, max_pages=50):
+        ids = []
+        for _ in range(max_pages):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+            if not url:
+                return ids
+        self.fail(f'Pagination did not terminate: {ids}')
+
+
+# --------------------------
+# Trending
+# --------------------------
+class TrendingPaginationTests(APITestMixin, TestCase):
+    def test_pages_follow_score_order(self):
+        blogs = self.make_blogs(5)
+        expected = [b.pk for b in sorted(blogs, key=lambda b: (-b.trending_score, -b.pk))]
+
+        self.assertEqual(self.collect_pages('/api/blogs/trending/?page_size=2'), expected)
+        with override_settings(API_FAST_SERIALIZATION=False):
+            self.assertEqual(self.collect_pages('/api/blogs/trending/?page_size=2'), expected)
+
+    def test_new_blogs_are_seeded_with_distinct_scores(self):
+        blogs = self.make_blogs(3)
+        scores = {b.trending_score for b in blogs}
+        self.assertEqual(len(scores), 3)
+        self.assertNotIn(0.0, scores)
+
+    def test_tied_scores_still_paginate(self):
+        blogs = self.make_blogs(5)
+        Blog.objects.update(trending_score=0)
+        expected = sorted((b.pk for b in blogs), reverse=True)
+        self.assertEqual(self.collect_pages('/api/blogs/trending/?page_size=2'), expected)
+
+
+# --------------------------
+# Delta sync
+# --------------------------
+class DeltaSyncTests(APITestMixin, TestCase):
+    def sync(self, token=None):
+        response = self.client.get('/api/sync/', {'since': token} if token else {})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_blog_edit_is_synced(self):
+        blog = self.make_blogs(1, user=self.user)[0]
+        Blog.objects.filter(pk=blog.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        token = self.sync()['token']
+        Blog.objects.filter(pk=blog.pk).update(updated_at=timezone.now() - timedelta(days=1))
+
+        serializer = BlogSerializer(blog, data={'content': 'edited'}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        self.assertEqual([b['id'] for b in self.sync(token)['blogs']], [blog.pk])
+
+    def test_deleted_saved_blog_is_tombstoned(self):
+        blog = self.make_blogs(1)[0]
+        Save.objects.create(user=self.user, blog=blog)
+        token = self.sync()['token']
+
+        blog_id = blog.pk
+        blog.delete()
+        deleted = self.sync(token)['deleted']
+        self.assertIn({'id': blog_id, 'blog': blog_id}, deleted['blog'])
+        self.assertIn(blog_id, [d['blog'] for d in deleted['save']])
+
+
+    def test_toggle_and_trip_sweep_stamp_with_app_clock(self):
+        blog = self.make_blogs(1)[0]
+        moment = timezone.now() - timedelta(hours=1)
+        with mock.patch('django.utils.timezone.now', return_value=moment):
+            toggle_blog_relation(Like, blog.pk, self.user)
+            self.assertEqual(Like.objects.get(blog=blog).created_at, moment)
+            toggle_blog_relation(Like, blog.pk, self.user)
+            self.assertEqual(Tombstone.objects.get(model='like').deleted_at, moment)
+
+            end_date = moment.date() + timedelta(days=1)
+            place = Place.objects.create(
+                country=Country.objects.create(name='Mongolia', description=''), name='Khuvsgul', description='',
+            )
+            trip = Trip.objects.create(user=self.user, place=place, title='t', start_date=end_date, end_date=end_date)
+            self.assertEqual(complete_expired_trips(today=end_date + timedelta(days=1)), 1)
+        trip.refresh_from_db()
+        self.assertEqual(trip.updated_at, moment)
+
+
+# Өөр холболтын commit хийгээгүй бичилт хэрэгтэй тул TransactionTestCase
+@override_settings(TIMELINE_FANOUT_EAGER=True, IMAGE_PIPELINE_EAGER=True, SYNC_OVERLAP_SECONDS=0)
+class DeltaSyncOpenWriteTests(TransactionTestCase):
+    def test_write_committed_after_token_is_synced(self):
+        user = make_user('writer@example.com')
+        blog = Blog.objects.create(user=user, content='blog', is_public=True)
+        token = sync_changes(user)['token']
+        written, commit = threading.Event(), threading.Event()
+
+        def writer():
+            try:
+                with transaction.atomic():
+                    Blog.objects.filter(pk=blog.pk).update(content='edited', updated_at=timezone.now())
+                    written.set()
+                    commit.wait(10)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        self.assertTrue(written.wait(10))
+        # Бичилт нээлттэй байхад авсан token түүний цагаас хойш гарахгүй
+        token = sync_changes(user, token)['token']
+        commit.set()
+        thread.join()
+
+        self.assertEqual(list(sync_changes(user, token)['blogs'].values_list('content', flat=True)), ['edited'])
+
+
+# --------------------------
+# Claims JWT
+# --------------------------
+class ClaimsTokenTests(APITestMixin, TestCase):
+    def obtain(self, user):
+        response = self.client.post('/api/token/', {'email': user.email, 'password': 'pass12345'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_refresh_reloads_claims(self):
+        tokens = self.obtain(self.user)
+        CustomUser.objects.filter(pk=self.user.pk).update(role='admin', is_staff=True)
+
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        for token in (AccessToken(response.data['access']), RefreshToken(response.data['refresh'])):
+            self.assertEqual(token['role'], 'admin')
+            self.assertIs(token['is_staff'], True)
+
+    def test_refresh_rejects_inactive_user(self):
+        tokens = self.obtain(self.user)
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_revoked_admin_claim_is_rechecked(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(role='admin', is_staff=True)
+        self.user.refresh_from_db()
+        access = self.obtain(self.user)['access']
+        CustomUser.objects.filter(pk=self.user.pk).update(role='user', is_staff=False)
+
+        blog = self.make_blogs(1)[0]
+        client = APIClient(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(client.delete(f'/api/blogs/{blog.pk}/delete/').status_code, 403)
+        self.assertTrue(Blog.objects.filter(pk=blog.pk).exists())
+
+
+# --------------------------
+# Home timeline
+# --------------------------
+class HomeTimelineTests(APITestMixin, TestCase):
+    def test_owner_can_retrieve_and_edit_own_blog(self):
+        blog = self.make_blogs(1, user=self.user, is_public=False)[0]
+        self.assertEqual(self.client.get(f'/api/blogs/{blog.pk}/').status_code, 200)
+        response = self.client.patch(f'/api/blogs/{blog.pk}/', {'content': 'edited'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_others_cannot_edit_public_blog(self):
+        blog = self.make_blogs(1)[0]
+        response = self.client.patch(f'/api/blogs/{blog.pk}/', {'content': 'edited'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_feed_continues_past_trimmed_timeline(self):
+        blogs = self.make_blogs(7)
+        build_timeline(self.user, limit=3)
+        with self.captureOnCommitCallbacks(execute=True), override_settings(TIMELINE_FANOUT_EAGER=True):
+            blogs += self.make_blogs(2)
+        self.assertEqual(TimelineEntry.objects.filter(user=self.user).count(), 5)
+
+        expected = sorted((b.pk for b in blogs), reverse=True)
+        self.assertEqual(self.collect_pages('/api/blogs/?page_size=2'), expected)
+        self.assertEqual(self.collect_pages('/api/blogs/?page_size=3'), expected)
+        self.assertEqual([b['id'] for b in self.client.get('/api/blogs/').data], expected)
+
+    def test_trim_keeps_newest_entries(self):
+        self.make_blogs(6)
+        build_timeline(self.user)
+        self.assertEqual(trim_timelines(max_entries=4), 2)
+
+        newest = Blog.objects.order_by('-created_at')[:4]
+        self.assertQuerySetEqual(
+            TimelineEntry.objects.filter(user=self.user).order_by('-created_at').values_list('blog_id', flat=True),
+            [b.pk for b in newest],
+        )
+        self.assertEqual(Timeline.objects.get(user=self.user).horizon, newest[3].created_at)
+        self.assertEqual(len(self.collect_pages('/api/blogs/?page_size=4')), 6)
+
+
+# --------------------------
+# Image renditions
+# --------------------------
+class ImageRenditionsFieldTests(APITestMixin, TestCase):
+    def test_blog_detail_renders_author_profile(self):
+        blog = self.make_blogs(1)[0]
+        response = self.client.get(f'/api/blogs/{blog.pk}/')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn('image_meta', response.data['user']['profile'])
+
+
+def jpeg_file(name='photo.jpg', size=(800, 600)):
+    buffer = io.BytesIO()
+    PILImage.new('RGB', size, 'teal').save(buffer, format='JPEG')
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+class ProcessImageTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.renditions_dir = os.path.join(media_root, 'renditions', 'blog')
+        self.blog = self.make_blogs(1)[0]
+        self.image = BlogImage.objects.create(blog=self.blog, image=jpeg_file())
+
+    def test_writes_renditions_and_touches_blog(self):
+        version = get_version(blog_scope(self.blog.pk))[0]
+        updated_at = Blog.objects.get(pk=self.blog.pk).updated_at
+        process_image('travel_app.BlogImage', self.image.pk)
+
+        self.image.refresh_from_db()
+        self.assertEqual(self.image.image_meta['source'], self.image.image.name)
+        self.assertEqual(set(self.image.image_meta['renditions']), {'320', '640'})
+        self.assertNotEqual(get_version(blog_scope(self.blog.pk))[0], version)
+        self.assertGreater(Blog.objects.get(pk=self.blog.pk).updated_at, updated_at)
+
+    def test_new_upload_during_processing_is_kept(self):
+        def upload_meanwhile(image):
+            BlogImage.objects.filter(pk=self.image.pk).update(image='blog/new.jpg')
+            return 'hash'
+
+        with mock.patch('travel_app.images.blurhash', side_effect=upload_meanwhile):
+            process_image('travel_app.BlogImage', self.image.pk)
+
+        self.image.refresh_from_db()
+        self.assertEqual(self.image.image.name, 'blog/new.jpg')
+        self.assertEqual(self.image.image_meta, {})
+        self.assertEqual(os.listdir(self.renditions_dir), [])
+
+
+# --------------------------
+# Multi-image upload
+# --------------------------
+class BulkBlogImageTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+        self.blog = self.make_blogs(1)[0]
+
+    def stored_files(self):
+        return [name for _, _, names in os.walk(self.media_root) for name in names]
+
+    def test_failed_upload_deletes_files_written_by_other_threads(self):
+        storage = BlogImage._meta.get_field('image').storage
+        save = storage.save
+
+        def flaky_save(name, content, **kwargs):
+            if content.name == 'bad.jpg':
+                raise OSError('disk full')
+            return save(name, content, **kwargs)
+
+        files = [jpeg_file('bad.jpg')] + [jpeg_file(f'{i}.jpg') for i in range(5)]
+        with mock.patch.object(storage, 'save', side_effect=flaky_save):
+            with self.assertRaises(OSError):
+                bulk_create_blog_images(self.blog, files)
+        self.assertEqual(self.stored_files(), [])
+        self.assertFalse(BlogImage.objects.exists())
+
+    def test_rollback_deletes_files(self):
+        with atomic_upload():
+            bulk_create_blog_images(self.blog, [jpeg_file(f'{i}.jpg') for i in range(3)])
+            self.assertEqual(len(self.stored_files()), 3)
+            transaction.set_rollback(True)
+        self.assertEqual(self.stored_files(), [])
+
+        with self.assertRaises(ValueError), atomic_upload():
+            with atomic_upload():  # nested: гадна талынх rollback хийгдэнэ
+                bulk_create_blog_images(self.blog, [jpeg_file('a.jpg')])
+            raise ValueError
+        self.assertEqual(self.stored_files(), [])
+
+    def test_commit_keeps_files(self):
+        response = self.client.post(
+            '/api/blogs/', {'content': 'ten photos', 'images': [jpeg_file(f'{i}.jpg') for i in range(10)]},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(BlogImage.objects.filter(blog_id=response.data['id']).count(), 10)
+        self.assertEqual(len(self.stored_files()), 10)
+
+
+# --------------------------
+# Query counts
+# --------------------------
+class BlogListQueryCountTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.place = Place.objects.create(
+            country=Country.objects.create(name='Mongolia', description=''), name='Khuvsgul', description='',
+        )
+        self.commenters = [make_user(f'commenter{i}@example.com') for i in range(3)]
+
+    def add_blogs(self, count):
+        for blog in self.make_blogs(count, place=self.place):
+            BlogImage.objects.create(blog=blog, image='blog/photo.jpg')
+            Like.objects.create(user=self.user, blog=blog)
+            Save.objects.create(user=self.user, blog=blog)
+            for commenter in self.commenters:
+                Comment.objects.create(user=commenter, blog=blog, content='nice')
+
+    def assertConstantQueries(self, url, **params):
+        self.add_blogs(3)
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+
+        self.add_blogs(3)  # N -> 2N
+        cache.clear()  # ETag/response cache
+        with self.assertNumQueries(len(first.captured_queries)):
+            response = self.client.get(url, params)
+        results = response.data['results'] if 'results' in response.data else response.data
+        self.assertEqual(len(results), 6)
+
+    def test_blog_list(self):
+        self.assertConstantQueries('/api/blogs/')
+
+    def test_blog_list_paginated(self):
+        self.assertConstantQueries('/api/blogs/', page_size=10)
+
+    def test_blog_list_serializer_path(self):
+        with override_settings(API_FAST_SERIALIZATION=False):
+            self.assertConstantQueries('/api/blogs/')
+
+    def test_blog_list_expanded_comments(self):
+        self.assertConstantQueries('/api/blogs/', expand='comments')
+
+    def test_saved_blogs(self):
+        self.assertConstantQueries('/api/saved_blogs/')
+
+    def test_saved_blogs_serializer_path(self):
+        with override_settings(API_FAST_SERIALIZATION=False):
+            self.assertConstantQueries('/api/saved_blogs/')
+
+    def test_saved_blogs_expanded_comments(self):
+        self.assertConstantQueries('/api/saved_blogs/', expand='comments')
+
+
+# --------------------------
+# Fast path parity
+# --------------------------
+IMAGE_META = {
+    'source': 'blog/a.jpg', 'width': 800, 'height': 600, 'blurhash': 'LKO2?U%2Tw=w',
+    'renditions': {'320': {'webp': 'renditions/blog/a_320.webp'}, '640': {'webp': 'renditions/blog/a_640.webp'}},
+}
+
+
+class FastPathParityTests(APITestMixin, TestCase):
+    """Plan-ууд харгалзах serializer-тэй түлхүүр, дараалал, утгаараа яг ижил JSON гаргана."""
+
+    def setUp(self):
+        super().setUp()
+        request = APIRequestFactory().get('/api/blogs/', HTTP_HOST='testserver')
+        force_authenticate(request, self.user)
+        self.request = Request(request)
+        self.request.user = self.user
+
+        profile = self.author.profile
+        profile.username, profile.bio, profile.phone = 'author', 'bio', 99119911
+        profile.profile_img, profile.image_meta = 'profile/a.jpg', IMAGE_META
+        profile.save()
+        place = Place.objects.create(
+            country=Country.objects.create(name='Mongolia', description=''), name='Khuvsgul', description='',
+        )
+        with_place, without_place, _ = self.make_blogs(3)
+        Blog.objects.filter(pk=with_place.pk).update(place=place)
+        BlogImage.objects.create(blog=with_place, image='blog/a.jpg', image_meta=IMAGE_META)
+        BlogImage.objects.create(blog=with_place, image='blog/b.jpg')
+        Like.objects.create(user=self.user, blog=with_place)
+        Save.objects.create(user=self.user, blog=without_place)
+        for i in range(5):  # preview нь сүүлийн 3
+            Comment.objects.create(user=self.author if i % 2 else self.user, blog=with_place, content=f'c{i}')
+        Trip.objects.create(
+            user=self.user, place=place, title='Lake', start_date=date(2026, 7, 1), end_date=date(2026, 7, 10),
+            budget=1000, image='trips/a.jpg', image_meta=IMAGE_META, notes='tent',
+        )
+        Trip.objects.create(user=self.user, place=place, title='Past', start_date=date(2020, 1, 1), end_date=date(2020, 1, 2))
+
+    def assertSameJSON(self, plan, serializer_class, queryset):
+        fast = plan.build_many(values_rows(queryset, plan), self.request)
+        stock = serializer_class(queryset, many=True, context={'request': self.request}).data
+        self.assertGreater(len(stock), 1)
+        self.assertEqual(JSONRenderer().render(fast), JSONRenderer().render(stock))
+
+    def test_blog_list_plan(self):
+        queryset = Blog.objects.with_feed_data(
+            self.user, comment_previews=BlogListSerializer.COMMENT_PREVIEW_COUNT,
+        ).order_by('-created_at', '-id')
+        self.assertSameJSON(BLOG_LIST_PLAN, BlogListSerializer, queryset)
+
+    def test_trip_plan(self):
+        self.assertSameJSON(TRIP_PLAN, TripSerializer, Trip.objects.order_by('-created_at', '-id'))
+
+    def test_comment_plan(self):
+        queryset = Comment.objects.select_related('user__profile').order_by('-created_at', '-id')
+        self.assertSameJSON(COMMENT_PLAN, CommentSerializer, queryset)
+
+
+# --------------------------
+# Trip status
+# --------------------------
+class TripStatusTests(TestCase):
+    def setUp(self):
+        self.user = make_user('traveler@example.com')
+        self.place = Place.objects.create(
+            country=Country.objects.create(name='Mongolia', description=''), name='Khuvsgul', description='',
+        )
+        self.today = timezone.now().date()
+
+    def trip(self, end_days, **kwargs):
+        end_date = self.today + timedelta(days=end_days)
+        return Trip(user=self.user, place=self.place, title='t', start_date=end_date - timedelta(days=3),
+                    end_date=end_date, **kwargs)
+
+    def statuses(self):
+        return list(Trip.objects.order_by('end_date').values_list('status', flat=True))
+
+    def test_bulk_create_derives_status(self):
+        Trip.objects.bulk_create([self.trip(-1, status='planned'), self.trip(0), self.trip(5, status='completed')])
+        self.assertEqual(self.statuses(), ['completed', 'planned', 'planned'])
+
+    def test_bulk_update_of_end_date_derives_status(self):
+        past, future = Trip.objects.bulk_create([self.trip(-10), self.trip(10)])
+        past.end_date, future.end_date = self.today + timedelta(days=20), self.today - timedelta(days=20)
+        Trip.objects.bulk_update([past, future], ['end_date'])
+        self.assertEqual(self.statuses(), ['completed', 'planned'])
+
+    def test_update_with_expression_derives_status(self):
+        Trip.objects.bulk_create([self.trip(-10), self.trip(10)])
+        Trip.objects.update(end_date=F('start_date') + timedelta(days=15))
+        # -13+15 = 2 (ирээдүй), 7+15 = 22 (ирээдүй)
+        self.assertEqual(self.statuses(), ['planned', 'planned'])
+        Trip.objects.update(end_date=F('start_date'))
+        self.assertEqual(self.statuses(), ['completed', 'planned'])
+
+    def test_update_with_value_derives_status(self):
+        Trip.objects.bulk_create([self.trip(10)])
+        Trip.objects.update(end_date=self.today - timedelta(days=1))
+        self.assertEqual(self.statuses(), ['completed'])
+
+    def test_sweep_completes_expired_trips_in_batches(self):
+        Trip.objects.bulk_create([self.trip(i) for i in range(-5, 3)])
+        Trip.objects.update(status='planned')  # өдөр шилжсэн: өчигдрийн 'planned' trip-үүд
+        self.assertEqual(complete_expired_trips(batch_size=2), 5)
+        self.assertEqual(self.statuses(), ['completed'] * 5 + ['planned'] * 3)
+        self.assertEqual(complete_expired_trips(batch_size=2), 0)
+
+
+# --------------------------
+# Cascade delete
+# --------------------------
+class CascadeDeleteTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.blog = self.make_blogs(1)[0]
+        self.other = self.make_blogs(1, user=self.user)[0]
+        for i in range(3):
+            liker = make_user(f'liker{i}@example.com')
+            Like.objects.create(user=liker, blog=self.blog)
+            Comment.objects.create(user=liker, blog=self.blog, content='nice')
+        Save.objects.create(user=self.user, blog=self.blog)
+        Like.objects.create(user=self.author, blog=self.other)
+
+    def blog_updates(self, delete):
+        with CaptureQueriesContext(connection) as ctx:
+            delete()
+        return [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "travel_app_blog"')]
+
+    def test_blog_delete_skips_counter_updates(self):
+        saved_version = get_version(saved_scope(self.user.pk))[0]
+        blog_id = self.blog.pk
+        self.assertEqual(self.blog_updates(self.blog.delete), [])
+        self.assertNotEqual(get_version(saved_scope(self.user.pk))[0], saved_version)
+        tombstones = Tombstone.objects.filter(blog_id=blog_id).values_list('model', flat=True)
+        self.assertEqual(sorted(tombstones), ['blog', 'like', 'like', 'like', 'save'])
+
+    def test_queryset_delete_skips_counter_updates(self):
+        self.assertEqual(self.blog_updates(Blog.objects.filter(pk=self.blog.pk).delete), [])
+
+    def test_user_delete_updates_only_surviving_blogs(self):
+        self.assertEqual(len(self.blog_updates(self.author.delete)), 1)
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.likes_count, 0)
+
+    def test_comment_delete_still_updates_counter(self):
+        self.blog.comments.first().delete()
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.comments_count, 2)
+
+
+# --------------------------
+# Concurrent toggles
+# --------------------------
+# Background pool-ийн thread-ууд тест DB-ийн холболтыг барьж үлдэхгүйн тулд eager
+@override_settings(TIMELINE_FANOUT_EAGER=True, IMAGE_PIPELINE_EAGER=True)
+class ConcurrentToggleTests(TransactionTestCase):
+    THREADS = 8
+
+    def setUp(self):
+        cache.clear()
+        self.author = make_user('author@example.com')
+        self.blog = Blog.objects.create(user=self.author, content='blog', is_public=True)
+
+    def run_parallel(self, users, path, repeat):
+        barrier = threading.Barrier(len(users))
+        statuses, errors = [], []
+
+        def worker(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                barrier.wait()
+                for _ in range(repeat):
+                    statuses.append(client.post(path).status_code)
+            except Exception as e:  # IntegrityError г.м. 500 болохын оронд энд
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(set(statuses), {200})
+
+    def test_parallel_likes_from_many_users(self):
+        users = [make_user(f'liker{i}@example.com') for i in range(self.THREADS)]
+        self.run_parallel(users, f'/api/blogs/{self.blog.pk}/like/', repeat=3)
+
+        self.blog.refresh_from_db()
+        self.assertEqual(Like.objects.filter(blog=self.blog).count(), self.THREADS)
+        self.assertEqual(self.blog.likes_count, self.THREADS)
+
+    def test_parallel_toggles_from_same_user(self):
+        user = make_user('clicker@example.com')
+        self.run_parallel([user] * self.THREADS, f'/api/blogs/{self.blog.pk}/save/', repeat=5)
+
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.saves_count, Save.objects.filter(blog=self.blog).count())
+        self.assertLessEqual(self.blog.saves_count, 1)
+
+
+# --------------------------
+# Batch endpoint
+# --------------------------
+# GET-үүд worker thread-ийн холболтоор exported snapshot уншина: өгөгдөл commit
+# хийгдсэн байх ёстой тул TransactionTestCase
+@override_settings(TIMELINE_FANOUT_EAGER=True, IMAGE_PIPELINE_EAGER=True, BATCH_MAX_REQUESTS=3)
+class BatchTests(APITestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        # Batch-ийн thread-үүд тест DB-ийн холболтыг барьж үлдэхгүй (ASGI-ийн тохиргоо)
+        patcher = mock.patch.dict(connections.settings['default'], CONN_MAX_AGE=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.blogs = self.make_blogs(2)
+
+    def batch(self, *items, **extra):
+        return self.client.post('/api/batch/', {'requests': list(items)}, format='json', **extra)
+
+    def test_reads_keep_order_and_per_item_status(self):
+        first, second = self.blogs
+        response = self.batch(
+            {'path': f'/api/blogs/{second.pk}/'},
+            {'path': '/api/blogs/999999/'},
+            {'path': f'/api/blogs/{first.pk}/'},
+        )
+        self.assertEqual(response.status_code, 200)
+        statuses = [item['status'] for item in response.data['responses']]
+        self.assertEqual(statuses, [200, 404, 200])
+        bodies = response.data['responses']
+        self.assertEqual([bodies[0]['body']['id'], bodies[2]['body']['id']], [second.pk, first.pk])
+
+    def test_parent_conditional_headers_do_not_leak(self):
+        blog = self.blogs[0]
+        etag = self.client.get(f'/api/blogs/{blog.pk}/')['ETag']
+        response = self.batch({'path': f'/api/blogs/{blog.pk}/'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data['responses'][0]['status'], 200)
+
+    def test_failed_write_rolls_back_batch(self):
+        blog = self.blogs[0]
+        response = self.batch(
+            {'method': 'POST', 'path': f'/api/add_comment/{blog.pk}', 'body': {'content': 'kept?'}},
+            {'method': 'POST', 'path': '/api/add_comment/999999', 'body': {'content': 'missing'}},
+        )
+        self.assertEqual([item['status'] for item in response.data['responses']], [201, 404])
+        self.assertTrue(response.data['rolled_back'])
+        self.assertFalse(Comment.objects.exists())
+
+    def test_failed_read_does_not_roll_back_writes(self):
+        blog = self.blogs[0]
+        response = self.batch(
+            {'method': 'POST', 'path': f'/api/add_comment/{blog.pk}', 'body': {'content': 'kept'}},
+            {'path': '/api/blogs/999999/'},
+        )
+        self.assertEqual([item['status'] for item in response.data['responses']], [201, 404])
+        self.assertFalse(response.data['rolled_back'])
+        self.assertEqual(list(Comment.objects.values_list('content', flat=True)), ['kept'])
+
+    def test_max_requests(self):
+        response = self.batch(*[{'path': f'/api/blogs/{self.blogs[0].pk}/'}] * 4)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('At most 3', response.data['error'])
+
+
+# --------------------------
+# Query plans
+# --------------------------
+class QueryPlanTests(TestCase):
+    """
+    Seed хийсэн өгөгдөл дээр гол query-үүдийн EXPLAIN-д seq scan байхгүйг
+    шалгана. Жижиг хүснэгтэд planner seq scan сонгодог тул enable_seqscan=off:
+    тохирох index байхгүй үед л Seq Scan гарна.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cache.clear()
+        users = CustomUser.objects.bulk_create(
+            [CustomUser(email=f'plan{i}@example.com') for i in range(20)]
+        )
+        cls.user, cls.author = users[0], users[1]
+        place = Place.objects.create(
+            country=Country.objects.create(name='Mongolia', description=''), name='Khuvsgul', description='',
+        )
+        now = timezone.now()
+        blogs = Blog.objects.bulk_create([
+            Blog(user=users[i % 20], place=place, content=f'blog {i}', is_public=i % 3 != 0)
+            for i in range(600)
+        ])
+        Comment.objects.bulk_create([
+            Comment(user=users[i % 20], blog=blogs[i % 600], content='nice') for i in range(1200)
+        ])
+        Like.objects.bulk_create([Like(user=users[i % 20], blog=blogs[i]) for i in range(600)])
+        Save.objects.bulk_create([Save(user=users[i % 20], blog=blogs[i]) for i in range(0, 600, 2)])
+        Trip.objects.bulk_create([
+            Trip(user=users[i % 20], place=place, title=f'trip {i}', start_date=now.date(),
+                 end_date=(now - timedelta(days=i % 5 - 2)).date(), status=trip_status((now - timedelta(days=i % 5 - 2)).date()))
+            for i in range(400)
+        ])
+        build_timeline(cls.user)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute('RESET enable_seqscan')
+
+    def assertUsesIndexes(self, queryset):
+        plan = queryset.explain()
+        self.assertNotIn('Seq Scan', plan, f'\n{queryset.query}\n{plan}')
+
+    def feed(self):
+        return Blog.objects.with_feed_data(self.user).order_by('-created_at', '-id')
+
+    def test_home_feed(self):
+        self.assertUsesIndexes(live_feed(self.feed(), self.user).order_by(*FEED_ORDERING)[:21])
+        timeline = feed_horizon(self.user)
+        self.assertUsesIndexes(home_feed(self.feed(), self.user, timeline)[:21])
+
+    def test_profile_blogs(self):
+        self.assertUsesIndexes(self.feed().filter(user_id=self.author.pk)[:21])
+
+    def test_trending(self):
+        self.assertUsesIndexes(self.feed().filter(is_public=True).order_by('-trending_score', '-id')[:21])
+
+    def test_comments_of_blog(self):
+        blog = Blog.objects.first()
+        self.assertUsesIndexes(Comment.objects.filter(blog=blog).order_by('-created_at', '-id')[:21])
+
+    def test_trips(self):
+        trips = Trip.objects.filter(user=self.user).order_by('-created_at', '-id')
+        self.assertUsesIndexes(trips[:21])
+        self.assertUsesIndexes(trips.filter(status='planned')[:21])
+        self.assertUsesIndexes(Trip.objects.filter(status='planned', end_date__lt=timezone.localdate()))
+
+    def test_saved_blogs(self):
+        self.assertUsesIndexes(self.feed().filter(saves__user=self.user))
+
+    def test_delta_sync(self):
+        changes = sync_changes(self.user, encode_token(timezone.now() - timedelta(hours=1)))
+        for key in ('trips', 'blogs', 'comments', 'likes', 'saves', 'tombstones'):
+            with self.subTest(key):
+                self.assertUsesIndexes(changes[key])
+
+    def test_cascade_lookups(self):
+        # Хэрэглэгч/blog устгахад Django FK-аар хайдаг query-үүд
+        self.assertUsesIndexes(Blog.objects.filter(user=self.author))
+        self.assertUsesIndexes(Trip.objects.filter(user=self.author))
+        self.assertUsesIndexes(Comment.objects.filter(blog=Blog.objects.first()))
+
+
+# --------------------------
+# Cursor pagination
+# --------------------------
+class CreatedAtCursorPaginationTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        # 6 нь ижил created_at (хуудасны хилүүдийг давна): дараалал -id-аар.
+        # Хамгийн том id-тай нь хамгийн хуучин
+        self.blogs = self.make_blogs(7)
+        for blog, created_at in zip(self.blogs, [now] * 6 + [now - timedelta(hours=1)]):
+            Blog.objects.filter(pk=blog.pk).update(created_at=created_at, content=f'lake {blog.pk}')
+        Blog.objects.update(search_vector=blog_search_vector())
+        self.blogs = list(Blog.objects.all())
+        self.newest_first = [b.pk for b in sorted(self.blogs, key=lambda b: (b.created_at, b.pk), reverse=True)]
+
+    def paginate(self, params, backends=(), values=False):
+        view = SimpleNamespace(filter_backends=list(backends), search_fields=['content'])
+        request = Request(APIRequestFactory().get('/api/blogs/', params))
+        queryset = Blog.objects.all()
+        for backend in backends:
+            queryset = backend().filter_queryset(request, queryset, view)
+        if values:
+            queryset = queryset.values('id', 'created_at', *(['search_rank'] if backends else []))
+        paginator = CreatedAtCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view)
+        return [row['id'] if values else row.pk for row in page], paginator
+
+    def walk(self, params, max_pages=20, **kwargs):
+        """Эхнээс next-ээр, сүүлийн хуудаснаас previous-оор алхсан хуудсууд."""
+        page, paginator = self.paginate(params, **kwargs)
+        pages = {'next': [page], 'previous': []}
+        for link in ('next', 'previous'):
+            if link == 'previous':
+                pages[link].append(page)
+            while (url := getattr(paginator, f'get_{link}_link')()) is not None:
+                if len(pages[link]) >= max_pages:
+                    self.fail(f'{link} cursors did not terminate: {pages[link]}')
+                cursor = parse_qs(urlsplit(url).query)['cursor'][0]
+                page, paginator = self.paginate({**params, 'cursor': cursor}, **kwargs)
+                pages[link].append(page)
+        return pages['next'], pages['previous'][::-1]
+
+    def assertWalks(self, params, expected, **kwargs):
+        forward, backward = self.walk(params, **kwargs)
+        self.assertEqual([pk for page in forward for pk in page], expected)
+        self.assertTrue(all(len(page) == 2 for page in forward[:-1]))
+        self.assertEqual(backward, forward)
+
+    def test_ties_on_created_at_break_on_id(self):
+        for values in (False, True):
+            with self.subTest(values=values):
+                self.assertWalks({'page_size': 2}, self.newest_first, values=values)
+
+    def test_all_rows_share_created_at(self):
+        Blog.objects.update(created_at=timezone.now())
+        by_id = sorted((b.pk for b in self.blogs), reverse=True)
+        for values in (False, True):
+            with self.subTest(values=values):
+                self.assertWalks({'page_size': 2}, by_id, values=values)
+
+    def test_ordering_param_is_ignored(self):
+        # OrderingFilter байхгүй тул cursor-ийн эрэмбэ өөрчлөгдөхгүй
+        for ordering in ('created_at', 'id', '-content'):
+            with self.subTest(ordering=ordering):
+                self.assertWalks({'page_size': 2, 'ordering': ordering}, self.newest_first)
+
+    def test_search_pages_by_rank_then_id(self):
+        # Ижил rank-тай мөрүүд (lake) created_at биш -id-аар
+        expected = sorted((b.pk for b in self.blogs), reverse=True)
+        for values in (False, True):
+            with self.subTest(values=values):
+                self.assertWalks({'page_size': 2, 'search': 'lake'}, expected,
+                                 backends=[FullTextSearchFilter], values=values)
+        self.assertWalks({'page_size': 2, 'search': f'lake {self.blogs[0].pk}'}, [self.blogs[0].pk],
+                         backends=[FullTextSearchFilter])
+
+    def test_cursor_with_created_at_only_still_pages(self):
+        # Өмнөх хувилбарын cursor-т зөвхөн created_at байсан
+        tied = max(b.created_at for b in self.blogs)
+        cursor = base64.b64encode(urlencode({'p': str(tied)}).encode()).decode()
+        page, _ = self.paginate({'page_size': 2, 'cursor': cursor})
+        self.assertEqual(page, self.newest_first[6:])
+
+    def test_unpaginated_without_cursor_or_page_size(self):
+        request = Request(APIRequestFactory().get('/api/blogs/', {'ordering': 'id', 'search': 'lake'}))
+        self.assertIsNone(CreatedAtCursorPagination().paginate_queryset(Blog.objects.all(), request))
+
+
+# --------------------------
+# Search pagination
+# --------------------------
+class SearchPaginationTests(APITestMixin, TestCase):
+    def test_cursor_pages_keep_rank_order(self):
+        blogs = [
+            Blog.objects.create(user=self.author, is_public=True, content=' '.join(['lake'] * n + ['trip'] * (6 - n)))
+            for n in (2, 5, 1, 4, 3)
+        ]
+        Blog.objects.create(user=self.author, is_public=True, content='desert')
+        by_rank = [blogs[i].pk for i in (1, 3, 4, 0, 2)]
+
+        unpaginated = [b['id'] for b in self.client.get('/api/blogs/', {'search': 'lake'}).data]
+        self.assertEqual(unpaginated, by_rank)
+        self.assertEqual(self.collect_pages('/api/blogs/?search=lake&page_size=2'), by_rank)
+        with override_settings(API_FAST_SERIALIZATION=False):
+            self.assertEqual(self.collect_pages('/api/blogs/?search=lake&page_size=2'), by_rank)
+
+    def test_search_ignores_timeline_horizon(self):
+        old = Blog.objects.create(user=self.author, is_public=True, content='lake')
+        self.make_blogs(3)
+        build_timeline(self.user, limit=2)
+        self.assertEqual(self.collect_pages('/api/blogs/?search=lake&page_size=2'), [old.pk])
+
+
+# --------------------------
+# Event stream
+# --------------------------
+class EventStreamTests(APITestMixin, TestCase):
+    def auth_header(self):
+        return {'HTTP_AUTHORIZATION': f'Bearer {ClaimsTokenObtainPairSerializer.get_token(self.user).access_token}'}
+
+    def test_wsgi_request_is_rejected(self):
+        response = self.client.get('/api/events/', **self.auth_header())
+        self.assertEqual(response.status_code, 501)
+
+    async def test_asgi_request_streams(self):
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        response = await AsyncClient().get('/api/events/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        await stream.aclose()
+
+    def test_toggle_publishes_with_owner_from_cte(self):
+        blog = self.make_blogs(1)[0]
+        published = []
+        broker = InProcessBroker()
+        broker.publish = lambda topic, event: published.append((topic, event))
+        with mock.patch('travel_app.events.get_broker', return_value=broker):
+            with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(1):
+                toggle_blog_relation(Save, blog.pk, self.user)
+        self.assertEqual(published, [(user_topic(self.author.pk), {
+            'type': 'save.created', 'blog': blog.pk, 'user': self.user.pk, 'count': 1,
+        })])
+
+
+# --------------------------
+# Async views
+# --------------------------
+class AsyncMeTests(APITestMixin, TestCase):
+    def get_async_me(self, query=''):
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+
+        async def fetch():
+            return await AsyncClient().get(f'/api/async/me/{query}', headers={'Authorization': f'Bearer {token}'})
+        # Thread-sensitive ORM дуудлагууд энэ thread-ийн холболтоор явна
+        return async_to_sync(fetch)()
+
+    def test_single_query_matches_sync_view(self):
+        self.make_blogs(2)
+        Blog.objects.create(user=self.user, content='own')
+        with self.assertNumQueries(1):
+            response = self.get_async_me('?include=stats')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.client.get('/api/me/?include=stats').json())
+        self.assertEqual(response.json()['blog_count'], 1)
+
+
+# --------------------------
+# Response cache (Country/Place)
+# --------------------------
+class CachedResponseTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.country = Country.objects.create(name='Mongolia', description='')
+        self.place = Place.objects.create(country=self.country, name='Khuvsgul', description='')
+
+    def get(self, url, etag=None):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag) if etag else self.client.get(url)
+        self.assertIn(response.status_code, (200, 304), response.content)
+        return response
+
+    def names(self, response):
+        data = response.data['results'] if 'results' in response.data else response.data
+        return [item['name'] for item in data] if isinstance(data, list) else [data['name']]
+
+    def assertRefreshedAfter(self, urls, write, name):
+        etags = {url: self.get(url)['ETag'] for url in urls}
+        for url, etag in etags.items():
+            with self.assertNumQueries(0):  # cache-ээс
+                self.assertEqual(self.get(url, etag).status_code, 304)
+
+        write()
+        for url, etag in etags.items():
+            response = self.get(url, etag)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertNotEqual(response['ETag'], etag)
+            self.assertIn(name, self.names(response))
+            self.assertEqual(self.get(url, response['ETag']).status_code, 304)
+
+    def test_country_write_refreshes_list_and_detail(self):
+        def write():
+            self.country.name = 'Mongol Uls'
+            self.country.save()
+        self.assertRefreshedAfter(['/api/countries/', f'/api/countries/{self.country.pk}/'], write, 'Mongol Uls')
+
+    def test_place_write_through_api_refreshes_list_and_detail(self):
+        def write():
+            response = self.client.patch(f'/api/places/{self.place.pk}/', {'name': 'Khuvsgul Nuur'})
+            self.assertEqual(response.status_code, 200, response.content)
+        self.assertRefreshedAfter(['/api/places/', f'/api/places/{self.place.pk}/'], write, 'Khuvsgul Nuur')
+
+    def test_place_delete_refreshes_list(self):
+        url = '/api/places/'
+        etag = self.get(url)['ETag']
+        self.place.delete()
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.names(response), [])
+
+
+# --------------------------
+# Conditional GET scopes
+# --------------------------
+class ConditionalGetTests(APITestMixin, TestCase):
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response['ETag']
+
+    def is_not_modified(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_feed_page_changes_only_with_its_blogs(self):
+        old, *page = self.make_blogs(3)
+        url = '/api/blogs/?page_size=2'
+        etag = self.etag(url)
+        self.assertTrue(self.is_not_modified(url, etag))
+
+        # Хуудсанд ороогүй blog-ийн like ETag-ийг өөрчлөхгүй
+        toggle_blog_relation(Like, old.pk, self.author)
+        self.assertTrue(self.is_not_modified(url, etag))
+
+        toggle_blog_relation(Like, page[0].pk, self.author)
+        self.assertFalse(self.is_not_modified(url, etag))
+
+    def test_feed_changes_when_author_profile_changes(self):
+        self.make_blogs(2)
+        url = '/api/blogs/?page_size=2'
+        etag = self.etag(url)
+        self.author.first_name = 'Renamed'
+        self.author.save()
+        self.assertFalse(self.is_not_modified(url, etag))
+
+    def test_profile_change_invalidates_without_touching_blogs(self):
+        blog = self.make_blogs(1)[0]
+        commenter = make_user('commenter@example.com')
+        Comment.objects.create(blog=blog, user=commenter, content='nice')
+        urls = [f'/api/blogs/{blog.pk}/', f'/api/blogs/{blog.pk}/comments/', '/api/blogs/']
+        etags = [self.etag(url) for url in urls]
+
+        profile = commenter.profile
+        profile.username = 'renamed'
+        with CaptureQueriesContext(connection) as ctx:
+            profile.save()
+        # search_vector (зохиогчийн нэр)-оос бусад blog мөрийг шинэчлэхгүй
+        self.assertEqual([q for q in ctx.captured_queries if '"updated_at"' in q['sql']], [])
+        for url, etag in zip(urls, etags):
+            self.assertFalse(self.is_not_modified(url, etag), url)
+
+    def test_comment_list_is_scoped_per_blog(self):
+        first, second = self.make_blogs(2)
+        url = f'/api/blogs/{first.pk}/comments/'
+        etag = self.etag(url)
+
+        Comment.objects.create(blog=second, user=self.user, content='elsewhere')
+        toggle_blog_relation(Like, second.pk, self.user)
+        self.assertTrue(self.is_not_modified(url, etag))
+
+        Comment.objects.create(blog=first, user=self.user, content='here')
+        self.assertFalse(self.is_not_modified(url, etag))
+
+    def test_saved_blogs_are_scoped_per_user(self):
+        saved, other = self.make_blogs(2)
+        toggle_blog_relation(Save, saved.pk, self.user)
+        url = '/api/saved_blogs/'
+        etag = self.etag(url)
+
+        # Өөр хэрэглэгчийн save, хадгалаагүй blog-ийн like
+        toggle_blog_relation(Save, other.pk, self.author)
+        toggle_blog_relation(Like, other.pk, self.author)
+        self.assertTrue(self.is_not_modified(url, etag))
+
+        toggle_blog_relation(Like, saved.pk, self.author)
+        self.assertFalse(self.is_not_modified(url, etag))
+        etag = self.etag(url)
+        toggle_blog_relation(Save, other.pk, self.user)
+        self.assertFalse(self.is_not_modified(url, etag))
+
+
+# --------------------------
+# Request metrics
+# --------------------------
+class RequestMetricsTests(APITestMixin, TestCase):
+    def observed(self, view, key):
+        return registry.views.get((view, 'GET'), {}).get(key, 0)
+
+    def test_serialization_time_recorded_per_view(self):
+        blog = self.make_blogs(3)[0]
+        # Fast path (Plan.build_many) ба stock serializer
+        for view, url in (('blog-list', '/api/blogs/'), ('blog-detail', f'/api/blogs/{blog.pk}/')):
+            before = self.observed(view, 'serialize_time')
+            self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertGreater(self.observed(view, 'serialize_time'), before)
+        self.assertIn('travana_serialize_duration_seconds_total{view="blog-list"', registry.render())
+
+    @override_settings(QUERY_BUDGETS={'me': 0}, QUERY_BUDGET_STRICT=True)
+    def test_over_budget_raises_in_strict_mode(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/api/me/')
+
+    @override_settings(QUERY_BUDGETS={'me': 0}, QUERY_BUDGET_STRICT=False)
+    def test_over_budget_only_logs_otherwise(self):
+        with self.assertLogs('travel_app.metrics', 'WARNING') as logs:
+            response = self.client.get('/api/me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('(budget 0)', logs.output[0])
+
+
+# --------------------------
+# Async-capable middleware
+# --------------------------
+class AsyncMiddlewareTests(APITestMixin, TestCase):
+    def test_metrics_middleware_runs_async(self):
+        from .metrics import RequestMetricsMiddleware, registry
+
+        async def view(request):
+            return HttpResponse('ok')
+
+        middleware = RequestMetricsMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = AsyncRequestFactory().get('/api/async/me/')
+        request.resolver_match = resolve('/api/async/me/')
+        before = registry.views.get(('async_me', 'GET'), {}).get('count', 0)
+        response = async_to_sync(middleware)(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(registry.views[('async_me', 'GET')]['count'], before + 1)
+
+    def test_replica_middleware_pins_writer_async(self):
+        from .db_router import ReplicaRoutingMiddleware, use_replica
+
+        seen = []
+
+        async def view(request):
+            seen.append(use_replica.get())
+            return HttpResponse('ok')
+
+        middleware = ReplicaRoutingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        self.assertTrue(iscoroutinefunction(middleware.process_view))
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        factory = AsyncRequestFactory()
+        headers = {'Authorization': f'Bearer {token}'}
+
+        async def get():
+            request = factory.get('/api/blogs/', headers=headers)
+            request.resolver_match = resolve('/api/blogs/')
+            await middleware.process_view(request, view, (), {})
+            return await middleware(request)
+
+        async def post():
+            request = factory.post('/api/blogs/1/like/', headers=headers)
+            request.resolver_match = resolve('/api/blogs/1/like/')
+            return await middleware(request)
+
+        async_to_sync(get)()
+        async_to_sync(post)()
+        async_to_sync(get)()
+        # Бичилтийн дараа уншилт default DB-д
+        self.assertEqual(seen, [True, False, False])
+
+
+# --------------------------
+# Production settings
+# --------------------------
+class ProductionSettingsTests(SimpleTestCase):
+    module = 'taravana_backend.settings_production'
+
+    def load(self, **env):
+        with mock.patch.dict(os.environ, {'DJANGO_SECRET_KEY': 'test'}):
+            for name in ('REDIS_URL', 'DB_REPLICA_HOST'):
+                os.environ.pop(name, None)
+            os.environ.update(env)
+            sys.modules.pop(self.module, None)
+            try:
+                return importlib.import_module(self.module)
+            finally:
+                sys.modules.pop(self.module, None)
+
+    def test_requires_shared_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.load()
+        with self.assertRaises(ImproperlyConfigured):
+            self.load(DB_REPLICA_HOST='replica.internal')
+        self.assertEqual(self.load(REDIS_URL='redis://cache:6379/0').DEBUG, False)
+
+
+# --------------------------
+# Token bucket
+# --------------------------
+class TokenBucketTests(TestCase):
+    key = 'throttle:test:user:1'
+
+    def setUp(self):
+        caches['default'].delete(self.key)
+
+    def burst(self, requests=20, capacity=5, now=1000.0):
+        barrier = threading.Barrier(requests)
+        results = []
+
+        def hit():
+            barrier.wait()
+            results.append(take_token(self.key, capacity, 60)[0])
+
+        with mock.patch('travel_app.throttling.time.time', return_value=now):
+            threads = [threading.Thread(target=hit) for _ in range(requests)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return results.count(True)
+
+    def test_concurrent_burst_is_capped(self):
+        self.assertEqual(self.burst(), 5)
+
+    def test_refill_after_idle_is_capped(self):
+        self.assertEqual(self.burst(now=1000.0), 5)
+        # Bucket бүрэн дүүрсэн: зэрэг ирсэн request-ууд дахин capacity-аас хэтрэхгүй
+        self.assertEqual(self.burst(now=1000.0 + 60), 5)
+
+    def test_partial_refill(self):
+        self.assertEqual(self.burst(now=1000.0), 5)
+        # 60/5 = 12 секунд тутам нэг token
+        self.assertEqual(self.burst(now=1000.0 + 24), 2)
+        with mock.patch('travel_app.throttling.time.time', return_value=1000.0 + 30):
+            allowed, wait = take_token(self.key, 5, 60)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 6, places=2)
+
+
+@skipUnless(os.environ.get('REDIS_URL'), 'REDIS_URL not set')
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+    'LOCATION': os.environ.get('REDIS_URL'),
+}})
+class RedisTokenBucketTests(TokenBucketTests):
+    """Ижил шалгалтыг Lua script-ээр (REDIS_URL өгсөн үед)."""
@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'30/min' -> (30, 60): bucket-ийн багтаамж, бүрэн дүүрэх хугацаа (секунд)."""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+# --------------------------
+# Token bucket (GCRA)
+# --------------------------
+# Bucket-ийг нэг тоо - "theoretical arrival time" (TAT, ms)-аар хадгална.
+# Request бүр TAT-ийг max(TAT, одоо) + interval болгоно; шинэ TAT одоогоос
+# capacity * interval-аас хол гарвал bucket хоосон (TAT өөрчлөгдөхгүй).
+# Унших-тооцох-бичих нь атом байх ёстой: үгүй бол зэрэг ирсэн request-ууд
+# хуучин TAT-аас тооцож bucket-ийг давхар дүүргэнэ.
+#   RedisCache: Lua script (Redis дээр нэг атом алхам, бүх worker-т нийтлэг)
+#   Бусад: process-ийн lock (LocMemCache нь process бүрт тусдаа тул хангалттай)
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now) + interval
+if tat - now > burst then
+    return tat - now - burst
+end
+redis.call('SET', KEYS[1], tat, 'PX', ARGV[4])
+return 0
+"""
+
+_gcra_script = None
+_lock = threading.Lock()
+
+
+def _take_token_redis(cache, key, now, interval, burst, timeout):
+    global _gcra_script
+    key = cache.make_and_validate_key(key)
+    client = cache._cache.get_client(key, write=True)
+    if _gcra_script is None:
+        _gcra_script = client.register_script(GCRA_SCRIPT)
+    return _gcra_script(keys=[key], args=[now, interval, burst, timeout * 1000], client=client)
+
+
+def _take_token_local(cache, key, now, interval, burst, timeout):
+    with _lock:
+        tat = max(cache.get(key, now), now) + interval
+        if tat - now > burst:
+            return tat - now - burst
+        cache.set(key, tat, timeout)
+        return 0
+
+
+def take_token(key, capacity, period):
+    """(allowed, wait_seconds) буцаана."""
+    interval = int(period * 1000 / capacity)
+    now = int(time.time() * 1000)
+    timeout = period + 1  # үүнээс хойш bucket дүүрсэн тул key хэрэггүй
+
+    cache = caches['default']
+    take = _take_token_redis if isinstance(cache, RedisCache) else _take_token_local
+    wait_ms = take(cache, key, now, interval, capacity * interval, timeout)
+    return wait_ms == 0, wait_ms / 1000
+
+
+class RouteTokenBucketThrottle(BaseThrottle):
+    """
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']-д url name-ээр нь заасан
+    route-уудыг хэрэглэгч (нэвтрээгүй бол IP) тус бүрээр token bucket-аар
+    хязгаарлана. Бусад route-д нөлөөлөхгүй. Татгалзвал DRF 429 +
+    Retry-After буцаана. Cache алдаа гарвал request-ийг зөвшөөрнө.
+    """
+
+    def allow_request(self, request, view):
+        match = request.resolver_match
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(match.url_name) if match else None
+        if rate is None:
+            return True
+
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        capacity, period = parse_rate(rate)
+        try:
+            allowed, self.wait_seconds = take_token(f'throttle:{match.url_name}:{ident}', capacity, period)
+        except Exception:
+            logger.exception('Throttle store unavailable')
+            return True
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
@@ -0,0 +1,178 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Blog, Timeline, TimelineEntry
+
+logger = logging.getLogger(__name__)
+
+FANOUT_BATCH_SIZE = 1000
+# Backfill хийхэд хэрэглэгч бүрт оруулах сүүлийн нийтийн blog-ийн тоо
+BACKFILL_LIMIT = 500
+
+# Home feed-ийн cursor эрэмбэ: timeline-д TimelineEntry.created_at (user,
+# -created_at, -blog index), live query-д Blog.created_at.
+FEED_ORDERING = ('-feed_at', '-id')
+
+
+# --------------------------
+# Fan-out-on-write
+# --------------------------
+def fan_out(blog_id, author_id, created_at):
+    """
+    Нийтийн blog-ийг материалжсан timeline-тай бүх хэрэглэгчид (зохиогчоос бусад)
+    оруулна. Horizon нь blog-оос шинэ timeline-д оруулахгүй: тэдгээрийн
+    horizon-оос хуучин хэсгийг live query уншдаг.
+    """
+    user_ids = (
+        Timeline.objects.exclude(user_id=author_id)
+        .filter(Q(horizon__isnull=True) | Q(horizon__lte=created_at))
+        .values_list('user_id', flat=True)
+    )
+    batch = []
+    for user_id in user_ids.iterator(chunk_size=FANOUT_BATCH_SIZE):
+        batch.append(TimelineEntry(user_id=user_id, blog_id=blog_id, created_at=created_at))
+        if len(batch) >= FANOUT_BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+# Олон мянган timeline руу бичих нь blog үүсгэх request-ийг удаашруулахгүйн
+# тулд commit-ийн дараа thread pool-д ажиллана (travel_app.images-тэй адил).
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.TIMELINE_FANOUT_WORKERS,
+            thread_name_prefix='timeline-fanout',
+        )
+    return _executor
+
+
+def _run(*args):
+    close_old_connections()
+    try:
+        fan_out(*args)
+    except Exception:
+        logger.exception("Timeline fan-out failed for blog #%s", args[0])
+    finally:
+        close_old_connections()
+
+
+def enqueue_fan_out(blog):
+    args = (blog.pk, blog.user_id, blog.created_at)
+    if settings.TIMELINE_FANOUT_EAGER:
+        transaction.on_commit(lambda: fan_out(*args))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run, *args))
+
+
+def retract(blog):
+    TimelineEntry.objects.filter(blog_id=blog.pk).delete()
+
+
+def build_timeline(user, limit=BACKFILL_LIMIT):
+    """Хэрэглэгчийн timeline-ийг сүүлийн `limit` нийтийн blog-оор дүүргэж, материалжсан гэж тэмдэглэнэ."""
+    limit = min(limit, settings.TIMELINE_MAX_ENTRIES)
+    blogs = list(
+        Blog.objects.filter(is_public=True)
+        .exclude(user=user)
+        .order_by('-created_at', '-id')
+        .values_list('pk', 'created_at')[:limit]
+    )
+    # Бүх нийтийн blog багтсан бол horizon байхгүй (timeline бүрэн)
+    horizon = blogs[-1][1] if len(blogs) == limit else None
+    with transaction.atomic():
+        Timeline.objects.update_or_create(user=user, defaults={'horizon': horizon})
+        if horizon is not None:
+            TimelineEntry.objects.filter(user=user, created_at__lt=horizon).delete()
+        TimelineEntry.objects.bulk_create(
+            [TimelineEntry(user=user, blog_id=pk, created_at=created_at) for pk, created_at in blogs],
+            ignore_conflicts=True,
+            batch_size=FANOUT_BATCH_SIZE,
+        )
+
+
+def trim_timelines(max_entries=None):
+    """
+    Хэрэглэгч бүрийн timeline-д хамгийн шинэ `max_entries` entry-г үлдээж,
+    horizon-ийг нь ахиулна. Устгасан хэсгийг home feed live query-гээр уншина.
+    Нэг цагтай entry-үүдийг (horizon дээр) бүгдийг нь үлдээнэ.
+    """
+    max_entries = settings.TIMELINE_MAX_ENTRIES if max_entries is None else max_entries
+    user_ids = (
+        TimelineEntry.objects.values('user_id')
+        .annotate(entries=Count('id'))
+        .filter(entries__gt=max_entries)
+        .values_list('user_id', flat=True)
+    )
+    deleted = 0
+    for user_id in list(user_ids):
+        entries = TimelineEntry.objects.filter(user_id=user_id)
+        cutoff = entries.order_by('-created_at').values_list('created_at', flat=True)[max_entries - 1]
+        with transaction.atomic():
+            Timeline.objects.filter(user_id=user_id).update(horizon=cutoff)
+            count, _ = entries.filter(created_at__lt=cutoff).delete()
+        deleted += count
+    return deleted
+
+
+# --------------------------
+# Home feed
+# --------------------------
+def feed_horizon(user):
+    """
+    Материалжсан timeline байхгүй бол None; байвал `{'horizon': ...}`
+    (horizon=None бол timeline бүх нийтийн blog-ийг агуулна).
+    """
+    return Timeline.objects.filter(user=user).values('horizon').first()
+
+
+def live_feed(queryset, user):
+    return queryset.filter(is_public=True).exclude(user=user).annotate(feed_at=F('created_at'))
+
+
+def reads_timeline(timeline, before):
+    if not timeline:
+        return False
+    horizon = timeline['horizon']
+    return horizon is None or before is None or before > horizon
+
+
+def home_feed(queryset, user, timeline=None, before=None):
+    """
+    `timeline` (feed_horizon()-ийн утга)-тай бөгөөд cursor-ийн байрлал
+    (`before`) horizon-оос шинэ бол TimelineEntry-ээс (user, created_at)
+    index-ээр уншина; үгүй бол live query (бүх нийтийн blog, өөрийнхөөс бусад).
+    Хоёулаа ижил blog-уудыг FEED_ORDERING-оор буцаах тул cursor аль алинд нь
+    хүчинтэй.
+    """
+    if reads_timeline(timeline, before):
+        return (
+            queryset.filter(timeline_entries__user=user, is_public=True)
+            .annotate(feed_at=F('timeline_entries__created_at'))
+            .order_by(*FEED_ORDERING)
+        )
+    return live_feed(queryset, user).order_by(*FEED_ORDERING)
+
+
+@receiver(post_save, sender=Blog)
+def update_timelines(sender, instance, created, **kwargs):
+    was_public = None if created else getattr(instance, '_loaded_is_public', None)
+    instance._loaded_is_public = instance.is_public
+
+    if instance.is_public:
+        if not was_public:
+            enqueue_fan_out(instance)
+    elif not created and was_public is not False:
+        retract(instance)
@@ -0,0 +1,102 @@
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .caching import blog_scope, bump_version, saved_scope
+from .events import publish_blog_event
+from .models import Blog, COUNTER_FIELDS, Save, Tombstone
+
+
+# --------------------------
+# Like / Save toggle
+# --------------------------
+# PostgreSQL дээр DELETE ... RETURNING, INSERT ... ON CONFLICT DO NOTHING болон
+# тоолуурын UPDATE-ийг нэг statement (data-modifying CTE) болгон ажиллуулна.
+# Давхар дарсан үед хоёр дахь нь ON CONFLICT-д таарч юу ч өөрчлөхгүй.
+# Signal илгээгдэхгүй тул delta sync-ийн tombstone-ийг мөн энд бичнэ. Цагийг
+# (created_at, deleted_at, updated_at) ORM-тэй адил app-аас %(now)s-оор өгнө.
+TOGGLE_SQL = """
+WITH del AS (
+    DELETE FROM {rel} WHERE blog_id = %(blog_id)s AND user_id = %(user_id)s
+    RETURNING id, user_id, blog_id
+),
+tomb AS (
+    INSERT INTO {tombstone} (model, object_id, user_id, blog_id, deleted_at)
+    SELECT %(model)s, id, user_id, blog_id, %(now)s FROM del
+),
+ins AS (
+    INSERT INTO {rel} (blog_id, user_id, created_at)
+    SELECT %(blog_id)s, %(user_id)s, %(now)s
+    WHERE NOT EXISTS (SELECT 1 FROM del)
+      AND EXISTS (SELECT 1 FROM {blog} WHERE id = %(blog_id)s)
+    ON CONFLICT (blog_id, user_id) DO NOTHING
+    RETURNING 1
+),
+upd AS (
+    UPDATE {blog}
+    SET {counter} = GREATEST({counter} + (SELECT COUNT(*) FROM ins) - (SELECT COUNT(*) FROM del), 0),
+        updated_at = %(now)s
+    WHERE id = %(blog_id)s
+    RETURNING {counter}, user_id
+)
+SELECT NOT EXISTS (SELECT 1 FROM del), {counter}, user_id FROM upd
+"""
+
+
+def toggle_blog_relation(model, blog_id, user):
+    """
+    `model` (Like эсвэл Save)-ийн мөрийг асааж/унтраана.
+
+    Шинэ төлөв (True = идэвхтэй) болон blog-ийн шинэчлэгдсэн тоолуурыг буцаана.
+    Blog байхгүй бол Blog.DoesNotExist шиднэ.
+    """
+    counter = COUNTER_FIELDS[model]
+    if connection.vendor == 'postgresql':
+        return _toggle_postgresql(model, counter, blog_id, user)
+    return _toggle_orm(model, counter, blog_id, user)
+
+
+def _toggle_postgresql(model, counter, blog_id, user):
+    qn = connection.ops.quote_name
+    sql = TOGGLE_SQL.format(
+        rel=qn(model._meta.db_table),
+        blog=qn(Blog._meta.db_table),
+        counter=qn(counter),
+        tombstone=qn(Tombstone._meta.db_table),
+    )
+    # auto_now/auto_now_add-тэй адил app-ийн цаг (models.bump_blog_counter)
+    params = {'blog_id': blog_id, 'user_id': user.pk, 'model': model._meta.model_name, 'now': timezone.now()}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+
+    if row is None:  # upd мөргүй: blog байхгүй
+        raise Blog.DoesNotExist
+    active, count, owner_id = row
+    # Raw SQL нь signal илгээхгүй тул ETag scope-уудыг хүчингүй болгож, push
+    # event-ийг энд илгээнэ (feed-ийн validator-ийг upd-ийн updated_at шинэчилнэ)
+    bump_version(blog_scope(blog_id))
+    if model is Save:
+        bump_version(saved_scope(user.pk))
+    event = f"{model._meta.model_name}.{'created' if active else 'deleted'}"
+    publish_blog_event(event, blog_id, owner_id=owner_id, user=user.pk, count=count)
+    return active, count
+
+
+def _toggle_orm(model, counter, blog_id, user):
+    # PostgreSQL биш backend (жишээ нь SQLite) дээрх fallback.
+    # Тоолуурыг post_save/post_delete signal шинэчилнэ.
+    with transaction.atomic():
+        blogs = Blog.objects.select_for_update().filter(pk=blog_id)
+        if not blogs.exists():
+            raise Blog.DoesNotExist
+
+        deleted, _ = model.objects.filter(blog_id=blog_id, user=user).delete()
+        active = not deleted
+        if active:
+            try:
+                with transaction.atomic():
+                    model.objects.create(blog_id=blog_id, user=user)
+            except IntegrityError:
+                pass  # Зэрэгцээ хүсэлт аль хэдийн үүсгэсэн
+
+        return active, blogs.values_list(counter, flat=True).get()
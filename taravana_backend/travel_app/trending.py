@@ -0,0 +1,161 @@
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Blog, Comment, Like, Place, Save, Trip
+
+# --------------------------
+# Time-decayed score
+# --------------------------
+# Үйлдэл бүрийн жин w нь half-life тутамд хоёр дахин буурна. Оноог тогтмол
+# EPOCH-оос хэмжиж log2 хэлбэрээр хадгалдаг:
+#
+#     score = log2( Σ w · 2^((t - EPOCH) / half_life) )
+#
+# Ингэснээр хоёр объектын дараалал цаг хугацаанаас хамаарахгүй, шинэ үйлдэл
+# гарсан объектыг л дахин тооцоход хангалттай (incremental).
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+BLOG_HALF_LIFE_HOURS = 24
+PLACE_HALF_LIFE_HOURS = 24 * 7
+
+BLOG_WEIGHTS = {'post': 1.0, 'like': 1.0, 'save': 2.0, 'comment': 1.5}
+# 'created': идэвхгүй газруудыг ч (0 дээр тэнцэхгүйгээр) шинэ нь түрүүлж эрэмбэлэгдэнэ
+PLACE_WEIGHTS = {'trip': 3.0, 'blog': 1.0, 'created': 0.1}
+
+BATCH_SIZE = 500
+
+
+def decayed_score(events, half_life_hours):
+    """events: (datetime, weight) жагсаалт. log-sum-exp-ээр overflow-гүй тооцно."""
+    exponents = [
+        (at - EPOCH).total_seconds() / 3600 / half_life_hours + math.log2(weight)
+        for at, weight in events
+    ]
+    if not exponents:
+        return 0.0
+    top = max(exponents)
+    return top + math.log2(sum(2 ** (e - top) for e in exponents))
+
+
+def _events_by_blog(model, blog_ids, weight):
+    events = {}
+    rows = model.objects.filter(blog_id__in=blog_ids).values_list('blog_id', 'created_at')
+    for blog_id, created_at in rows.iterator():
+        events.setdefault(blog_id, []).append((created_at, weight))
+    return events
+
+
+# --------------------------
+# Blog
+# --------------------------
+def _newer(model, field):
+    return Exists(model.objects.filter(**{field: OuterRef('pk'), 'created_at__gt': OuterRef('scored_at')}))
+
+
+def stale_blogs():
+    """Сүүлд тооцсоноос хойш шинэ like/save/comment авсан, эсвэл огт тооцоогүй blog-ууд."""
+    return Blog.objects.filter(
+        Q(scored_at__isnull=True) | _newer(Like, 'blog') | _newer(Save, 'blog') | _newer(Comment, 'blog')
+    )
+
+
+def score_blogs(blog_ids, now):
+    blogs = list(Blog.objects.filter(pk__in=blog_ids).only('id', 'created_at'))
+    ids = [blog.pk for blog in blogs]
+    related = [
+        _events_by_blog(Like, ids, BLOG_WEIGHTS['like']),
+        _events_by_blog(Save, ids, BLOG_WEIGHTS['save']),
+        _events_by_blog(Comment, ids, BLOG_WEIGHTS['comment']),
+    ]
+    for blog in blogs:
+        events = [(blog.created_at, BLOG_WEIGHTS['post'])]
+        for by_blog in related:
+            events.extend(by_blog.get(blog.pk, []))
+        blog.trending_score = decayed_score(events, BLOG_HALF_LIFE_HOURS)
+        blog.scored_at = now
+    Blog.objects.bulk_update(blogs, ['trending_score', 'scored_at'])
+
+
+# --------------------------
+# Place
+# --------------------------
+def stale_places(touched_blog_ids):
+    touched = Blog.objects.filter(pk__in=touched_blog_ids, place__isnull=False).values('place_id')
+    return Place.objects.filter(
+        Q(scored_at__isnull=True) | Q(pk__in=touched) | _newer(Trip, 'place')
+    )
+
+
+def score_places(place_ids, now):
+    places = list(Place.objects.filter(pk__in=place_ids).only('id', 'created_at'))
+    ids = [place.pk for place in places]
+
+    events = {place.pk: [(place.created_at, PLACE_WEIGHTS['created'])] for place in places}
+    for place_id, created_at in Trip.objects.filter(place_id__in=ids).values_list('place_id', 'created_at').iterator():
+        events.setdefault(place_id, []).append((created_at, PLACE_WEIGHTS['trip']))
+
+    # Газрын blog-уудын идэвх (blog-ийн оноог шууд биш, үйлдлүүдийг нь) тооцно
+    blogs = list(Blog.objects.filter(place_id__in=ids).values_list('pk', 'place_id', 'created_at'))
+    blog_ids = [pk for pk, _, _ in blogs]
+    blog_events = [
+        _events_by_blog(Like, blog_ids, BLOG_WEIGHTS['like']),
+        _events_by_blog(Save, blog_ids, BLOG_WEIGHTS['save']),
+        _events_by_blog(Comment, blog_ids, BLOG_WEIGHTS['comment']),
+    ]
+    for blog_id, place_id, created_at in blogs:
+        place_events = events[place_id]
+        place_events.append((created_at, PLACE_WEIGHTS['blog']))
+        for by_blog in blog_events:
+            place_events.extend(by_blog.get(blog_id, []))
+
+    for place in places:
+        place.popularity_score = decayed_score(events.get(place.pk, []), PLACE_HALF_LIFE_HOURS)
+        place.scored_at = now
+    Place.objects.bulk_update(places, ['popularity_score', 'scored_at'])
+
+
+def _batches(ids):
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+def update_trending(full=False):
+    """Хуучирсан blog, place-уудын оноог дахин тооцно. (blog_count, place_count) буцаана."""
+    now = timezone.now()
+    blogs = Blog.objects.all() if full else stale_blogs()
+    blog_ids = list(blogs.values_list('pk', flat=True))
+    for batch in _batches(blog_ids):
+        score_blogs(batch, now)
+
+    places = Place.objects.all() if full else stale_places(blog_ids)
+    place_ids = list(places.values_list('pk', flat=True))
+    for batch in _batches(place_ids):
+        score_places(batch, now)
+    return len(blog_ids), len(place_ids)
+
+
+# --------------------------
+# Seed on insert
+# --------------------------
+# Cron тооцоогүй шинэ мөр бүгд 0 оноотой байвал TrendingCursorPagination
+# тэнцүү утгууд дотор OFFSET-оор гүйдэг. Үүсгэх үед нь "зөвхөн нийтлэгдсэн"
+# оноог өгснөөр байрлал бараг үргэлж давтагдашгүй болно.
+@receiver(pre_save, sender=Blog)
+def seed_blog_score(sender, instance, **kwargs):
+    if instance._state.adding and instance.scored_at is None:
+        instance.trending_score = decayed_score(
+            [(instance.created_at or timezone.now(), BLOG_WEIGHTS['post'])], BLOG_HALF_LIFE_HOURS
+        )
+
+
+@receiver(pre_save, sender=Place)
+def seed_place_score(sender, instance, **kwargs):
+    if instance._state.adding and instance.scored_at is None:
+        instance.popularity_score = decayed_score(
+            [(instance.created_at or timezone.now(), PLACE_WEIGHTS['created'])], PLACE_HALF_LIFE_HOURS
+        )
@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import bump_version, trip_scope
+from .models import Trip
+
+
+def complete_expired_trips(batch_size=5000, today=None):
+    """
+    end_date нь өнгөрсөн 'planned' trip-үүдийг batch_size-аар нь нэг
+    UPDATE-ээр 'completed' болгоно. Хайлт (status, end_date) index-ээр явна;
+    batch бүр тусдаа transaction тул урт lock барихгүй.
+
+    QuerySet.update() signal илгээхгүй тул өөрчлөгдсөн хэрэглэгчдийн trip
+    cache-ийг энд хүчингүй болгоно. Шилжүүлсэн trip-ийн тоог буцаана.
+    """
+    today = today or timezone.now().date()
+    expired = Trip.objects.filter(status='planned', end_date__lt=today).order_by('end_date', 'id')
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            batch = list(expired.values_list('id', 'user_id')[:batch_size])
+            if not batch:
+                break
+            ids = [trip_id for trip_id, _ in batch]
+            # Давхар ажилласан sweep-тэй зөрчилдөхгүйн тулд status-ийг дахин шалгана
+            # updated_at: auto_now-тэй адил app-ийн цаг (delta sync-ийн token)
+            total += Trip.objects.filter(pk__in=ids, status='planned').update(
+                status='completed', updated_at=timezone.now(),
+            )
+            user_ids = {user_id for _, user_id in batch if user_id is not None}
+
+        for user_id in user_ids:
+            bump_version(trip_scope(user_id))
+    return total
@@ -1,23 +1,58 @@
-from django.db.models import Q
+from django.db.models import Q, OuterRef, Subquery
+from django.utils.dateparse import parse_datetime
 from rest_framework import viewsets, filters, status
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from .models import *
 from .serializers import *
 from .permissions import IsOwnerOrAdmin
+from .authentication import confirm_claims
+from .pagination import (
+    CreatedAtCursorPagination, PopularPlaceCursorPagination, TrendingCursorPagination,
+)
+from .toggles import toggle_blog_relation
+from .search import FullTextSearchFilter
+from .images import atomic_upload, bulk_create_blog_images
+from .timeline import FEED_ORDERING, feed_horizon, home_feed, live_feed, reads_timeline
+from .sync import sync_changes
+from .fastpath import (
+    BLOG_LIST_PLAN, COMMENT_PLAN, TRIP_PLAN, FastListMixin, fast_path_enabled, ordering_fields, values_rows,
+)
+from .caching import (
+    CachedResponseMixin, ConditionalGetMixin, blog_scope, conditional_get, embedded_profiles, freshness,
+    rows_freshness, saved_scope, trip_scope, user_scope,
+)
 
 # GET USER
+def me_include_stats(request):
+    # DRF Request ба async view-ийн HttpRequest аль алинд
+    return 'stats' in request.GET.get('include', '').split(',')
+
+
+def me_etag_scopes(request):
+    user = request.user
+    if me_include_stats(request):
+        # likes_received: өөрийн blog-уудын тоолуур (updated_at), saved_count: saved scope
+        return [user_scope(user.pk), saved_scope(user.pk), freshness(Blog.objects.filter(user=user))]
+    return [user_scope(user.pk)]
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(me_etag_scopes)
 def get_me(request):
-    user = request.user
-    blogCount = Blog.objects.filter(user=user).count()
-    tripCount = Trip.objects.filter(user=user).count()
+    # Profile, blog/trip тоо (?include=stats бол like, save тоо) нэг query-д
+    extended = me_include_stats(request)
+    user = CustomUser.objects.with_stats(extended=extended).get(pk=request.user.pk)
     serializer = UserSerializer(user)
     response_data = serializer.data
-    response_data["blog_count"] = blogCount
-    response_data["trip_count"] = tripCount
+    response_data["blog_count"] = user.blog_count
+    response_data["trip_count"] = user.trip_count
+    if extended:
+        response_data["likes_received"] = user.likes_received
+        response_data["saved_count"] = user.saved_count
     return Response(response_data)
 
 @api_view(['PATCH', 'PUT'])
@@ -39,7 +74,8 @@ def update_profile(request):
 
  
 # Country
-class CountryViewSet(viewsets.ModelViewSet):
+class CountryViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+    cache_scope = 'country'
     queryset = Country.objects.all()
     serializer_class = CountrySerializer
     permission_classes = [AllowAny]
@@ -47,18 +83,39 @@ class CountryViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description']
 
 # Place
-class PlaceViewSet(viewsets.ModelViewSet):
+class PlaceViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+    cache_scope = 'place'
     queryset = Place.objects.all()
     serializer_class = PlaceSerializer
     permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', 'country', 'description', 'tags']
+    filter_backends = [FullTextSearchFilter]
+    search_fields = ['name', 'country__name', 'description', 'tags']
+    trigram_fields = ['name']  # алдаатай бичсэн газрын нэр
+
+    @action(detail=False, pagination_class=PopularPlaceCursorPagination)
+    def popular(self, request):
+        # popularity_score-ийг `manage.py update_trending` тооцно
+        queryset = Place.objects.order_by('-popularity_score', '-id')
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
 # Blog
-class BlogViewSet(viewsets.ModelViewSet):
+def comment_preview_count(request):
+    """
+    BlogListSerializer-ийн comment preview-ийн тоо; `?expand=comments` үед
+    None (бүх comment-ийг нэг prefetch-ээр ачаална, blog бүрт query гаргахгүй).
+    """
+    expand = request.query_params.get('expand', '').split(',')
+    return None if 'comments' in expand else BlogListSerializer.COMMENT_PREVIEW_COUNT
+
+
+class BlogViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Blog.objects.all()
     serializer_class = BlogSerializer
-    filter_backends = [filters.SearchFilter]
+    permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+    filter_backends = [FullTextSearchFilter]
+    fast_plan = BLOG_LIST_PLAN
 
     # 🔍 ХАЙЛТ ХИЙХ ТАЛБАРУУД
     search_fields = [
@@ -72,15 +129,80 @@ class BlogViewSet(viewsets.ModelViewSet):
         user = self.request.user
         user_id = self.request.query_params.get('user_id')
 
-        qs = Blog.objects.select_related(
-            "user",
-            "user__profile"
-        ).order_by('-created_at')
+        qs = Blog.objects.with_feed_data(
+            user, comment_previews=self.comment_preview_count()
+        ).order_by('-created_at', '-id')
 
         if user_id:
             return qs.filter(user_id=user_id)
-
-        return qs.filter(is_public=True).exclude(user=user)
+        if self.action != 'list':
+            # Detail/засах/устгах: нийтийн эсвэл өөрийн blog (засах эрхийг IsOwnerOrAdmin шалгана)
+            return qs.filter(Q(is_public=True) | Q(user=user))
+
+        # Home feed: cursor-оор хуудаслах үед материалжсан timeline, бүтэн
+        # жагсаалт хүлээдэг хуучин client-д live query
+        timeline = cursor = None
+        searching = api_settings.SEARCH_PARAM in self.request.query_params
+        if self.paginator is not None and self.paginator.is_paginating(self.request):
+            self.paginator.ordering = FEED_ORDERING
+            cursor = self.paginator.decode_cursor(self.request)
+            # Хайлт horizon-оос хуучин blog-уудыг ч хамрах ёстой (rank-аар эрэмбэлнэ)
+            if not searching:
+                timeline = feed_horizon(user)
+        before = None
+        if timeline and cursor and cursor.position:
+            before = parse_datetime(self.paginator.position_values(cursor.position)[0])
+        if reads_timeline(timeline, before):
+            self.feed_timeline = timeline
+        return home_feed(qs, user, timeline, before)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        timeline = getattr(self, 'feed_timeline', None)
+        paginator = self.paginator
+        if (
+            page is not None and timeline and timeline['horizon'] is not None
+            and not paginator.has_next and not (paginator.cursor and paginator.cursor.reverse)
+            and live_feed(Blog.objects.all(), self.request.user).filter(feed_at__lt=timeline['horizon']).exists()
+        ):
+            # Timeline дууссан: дараагийн cursor (сүүлийн мөрийн байрлал, эсвэл
+            # horizon) horizon-оос хуучин blog-уудыг live query-гээр үргэлжлүүлнэ
+            paginator.has_next = True
+            paginator.next_position = None if page else paginator.encode_position([timeline['horizon']])
+        return page
+
+    def get_serializer_class(self):
+        # Жагсаалтад хөнгөн хувилбар, detail/create/update-д бүтэн BlogSerializer
+        if self.action in ('list', 'trending'):
+            return BlogListSerializer
+        return BlogSerializer
+
+    def comment_preview_count(self):
+        if self.action not in ('list', 'trending'):
+            return None
+        return comment_preview_count(self.request)
+
+    @action(detail=False, pagination_class=TrendingCursorPagination)
+    def trending(self, request):
+        # trending_score-ийг `manage.py update_trending` тооцно
+        queryset = Blog.objects.with_feed_data(
+            request.user, comment_previews=self.comment_preview_count()
+        ).filter(is_public=True).order_by('-trending_score', '-id')
+        return self.list_response(request, queryset)
+
+    def get_etag_scopes(self):
+        if self.action == 'retrieve':
+            return [blog_scope(self.kwargs['pk']), embedded_profiles([self.kwargs['pk']])]
+        # Feed: тухайн хуудасны blog-уудын id, max(updated_at) ба тоо (payload-гүй)
+        queryset = self.filter_queryset(self.get_queryset())
+        extra = [
+            name for name in ordering_fields(self.paginator, self.request, queryset, self)
+            if name not in ('id', 'updated_at')
+        ]
+        rows = queryset.prefetch_related(None).values('id', 'updated_at', *extra)
+        page = self.paginate_queryset(rows)
+        rows = list(rows if page is None else page)
+        return [rows_freshness(rows), embedded_profiles([row['id'] for row in rows])]
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -88,32 +210,28 @@ class BlogViewSet(viewsets.ModelViewSet):
         return context
 
     def perform_create(self, serializer):
-        blog = serializer.save()
         images = self.request.FILES.getlist('images')
-        for img in images:
-            BlogImage.objects.create(blog=blog, image=img)
+        # Blog болон бүх зураг нэг transaction-д: дундаас нь алдаа гарвал хагас blog,
+        # storage-д өнчин файл үлдэхгүй
+        with atomic_upload():
+            blog = serializer.save()
+            bulk_create_blog_images(blog, images)
 
       
 
 # Trip
-class TripViewSet(viewsets.ModelViewSet):
+class TripViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = TripSerializer
+    fast_plan = TRIP_PLAN
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [FullTextSearchFilter]
     search_fields = ['title', 'place__name', 'notes', 'budget', 'start_date', 'end_date']
 
     def get_queryset(self):
         # Зөвхөн тухайн хэрэглэгчийн trip-үүдийг авна
-        queryset = Trip.objects.filter(user=self.request.user).order_by('-created_at')
+        queryset = Trip.objects.filter(user=self.request.user).order_by('-created_at', '-id')
 
-        # Search query
-        search = self.request.query_params.get('search', '')
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(place__name__icontains=search) |
-                Q(notes__icontains=search)
-            )
+        # Search query-г FullTextSearchFilter гүйцэтгэнэ (?search=)
 
         # Status filter
         status = self.request.query_params.get('status', None)
@@ -122,6 +240,9 @@ class TripViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def get_etag_scopes(self):
+        return [trip_scope(self.request.user.pk)]
+
     def perform_create(self, serializer):
         # Trip үүсгэх үед user-г автоматаар онооно
         serializer.save(user=self.request.user)
@@ -129,22 +250,11 @@ class TripViewSet(viewsets.ModelViewSet):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def toggle_like(request, blog_id):
-    user = request.user
     try:
-        blog = Blog.objects.get(id=blog_id)
+        liked, likes_count = toggle_blog_relation(Like, blog_id, request.user)
     except Blog.DoesNotExist:
         return Response({"ERROR":"Blog not found"}, status=400)
 
-    like = Like.objects.filter(blog=blog, user=user).first()
-    
-    if like:
-        like.delete()
-        liked = False
-    else:
-        Like.objects.create(blog=blog, user=user)
-        liked = True
-
-    likes_count = blog.likes.count()  # like тоо
     return Response({
         "message": "liked" if liked else "unliked",
         "liked": liked,
@@ -179,14 +289,31 @@ def add_comment(request, blog_id):
 # --------------------------
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(lambda request, blog_id: [blog_scope(blog_id), embedded_profiles([blog_id])])
 def list_comments(request, blog_id):
     try:
         blog = Blog.objects.get(id=blog_id)
     except Blog.DoesNotExist:
         return Response({"error": "Blog not found"}, status=404)
 
-    comments = Comment.objects.filter(blog=blog).order_by('-created_at')
-    serializer = CommentSerializer(comments, many=True)
+    comments = Comment.objects.filter(blog=blog).select_related(
+        'user', 'user__profile'
+    ).order_by('-created_at', '-id')
+
+    paginator = CreatedAtCursorPagination()
+    if fast_path_enabled(request):
+        rows = values_rows(comments, COMMENT_PLAN, ordering_fields(paginator, request, comments))
+        page = paginator.paginate_queryset(rows, request)
+        if page is not None:
+            return paginator.get_paginated_response(COMMENT_PLAN.build_many(page, request))
+        return Response(COMMENT_PLAN.build_many(rows, request))
+
+    page = paginator.paginate_queryset(comments, request)
+    if page is not None:
+        serializer = CommentSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+    serializer = CommentSerializer(comments, many=True, context={'request': request})
     return Response(serializer.data)
 
 # --------------------------
@@ -201,7 +328,7 @@ def delete_comment(request, comment_id):
         return Response({"error": "Comment not found"}, status=404)
 
     # Хэрэв хэрэглэгч нь comment-н эзэн эсвэл admin биш бол зөвшөөрөхгүй
-    if comment.user != request.user and not request.user.is_staff:
+    if comment.user != request.user and not (request.user.is_staff and confirm_claims(request.user, is_staff=True)):
         return Response({"error": "You do not have permission to delete this comment."}, status=403)
 
     comment.delete()
@@ -210,22 +337,11 @@ def delete_comment(request, comment_id):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def toggle_save(request, blog_id):
-    user = request.user
     try:
-        blog = Blog.objects.get(id=blog_id)
+        saved, save_count = toggle_blog_relation(Save, blog_id, request.user)
     except Blog.DoesNotExist:
         return Response({"error": "Blog not found"}, status=404)
 
-    saved_obj = Save.objects.filter(user=user, blog=blog).first()
-
-    if saved_obj:
-        saved_obj.delete()
-        saved = False
-    else:
-        Save.objects.create(user=user, blog=blog)
-        saved = True
-
-    save_count = Save.objects.filter(blog=blog).count()
     return Response({
         "message": "saved" if saved else "unsaved",
         "saved": saved,
@@ -235,11 +351,22 @@ def toggle_save(request, blog_id):
 # views.py
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(lambda request: [
+    saved_scope(request.user.pk), freshness(Blog.objects.filter(saves__user=request.user)),
+    embedded_profiles(Save.objects.filter(user=request.user).values('blog_id')),
+])
 def saved_blogs(request):
     user = request.user
-    saves = Save.objects.filter(user=user).select_related('blog', 'blog__user', 'blog__user__profile')
-    blogs = [s.blog for s in saves]  # Save -> Blog объектууд
-    serializer = BlogSerializer(blogs, many=True, context={'request': request})
+    saved_at = Save.objects.filter(user=user, blog=OuterRef('pk')).values('created_at')[:1]
+    blogs = (
+        Blog.objects.with_feed_data(user, comment_previews=comment_preview_count(request))
+        .filter(saves__user=user)
+        .annotate(saved_at=Subquery(saved_at))
+        .order_by('saved_at')
+    )
+    if fast_path_enabled(request):
+        return Response(BLOG_LIST_PLAN.build_many(values_rows(blogs, BLOG_LIST_PLAN), request))
+    serializer = BlogListSerializer(blogs, many=True, context={'request': request})
     return Response(serializer.data)
 
 
@@ -256,8 +383,49 @@ def delete_blog(request, blog_id):
         return Response({"detail": "No Blog matches the given query."}, status=404)
 
     # Зөвхөн эзэн хэрэглэгч устгах боломжтой
-    if blog.user != request.user and not request.user.is_staff:
+    if blog.user != request.user and not (request.user.is_staff and confirm_claims(request.user, is_staff=True)):
         return Response({"error": "You do not have permission to delete this blog."}, status=403)
 
     blog.delete()
     return Response(status=204)
+
+
+# --------------------------
+# Delta sync (offline-first client)
+# --------------------------
+def _sync_rows(request, queryset, plan, serializer_class):
+    if fast_path_enabled(request):
+        return plan.build_many(values_rows(queryset, plan), request)
+    return serializer_class(queryset, many=True, context={'request': request}).data
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def delta_sync(request):
+    """
+    `?since=<token>`-оос хойш өөрчлөгдсөн/устсан мөрүүд ба дараагийн token.
+    since байхгүй (эсвэл хэт хуучин) бол reset=True бүрэн snapshot.
+    """
+    try:
+        changes = sync_changes(request.user, request.query_params.get('since'))
+    except ValueError:
+        return Response({"error": "Invalid sync token"}, status=400)
+
+    blogs = Blog.objects.with_feed_data(
+        request.user, comment_previews=comment_preview_count(request)
+    ).filter(pk__in=changes['blogs'].values('pk')).order_by('updated_at', 'id')
+
+    deleted = {}
+    for model, object_id, blog_id in changes['tombstones'].values_list('model', 'object_id', 'blog_id'):
+        deleted.setdefault(model, []).append({"id": object_id, "blog": blog_id})
+
+    return Response({
+        "token": changes['token'],
+        "reset": changes['reset'],
+        "trips": _sync_rows(request, changes['trips'], TRIP_PLAN, TripSerializer),
+        "blogs": _sync_rows(request, blogs, BLOG_LIST_PLAN, BlogListSerializer),
+        "comments": _sync_rows(request, changes['comments'], COMMENT_PLAN, CommentSerializer),
+        "likes": list(changes['likes'].values('id', 'blog', 'created_at')),
+        "saves": list(changes['saves'].values('id', 'blog', 'created_at')),
+        "deleted": deleted,
+    })
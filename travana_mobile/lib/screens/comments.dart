@@ -23,10 +23,33 @@ class _CommentsPageState extends State<CommentsPage> {
   @override
   void initState() {
     super.initState();
+    // Feed-д зөвхөн сүүлийн хэдэн comment ирдэг тул бүтэн жагсаалтыг тусад нь авна
     comments = widget.blog['comments'] as List<dynamic>? ?? [];
+    _fetchComments();
     _fetchCurrentUser();
   }
 
+  Future<void> _fetchComments() async {
+    final token = widget.token;
+    if (token == null) return;
+
+    final blogId = widget.blog['id'];
+    try {
+      final res = await http.get(
+        Uri.parse('http://127.0.0.1:8000/api/blogs/$blogId/comments/'),
+        headers: {'Authorization': 'Bearer $token'},
+      );
+      if (res.statusCode == 200) {
+        final data = jsonDecode(res.body);
+        setState(() {
+          comments = data as List<dynamic>;
+        });
+      }
+    } catch (e) {
+      debugPrint("Comments fetch error: $e");
+    }
+  }
+
   String formatTime(String dateString) {
     final date = DateTime.parse(dateString).toLocal();
     final now = DateTime.now();